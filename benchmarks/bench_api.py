@@ -0,0 +1,269 @@
+"""Reproducible load test of the HTTP API.
+
+Seeds synthetic data through the real endpoints, at the scale given on the
+command line, and times every call:
+
+    register, login                   --users users
+    create session, add user          --runs sessions of --members-per-run members, 1..--max-parts parts
+    generate months                   once per session
+    record payment                    --payments payments
+    schedule and set winners          --winners months per session
+    list routes                       --list-repeat reads of each list endpoint
+
+Each operation reports its count, errors, throughput and p50/p95/p99
+latency. ``--output`` stores the results as JSON (with the git commit), and
+``--compare`` checks them against an earlier file: the run fails when a p95
+latency grew by more than ``--max-regression`` (operations timed fewer than
+20 times are too noisy to gate and only printed).
+
+By default the application runs in process (Flask test client) on a fresh
+SQLite file, whatever DATABASE_URL says: ``--database-url`` runs it on
+another database instead, ``--base-url`` drives a running server, started
+with RATE_LIMIT_ENABLED=0 since every user registers from the same address.
+Both write hundreds of users and sessions to their database.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_api.py --users 200 --runs 10 --output before.json
+    PYTHONPATH=src python benchmarks/bench_api.py --users 200 --runs 10 --compare before.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+
+class HttpClient:
+    """Minimal JSON client for ``--base-url``, with the Flask test client's interface."""
+
+    class Response:
+        def __init__(self, status_code, body):
+            self.status_code = status_code
+            self._body = body
+
+        def get_json(self):
+            try:
+                return json.loads(self._body)
+            except ValueError:
+                return None
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def open(self, method, path, json_body=None):
+        data = json.dumps(json_body).encode() if json_body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return self.Response(response.status, response.read())
+        except urllib.error.HTTPError as e:
+            return self.Response(e.code, e.read())
+
+    def get(self, path):
+        return self.open('GET', path)
+
+    def post(self, path, json=None):
+        return self.open('POST', path, json)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+        self.elapsed = {}
+
+    def call(self, operation, fn, expected=(200, 201)):
+        started = time.perf_counter()
+        response = fn()
+        duration = time.perf_counter() - started
+        self.timings.setdefault(operation, []).append(duration)
+        self.elapsed[operation] = self.elapsed.get(operation, 0.0) + duration
+        if response.status_code not in expected:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+        return response
+
+    def results(self):
+        results = {}
+        for operation, timings in self.timings.items():
+            ordered = sorted(timings)
+            results[operation] = {
+                'count': len(timings),
+                'errors': self.errors.get(operation, 0),
+                'throughput_per_s': round(len(timings) / self.elapsed[operation], 2),
+                'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+                'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return results
+
+
+def run(client, args):
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    password = 'bench-password-123'
+
+    user_ids = []
+    for index in range(args.users):
+        email = f'bench{index}@example.com'
+        recorder.call('register', lambda: client.post('/auth/register', json={
+            'first_name': f'bench{index}', 'last_name': f'user{index}', 'email': email, 'password': password
+        }))
+        recorder.call('login', lambda: client.post('/auth/login', json={'email': email, 'password': password}))
+        user_ids.append(client.get(f'/auth/get_id/{email}').get_json()['user_id'])
+
+    session_ids = []
+    for _ in range(args.runs):
+        members = rng.sample(user_ids, min(args.members_per_run, len(user_ids)))
+        response = recorder.call('create_session', lambda: client.post('/contribution/session', json={
+            'number_of_members': len(members), 'minimal_contribution': 100, 'start_date': '2025-01-01'
+        }))
+        session_id = response.get_json()['session_id']
+        session_ids.append(session_id)
+        for user_id in members:
+            recorder.call('add_user', lambda: client.post(f'/contribution/session/{session_id}/add-user', json={
+                'user_id': user_id, 'number_of_parts': rng.randint(1, args.max_parts)
+            }))
+        recorder.call('generate_months',
+                      lambda: client.post(f'/contribution/session/{session_id}/generate-months'))
+
+    payment_ids = []
+    for user_id in user_ids:
+        payments = client.get(f'/contribution/user/{user_id}/payments?fields=id,status').get_json()
+        payment_ids += [payment['id'] for payment in payments if payment['status'] == 'PENDING']
+    for payment_id in rng.sample(payment_ids, min(args.payments, len(payment_ids))):
+        recorder.call('record_payment', lambda: client.post(f'/contribution/payment/{payment_id}', json={}))
+
+    for session_id in session_ids:
+        response = recorder.call('schedule_winners', lambda: client.post(
+            f'/contribution/session/{session_id}/schedule-winners', json={'method': 'random', 'seed': args.seed}
+        ))
+        for slot in response.get_json()['schedule'][:args.winners]:
+            recorder.call('set_winner', lambda: client.post(f'/contribution/session/{session_id}/winner', json={
+                'winner_user_id': slot['user_id'], 'month': slot['month']
+            }))
+
+    for _ in range(args.list_repeat):
+        session_id = rng.choice(session_ids)
+        user_id = rng.choice(user_ids)
+        recorder.call('list_sessions', lambda: client.get('/contribution/sessions'))
+        recorder.call('list_session_contributions',
+                      lambda: client.get(f'/contribution/session/{session_id}/contributions?limit=100'))
+        recorder.call('list_user_payments', lambda: client.get(f'/contribution/user/{user_id}/payments?limit=100'))
+        recorder.call('session_summary', lambda: client.get(f'/contribution/session/{session_id}/summary'))
+    return recorder.results()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# operations timed fewer times than this are reported but never fail the comparison
+MIN_GATED_SAMPLES = 20
+
+
+def compare(results, baseline, max_regression):
+    """Print the p95 deltas and return the operations whose p95 regressed."""
+    regressions = []
+    print(f"\n{'operation':<28}{'p95 before':>12}{'p95 now':>12}{'delta':>9}")
+    for operation, now in results.items():
+        before = baseline['results'].get(operation)
+        if before is None or not before['p95_ms']:
+            continue
+        delta = now['p95_ms'] / before['p95_ms'] - 1
+        gated = now['count'] >= MIN_GATED_SAMPLES
+        flag = '  REGRESSION' if gated and delta > max_regression else ''
+        print(f"{operation:<28}{before['p95_ms']:>12.2f}{now['p95_ms']:>12.2f}{delta:>+9.0%}{flag}")
+        if flag:
+            regressions.append(operation)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--members-per-run', type=int, default=20)
+    parser.add_argument('--max-parts', type=int, default=2)
+    parser.add_argument('--payments', type=int, default=500)
+    parser.add_argument('--winners', type=int, default=3, help='months given a winner per session')
+    parser.add_argument('--list-repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--hash-method', help='PASSWORD_HASH_METHOD of the in-process app (default: production)')
+    parser.add_argument('--base-url', help='drive a running server instead of an in-process app')
+    parser.add_argument('--database-url', help='database of the in-process app (default: a fresh SQLite file)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='allowed p95 growth (0.25 = +25%%)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.base_url:
+            client = HttpClient(args.base_url)
+        else:
+            os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            os.environ['AUTO_MIGRATE'] = '1'
+            os.environ['RATE_LIMIT_ENABLED'] = '0'  # every user registers and logs in from one address
+            if args.hash_method:
+                os.environ['PASSWORD_HASH_METHOD'] = args.hash_method
+            from community import create_app
+
+            client = create_app().test_client()
+        started = time.perf_counter()
+        results = run(client, args)
+        total = time.perf_counter() - started
+
+    print(f"{'operation':<28}{'count':>7}{'errors':>7}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for operation, r in results.items():
+        print(f"{operation:<28}{r['count']:>7}{r['errors']:>7}{r['throughput_per_s']:>10.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+    print(f"total {total:.2f} s")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'target': args.base_url or 'in-process',
+            'params': {key: value for key, value in vars(args).items()
+                       if key not in ('output', 'compare', 'base_url', 'database_url')},
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = any(r['errors'] for r in results.values())
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('params') != report['meta']['params']:
+            print('warning: the baseline was run with different parameters')
+        failed = bool(compare(results, baseline, args.max_regression)) or failed
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Concurrent-client throughput of the WSGI and ASGI serving modes.
+
+Seeds a session on a fresh SQLite file, then for each mode starts a server
+process on it:
+
+    wsgi    Werkzeug's threaded server, as ``app.run`` (community/app.py)
+    asgi    uvicorn, one worker, ``community.asgi:create_asgi_app``
+
+and lets ``--clients`` keep-alive connections poll the dashboard read
+endpoints for ``--duration`` seconds each, with ``--think-ms`` between two
+requests of a client. The response cache is off unless ``--cache`` is
+given, so every request reaches the database.
+
+Needs the optional ASGI dependencies: pip install asgiref aiosqlite uvicorn
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_asgi.py --clients 1,16,64 --duration 5
+    PYTHONPATH=src python benchmarks/bench_asgi.py --clients 256 --think-ms 200 --output asgi.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVERS = {
+    'wsgi': [sys.executable, '-c',
+             "import sys; from werkzeug.serving import run_simple; from community import create_app; "
+             "run_simple('127.0.0.1', int(sys.argv[1]), create_app(), threaded=True)"],
+    'asgi': [sys.executable, '-m', 'uvicorn', '--factory', 'community.asgi:create_asgi_app',
+             '--host', '127.0.0.1', '--log-level', 'warning', '--port'],
+}
+
+
+def seed(members, parts):
+    from datetime import date
+
+    from community import create_app
+    from community.controllers.contribution_controller import ContributionController
+    from community.models import db
+    from community.models.user_model import User, UserRole
+
+    app = create_app()
+    with app.app_context():
+        controller = ContributionController(db.session)
+        session = controller.create_session(members, 100, date(2025, 1, 1))
+        users = [User(firstname=f'asgi{i}', lastname=f'user{i}', email=f'asgi{i}@example.com',
+                      password_hash='x', salt='x', role=UserRole.USER) for i in range(members)]
+        db.session.add_all(users)
+        db.session.commit()
+        for user in users:
+            controller.add_user_to_session(session.id, user.id, parts)
+        controller.generate_monthly_contributions(session.id)
+        session_id, user_ids = session.id, [user.id for user in users]
+        db.engine.dispose()
+    return session_id, user_ids
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port):
+    process = subprocess.Popen(SERVERS[mode] + [str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start (missing optional dependencies?)")
+
+
+async def poll(port, paths, deadline, think, rng, latencies, errors):
+    """One client: keep-alive GET requests until ``deadline``."""
+    reader = writer = None
+    while time.monotonic() < deadline:
+        if writer is None:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        started = time.perf_counter()
+        try:
+            writer.write(f"GET {rng.choice(paths)} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+            head = await reader.readuntil(b'\r\n\r\n')
+            status_line, *header_lines = head.decode('latin1').split('\r\n')
+            headers = dict(line.lower().split(': ', 1) for line in header_lines if line)
+            await reader.readexactly(int(headers['content-length']))
+            if not status_line.split()[1].startswith('2'):
+                errors.append(status_line)
+            if headers.get('connection') == 'close':
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, KeyError, ValueError) as e:
+            errors.append(repr(e))
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if think:
+            await asyncio.sleep(think)
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, paths, clients, duration, think, seed):
+    latencies, errors = [], []
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        poll(port, paths, deadline, think, random.Random(seed + index), latencies, errors)
+        for index in range(clients)
+    ])
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies) or [0.0]
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', default='1,16,64', help='comma separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per mode and concurrency level')
+    parser.add_argument('--think-ms', type=float, default=0, help='pause of a client between two requests')
+    parser.add_argument('--members', type=int, default=50)
+    parser.add_argument('--parts', type=int, default=1)
+    parser.add_argument('--modes', default='wsgi,asgi')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'asgi.db')}"
+        os.environ['AUTO_MIGRATE'] = '1'
+        os.environ['RESPONSE_CACHE_ENABLED'] = '1' if args.cache else '0'
+        os.environ['METRICS_ENABLED'] = '0'
+        os.environ['LOG_LEVEL'] = 'WARNING'
+        session_id, user_ids = seed(args.members, args.parts)
+        paths = [
+            '/contribution/sessions',
+            f'/contribution/session/{session_id}/contributions?limit=50',
+            f'/contribution/session/{session_id}/summary',
+        ] + [f'/contribution/user/{user_id}/payments' for user_id in user_ids[:10]]
+
+        print(f"{'mode':<6}{'clients':>8}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}")
+        for mode in args.modes.split(','):
+            port = free_port()
+            server = start_server(mode, port)
+            try:
+                for clients in (int(value) for value in args.clients.split(',')):
+                    r = summarize(*asyncio.run(load(port, paths, clients, args.duration, args.think_ms / 1000,
+                                                    args.seed)))
+                    results.setdefault(mode, {})[clients] = r
+                    print(f"{mode:<6}{clients:>8}{r['requests']:>10}{r['errors']:>8}{r['throughput_per_s']:>10.1f}"
+                          f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}")
+            finally:
+                server.terminate()
+                server.wait()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
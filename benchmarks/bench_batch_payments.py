@@ -0,0 +1,46 @@
+"""Benchmark of the batch payment recording.
+
+Generates a session, then records every payment of it through
+``ContributionController.record_payments_batch`` in a single call.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_batch_payments.py --members 200 --max-parts 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_generate_months import make_app, seed_session
+from community.controllers.contribution_controller import ContributionController
+from community.models import db
+from community.models.contribution_model import UserMonthlyContribution
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--max-parts', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            controller = ContributionController(db.session)
+            session_id = seed_session(controller, args.members, args.max_parts, args.seed)
+            controller.generate_monthly_contributions(session_id)
+            items = [(payment_id, None) for payment_id in db.session.scalars(db.select(UserMonthlyContribution.id))]
+
+            started = time.perf_counter()
+            results = controller.record_payments_batch(items)
+            elapsed = time.perf_counter() - started
+            db.session.remove()
+
+    paid = sum(1 for r in results if r["status"] == "PAID")
+    print(f"batch  {paid:>10} payments  {elapsed:8.2f} s  {paid / elapsed:12.0f} payments/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Benchmark of the monthly schedule generation.
+
+Compares the bulk path of ``ContributionController.generate_monthly_contributions``
+with the previous ORM implementation (one ``Contribution`` and one
+``UserMonthlyContribution`` object per member and per month).
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_generate_months.py --members 200 --max-parts 3
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+
+from community.controllers.contribution_controller import ContributionController
+from community.models import db
+from community.models.contribution_model import (
+    ContributionRun,
+    Contribution,
+    ContributionStatus,
+    UserMonthlyContribution,
+    PaymentStatus
+)
+from community.models.user_model import User, UserRole
+
+
+def orm_generate_monthly_contributions(db_session, session_id):
+    """Reference ORM implementation, as it was before the bulk path."""
+    session = db_session.get(ContributionRun, session_id)
+    total_parts = sum(uc.number_of_parts for uc in session.user_contributions)
+    for month_index in range(total_parts):
+        contribution_month = session.start_date + timedelta(days=30 * month_index)
+        for user_contrib in session.user_contributions:
+            amount = user_contrib.number_of_parts * session.minimal_contribution
+            contribution = Contribution(
+                contribution_run_id=session.id,
+                user_contribution_run_id=user_contrib.id,
+                month=contribution_month,
+                amount=amount,
+                status=ContributionStatus.PENDING
+            )
+            db_session.add(contribution)
+            db_session.add(UserMonthlyContribution(
+                user_id=user_contrib.user_id,
+                contribution=contribution,
+                amount=amount,
+                status=PaymentStatus.PENDING
+            ))
+    db_session.commit()
+
+
+def make_app(database_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed_session(controller, members, max_parts, seed):
+    rng = random.Random(seed)
+    session = controller.create_session(members, 100, date(2025, 1, 1))
+    users = [
+        User(firstname=f'bench{index}', lastname=f'user{index}', email=f'bench{index}@example.com',
+             password_hash='x', salt='x', role=UserRole.USER)
+        for index in range(members)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    for user in users:
+        controller.add_user_to_session(session.id, user.id, rng.randint(1, max_parts))
+    return session.id
+
+
+def run(label, generate, members, max_parts, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            controller = ContributionController(db.session)
+            session_id = seed_session(controller, members, max_parts, seed)
+
+            started = time.perf_counter()
+            generate(controller, session_id)
+            elapsed = time.perf_counter() - started
+
+            rows = db.session.query(Contribution).count() + db.session.query(UserMonthlyContribution).count()
+            db.session.remove()
+    print(f"{label:<6} {rows:>10} rows  {elapsed:8.2f} s  {rows / elapsed:12.0f} rows/s")
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=200)
+    parser.add_argument('--max-parts', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-orm', action='store_true', help='only run the bulk path')
+    args = parser.parse_args()
+
+    bulk = run('bulk', lambda c, sid: c.generate_monthly_contributions(sid), args.members, args.max_parts, args.seed)
+    if not args.skip_orm:
+        orm = run('orm', lambda c, sid: orm_generate_monthly_contributions(db.session, sid),
+                  args.members, args.max_parts, args.seed)
+        print(f"speedup: x{bulk / orm:.1f}")
+
+
+if __name__ == '__main__':
+    main()
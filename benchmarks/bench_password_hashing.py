@@ -0,0 +1,44 @@
+"""Micro-benchmark of the password hashing profiles.
+
+Reports, for the PASSWORD_HASH_METHOD of every Config class (and any
+extra --method), how long one verification takes and how many logins per
+second a single core can serve.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_password_hashing.py --method pbkdf2:sha256:600000
+"""
+import argparse
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from community import config
+from community.utils.passwords import normalize_method
+
+
+def bench(method, rounds):
+    password_hash = generate_password_hash('correct_password' + 'salt', method=method)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        check_password_hash(password_hash, 'correct_password' + 'salt')
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--method', action='append', default=[], help='extra werkzeug method string to measure')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    profiles = [(cls.__name__, cls.PASSWORD_HASH_METHOD)
+                for cls in (config.Config, config.DevelopmentConfig, config.TestingConfig)]
+    profiles += [('custom', method) for method in args.method]
+
+    print(f"{'profile':<18} {'method':<26} {'ms/verify':>10} {'logins/s/core':>14}")
+    for name, method in profiles:
+        seconds = bench(method, args.rounds)
+        print(f"{name:<18} {normalize_method(method):<26} {seconds * 1000:10.2f} {1 / seconds:14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark of the session summary aggregation.
+
+Seeds a session of ``--members`` single-part members (members x members
+contribution and payment rows: 317 members give ~100k rows), pays the
+cells of the first half of the schedule except one in ``--late-every``,
+then times ``ContributionController.get_session_summary`` half way through
+the session and a cached ``GET /contribution/session/<id>/summary``.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_session_summary.py --members 317
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from bench_generate_months import make_app, seed_session
+from community.controllers.contribution_controller import ContributionController
+from community.models import db
+from community.models.contribution_model import Contribution, UserMonthlyContribution
+from community.routes.contribution_routes import contribution_bp
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=317)
+    parser.add_argument('--late-every', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, 'bench.db'))
+        app.register_blueprint(contribution_bp, url_prefix='/contribution')
+        app.config['RESPONSE_CACHE_ENABLED'] = True
+        with app.app_context():
+            db.create_all()
+            controller = ContributionController(db.session)
+            session_id = seed_session(controller, args.members, 1, 42)
+            controller.generate_monthly_contributions(session_id)
+            as_of = date(2025, 1, 1) + timedelta(days=30 * (args.members // 2))
+            rows = db.session.scalar(db.select(func.count(UserMonthlyContribution.id)))
+            due_ids = db.session.scalars(
+                db.select(UserMonthlyContribution.id).join(Contribution).where(Contribution.month < as_of)
+            ).all()
+            controller.record_payments_batch([(payment_id, None) for index, payment_id in enumerate(due_ids)
+                                              if index % args.late_every])
+
+            median, best = timed(lambda: controller.get_session_summary(session_id, as_of), args.repeat)
+            print(f"aggregate {rows:>8} rows  median {median:7.2f} ms  min {best:7.2f} ms")
+
+            client = app.test_client()
+            url = f'/contribution/session/{session_id}/summary?as_of={as_of.isoformat()}'
+            client.get(url)
+            median, best = timed(lambda: client.get(url), args.repeat)
+            print(f"cached    {rows:>8} rows  median {median:7.2f} ms  min {best:7.2f} ms")
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark of the schedule simulation.
+
+Evaluates random scenarios (member count, parts per member, minimal
+contribution, seeded random payout order) with ``community.simulation.simulate``
+and reports the number of scenarios per second.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_simulation.py --scenarios 5000 --max-members 30 --max-parts 3
+"""
+import argparse
+import random
+import time
+
+from community.simulation import simulate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', type=int, default=5000)
+    parser.add_argument('--max-members', type=int, default=30)
+    parser.add_argument('--max-parts', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scenarios = [
+        ([rng.randint(1, args.max_parts) for _ in range(rng.randint(2, args.max_members))],
+         rng.choice([50, 100, 200]), index)
+        for index in range(args.scenarios)
+    ]
+
+    started = time.perf_counter()
+    cells = 0
+    for parts, minimal, seed in scenarios:
+        sim = simulate(parts, minimal, 'random', seed)
+        cells += sim.balances.size
+    elapsed = time.perf_counter() - started
+    print(f"simulate {args.scenarios:>8} scenarios  {cells:>10} cells  {elapsed:8.3f} s  "
+          f"{args.scenarios / elapsed:10.0f} scenarios/s")
+
+
+if __name__ == '__main__':
+    main()
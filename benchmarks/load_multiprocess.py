@@ -0,0 +1,110 @@
+"""Multi-process write load test against one database.
+
+Starts several worker processes, each with its own application and
+connection pool (like gunicorn workers), that record payments, create
+sessions and read schedules concurrently through the real routes. Any
+"database is locked" error makes the run fail.
+
+Usage:
+    PYTHONPATH=src python benchmarks/load_multiprocess.py --processes 4 --operations 200
+    DATABASE_URL=postgresql://... PYTHONPATH=src python benchmarks/load_multiprocess.py
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+
+def seed(members, parts):
+    from datetime import date
+
+    from community import create_app
+    from community.controllers.contribution_controller import ContributionController
+    from community.models import db
+    from community.models.contribution_model import UserMonthlyContribution
+    from community.models.user_model import User, UserRole
+
+    app = create_app()
+    with app.app_context():
+        controller = ContributionController(db.session)
+        session = controller.create_session(members, 100, date(2025, 1, 1))
+        users = [User(firstname=f'load{i}', lastname=f'user{i}', email=f'load{i}@example.com',
+                      password_hash='x', salt='x', role=UserRole.USER) for i in range(members)]
+        db.session.add_all(users)
+        db.session.commit()
+        for user in users:
+            controller.add_user_to_session(session.id, user.id, parts)
+        controller.generate_monthly_contributions(session.id)
+        session_id = session.id
+        payment_ids = list(db.session.scalars(db.select(UserMonthlyContribution.id)))
+        db.engine.dispose()
+    return session_id, payment_ids
+
+
+def worker(index, session_id, payment_ids, operations, results):
+    from community import create_app
+
+    app = create_app()
+    client = app.test_client()
+    errors, locked, done = 0, 0, 0
+    started = time.perf_counter()
+    for step in range(operations):
+        kind = step % 4
+        if kind in (0, 1) and payment_ids:
+            response = client.post(f'/contribution/payment/{payment_ids.pop()}', json={})
+        elif kind == 2:
+            response = client.post('/contribution/session', json={
+                'number_of_members': 3, 'minimal_contribution': 50, 'start_date': '2025-01-01'
+            })
+        else:
+            response = client.get(f'/contribution/session/{session_id}/contributions?limit=50')
+        done += 1
+        if response.status_code >= 500:
+            errors += 1
+            if 'locked' in response.get_data(as_text=True):
+                locked += 1
+    results.put((index, done, errors, locked, time.perf_counter() - started))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--operations', type=int, default=200, help='operations per process')
+    parser.add_argument('--members', type=int, default=20)
+    parser.add_argument('--parts', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tmp, 'load.db')}")
+        os.environ.setdefault('HASH_POOL_ENABLED', '0')
+        os.environ.setdefault('AUTO_MIGRATE', '1')
+        session_id, payment_ids = seed(args.members, args.parts)
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(i, session_id, payment_ids[i::args.processes], args.operations,
+                                                 results))
+            for i in range(args.processes)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        rows = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+    total = sum(r[1] for r in rows)
+    errors = sum(r[2] for r in rows)
+    locked = sum(r[3] for r in rows)
+    print(f"processes: {args.processes}  operations: {total}  wall: {elapsed:.2f} s  "
+          f"throughput: {total / elapsed:.0f} ops/s")
+    print(f"errors: {errors}  locked errors: {locked}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,27 @@
+import logging
+
 from flask import Flask
 
+from community.cli import register_commands
+from community.migrations import check_schema
 from community.models import db
+from community.models.engine import configure_engine, engine_options
+from community.models.routing import init_replica
 from community.routes.auth_routes import auth
 from community.routes.contribution_routes import contribution_bp
+from community.routes.job_routes import jobs_bp
+from community.utils.log import configure_logging
+from community.utils.metrics import init_metrics
+from community.utils.response_cache import check_response_cache
+
+logger = logging.getLogger(__name__)
 
 
 def register_blueprints(app):
     """Register all blueprints for the application."""
     app.register_blueprint(auth, url_prefix='/auth')
     app.register_blueprint(contribution_bp, url_prefix='/contribution')
+    app.register_blueprint(jobs_bp, url_prefix='/jobs')
 
 
 def create_app(testing=False, development=False):
@@ -23,11 +36,17 @@ def create_app(testing=False, development=False):
     else:
         app.config.from_object(f'{package_name}.ProductionConfig')
 
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    configure_logging(app)
     db.init_app(app)
+    init_replica(app)
+    init_metrics(app)
+    check_response_cache(app)
     register_blueprints(app)
+    register_commands(app)
     with app.app_context():
-        db.create_all()
-        print('Database tables created successfully.')
+        configure_engine(db.engine, app.config)
+        check_schema(app)
         if development:  # Ne crée que si test ou dev
             create_initial_admin()
 
@@ -40,7 +59,7 @@ def create_initial_admin():
     import os
 
     if not User.query.filter_by(role=UserRole.ADMIN).first():
-        print("Creating default admin user...")
+        logger.info('Creating default admin user')
 
         salt = secrets.token_hex(8)
         admin = User(
@@ -61,4 +80,4 @@ def create_initial_admin():
         db.session.add(admin)
         db.session.commit()
 
-        print(f"✅ Admin user created with identifier: {code.code}")
+        logger.info('Admin user created', extra={'email': admin.email, 'admin_identifier': code.code})
@@ -0,0 +1,156 @@
+"""ASGI serving mode.
+
+Serves the same Flask application under an ASGI server, e.g.::
+
+    pip install asgiref aiosqlite uvicorn   # asyncpg or aiomysql for a database server
+    DATABASE_URL=sqlite:////var/lib/2community/app.db \\
+        uvicorn --factory community.asgi:create_asgi_app --host 0.0.0.0 --port 8000
+
+GET requests to the read endpoints polled by the dashboard
+(``ASYNC_READ_ENDPOINTS``) are dispatched on the event loop: the Flask view
+runs unchanged inside ``AsyncSession.run_sync`` with ``db.session`` bound
+to the asyncio engine, so every query awaits the driver instead of
+blocking a thread, and one worker holds many slow or concurrent polls.
+Writes, authentication and NDJSON streams keep the WSGI code path through
+asgiref's ``WsgiToAsgi``, on its thread pool.
+"""
+import io
+import logging
+import sys
+
+from werkzeug.exceptions import HTTPException
+
+from community import create_app
+from community.models import db
+from community.models.async_engine import init_async_engine
+from community.routes.streaming import wants_stream
+
+logger = logging.getLogger(__name__)
+
+ASYNC_READ_ENDPOINTS = frozenset({
+    'contribution.list_all_sessions',
+    'contribution.get_session_contributions',
+    'contribution.get_session_summary',
+    'contribution.get_payout_schedule',
+    'contribution.get_eligible_winners',
+    'contribution.get_user_payments',
+    'contribution.get_all_user_contributions',
+})
+
+
+def build_environ(scope) -> dict:
+    """WSGI environ of a bodiless ASGI http request."""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        value = value.decode('latin1')
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsgiApp:
+    """ASGI application around ``flask_app``, see the module docstring."""
+
+    def __init__(self, flask_app):
+        try:
+            from asgiref.wsgi import WsgiToAsgi
+            from sqlalchemy.ext.asyncio import AsyncSession
+        except ImportError as e:
+            raise RuntimeError("The ASGI mode requires the 'asgiref' package") from e
+
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self._session_class = AsyncSession
+        self.engine = init_async_engine(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            environ = build_environ(scope)
+            if self.is_async_read(environ):
+                await self.send_response(await self.dispatch(environ), scope['method'], send)
+            else:
+                await self.wsgi(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def is_async_read(self, environ) -> bool:
+        """True for a read endpoint of ASYNC_READ_ENDPOINTS that does not stream its response."""
+        adapter = self.flask_app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:  # 404, 405, redirects: answered by Flask on the WSGI path
+            return False
+        if endpoint not in ASYNC_READ_ENDPOINTS:
+            return False
+        # a streamed body is produced after the view returns, outside of run_sync
+        with self.flask_app.request_context(environ):
+            return not wants_stream()
+
+    async def dispatch(self, environ):
+        async with self._session_class(self.engine, expire_on_commit=False) as session:
+            return await session.run_sync(self._dispatch_sync, environ)
+
+    def _dispatch_sync(self, sync_session, environ):
+        """Flask's ``wsgi_app`` with ``db.session`` bound to the greenlet-driven ``sync_session``."""
+        ctx = self.flask_app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                # scoped per application context: only this request sees the asyncio session
+                db.session.registry.set(sync_session)
+                response = self.flask_app.full_dispatch_request()
+            except Exception as e:
+                error = e
+                response = self.flask_app.handle_exception(e)
+            response.get_data()  # buffered while the session is open
+            return response
+        finally:
+            ctx.pop(error)
+
+    @staticmethod
+    async def send_response(response, method, send):
+        headers = [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in response.headers.items()]
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+        body = b'' if method == 'HEAD' else response.get_data()
+        await send({'type': 'http.response.body', 'body': body})
+        response.close()
+
+
+def create_asgi_app(flask_app=None):
+    """ASGI entry point: ``uvicorn --factory community.asgi:create_asgi_app``."""
+    if flask_app is None:
+        flask_app = create_app()
+    logger.info('ASGI mode', extra={'async_endpoints': sorted(ASYNC_READ_ENDPOINTS)})
+    return AsgiApp(flask_app)
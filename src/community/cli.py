@@ -0,0 +1,103 @@
+import multiprocessing
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from community.models import db
+
+contributions_cli = AppGroup('contributions', help='Maintenance commands for contribution sessions.')
+
+
+@contributions_cli.command('rebuild-counters')
+@click.option('--session-id', type=int, default=None, help='Only check the contributions of this session.')
+@click.option('--check', is_flag=True, help='Report inconsistent counters without fixing them.')
+def rebuild_counters(session_id, check):
+    """Check the payment counters of contributions and rebuild the stale ones."""
+    from community.controllers.contribution_controller import ContributionController
+
+    controller = ContributionController(db.session)
+    stale_ids = controller.rebuild_contribution_counters(session_id, dry_run=check)
+    if not stale_ids:
+        click.echo('All contribution counters are consistent.')
+        return
+
+    action = 'found' if check else 'rebuilt'
+    click.echo(f'{len(stale_ids)} contribution counter(s) {action}: {", ".join(map(str, stale_ids))}')
+    if check:
+        raise SystemExit(1)
+
+
+schema_cli = AppGroup('schema', help='Versioned database schema migrations.')
+
+
+@schema_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Target version (default: latest).')
+@click.option('--batch-size', type=int, default=None, help='Rows per transaction for data migrations.')
+def schema_upgrade(target, batch_size):
+    """Apply the pending migrations."""
+    from community.migrations import DEFAULT_BATCH_SIZE, upgrade
+
+    applied = upgrade(db.engine, target, batch_size or DEFAULT_BATCH_SIZE)
+    if applied:
+        click.echo(f'Applied migration(s): {", ".join(map(str, applied))}')
+    else:
+        click.echo('Schema already up to date.')
+
+
+@schema_cli.command('current')
+def schema_current():
+    """Print the stored and the latest schema versions."""
+    from community.migrations import HEAD_VERSION, current_version
+
+    with db.engine.connect() as conn:
+        version = current_version(conn)
+    click.echo(f'current: {version}, latest: {HEAD_VERSION}')
+
+
+jobs_cli = AppGroup('jobs', help='Background job queue.')
+
+
+def _worker_process(app, poll_interval, once, max_jobs):
+    from community.jobs import run_worker
+
+    with app.app_context():
+        run_worker(poll_interval=poll_interval, once=once, max_jobs=max_jobs)
+
+
+@jobs_cli.command('worker')
+@click.option('--processes', type=int, default=1, help='Worker processes to run.')
+@click.option('--once', is_flag=True, help='Exit when the queue is empty.')
+@click.option('--poll-interval', type=float, default=None, help='Seconds between two looks at an empty queue.')
+@click.option('--max-jobs', type=int, default=None, help='Exit after this many jobs (per process).')
+def jobs_worker(processes, once, poll_interval, max_jobs):
+    """Run the queued background jobs."""
+    from community.jobs import JobError, check_shared_cache, run_worker
+
+    try:
+        check_shared_cache(current_app.config)
+    except JobError as je:
+        raise click.ClickException(str(je))
+    if processes <= 1:
+        count = run_worker(poll_interval=poll_interval, once=once, max_jobs=max_jobs)
+        click.echo(f'{count} job(s) run.')
+        return
+
+    app = current_app._get_current_object()
+    db.engine.dispose()  # forked workers must not share the parent's connections
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_worker_process, args=(app, poll_interval, once, max_jobs))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if any(worker.exitcode for worker in workers):
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    """Register the custom CLI commands on the application."""
+    app.cli.add_command(contributions_cli)
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(jobs_cli)
@@ -4,23 +4,91 @@ import os
 class Config:
     DEBUG = False
     TESTING = False
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///2CommunityApp.db'
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///2CommunityApp.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET = os.getenv('SECRET_KEY', 'default_secret_key')
+    # connection pool, see community.models.engine.engine_options
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', '1') == '1'
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))
+    # SQLite PRAGMAs applied on every connection
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BEGIN_MODE = os.getenv('SQLITE_BEGIN_MODE', 'DEFERRED')  # empty: driver default (deferred)
+    # write controller methods only, see community.models.engine.write_transaction
+    SQLITE_WRITE_BEGIN_MODE = os.getenv('SQLITE_WRITE_BEGIN_MODE', 'IMMEDIATE')
+    # optional read replica for the read-only controller methods, see community.models.routing;
+    # the staleness guard only knows the writes of its own process: with WEB_CONCURRENCY > 1, a read
+    # served by another worker may hit the replica before the write reaches it
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    REPLICA_STALENESS_SECONDS = float(os.getenv('REPLICA_STALENESS_SECONDS', 5))
+    # read engine of the ASGI mode (community.asgi); default: SQLALCHEMY_DATABASE_URI on its asyncio driver
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+    # cache of the polled GET endpoints, see community.utils.response_cache
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', '0') == '1'
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'lru')  # lru (one web process) | redis
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+    # web worker processes (also read by gunicorn and uvicorn): beyond one, the lru cache is refused
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+    # observability, see community.utils.metrics and community.utils.log
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json | text
+    # token buckets of /auth/login and /auth/register, see community.utils.rate_limit
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # memory | redis
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))  # buckets kept by the memory store
+    RATE_LIMIT_PER_IP = os.getenv('RATE_LIMIT_PER_IP', '20/minute')
+    RATE_LIMIT_PER_EMAIL = os.getenv('RATE_LIMIT_PER_EMAIL', '5/minute')
+    # background jobs, see community.jobs
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))  # seconds between two looks at an empty queue
+    JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', 300))  # RUNNING without heartbeat: worker lost
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_BATCH_SIZE = int(os.getenv('JOB_BATCH_SIZE', 1000))  # payments per transaction of a batch job
+    SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'default_jwt_secret_key')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     JWT_REFRESH_TOKEN_EXPIRES = 604800  # 7 days
+    # seconds a process trusts its copy of the revocation time of a user, see community.utils.jwt_utils
+    REVOCATION_CACHE_TTL = float(os.getenv('REVOCATION_CACHE_TTL', 5))
+    # werkzeug method string, see benchmarks/bench_password_hashing.py to choose the cost
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # apply pending migrations at startup; in production run "flask schema upgrade" instead
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', '0') == '1'
+    # hash/verify passwords on a bounded process pool; beyond workers + queue depth, /auth answers 503
+    HASH_POOL_ENABLED = os.getenv('HASH_POOL_ENABLED', '1') == '1'
+    HASH_POOL_WORKERS = int(os.getenv('HASH_POOL_WORKERS', 0)) or None  # None: one per CPU
+    HASH_POOL_QUEUE_DEPTH = int(os.getenv('HASH_POOL_QUEUE_DEPTH', 32))
+    HASH_POOL_TIMEOUT = 30  # seconds
+
+
+class ProductionConfig(Config):
+    pass
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///2CommunityApp_dev.db'
-    SECRET = os.getenv('DEV_SECRET_KEY', 'dev_default_secret_key')
+    SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URL', 'sqlite:///2CommunityApp_dev.db')
+    SECRET_KEY = os.getenv('DEV_SECRET_KEY', 'dev_default_secret_key')
     JWT_SECRET_KEY = os.getenv('DEV_JWT_SECRET_KEY', 'dev_default_jwt_secret_key')
     JWT_ACCESS_TOKEN_EXPIRES = 300 # 5 minutes
     JWT_REFRESH_TOKEN_EXPIRES = 660 # 11 minutes
+    AUTO_MIGRATE = True
 
 class TestingConfig(Config):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///2CommunityApp_test.db'
-    SECRET = os.getenv('TEST_SECRET_KEY', 'test_default_secret_key')
+    # in-memory by default: one private database per test process, see tests/conftest.py
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    SECRET_KEY = os.getenv('TEST_SECRET_KEY', 'test_default_secret_key')
+    JWT_SECRET_KEY = os.getenv('TEST_JWT_SECRET_KEY', 'test_default_jwt_secret_key_0123456')
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # fast hashing, tests only
+    HASH_POOL_ENABLED = False
+    RATE_LIMIT_ENABLED = False  # enabled by tests/test_auth/test_rate_limit.py
+    AUTO_MIGRATE = True
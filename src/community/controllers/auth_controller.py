@@ -1,7 +1,13 @@
+import math
 import secrets
 from sqlalchemy.exc import IntegrityError
 from community.controllers import BaseController
+from community.models.engine import write_transaction, writing
+from community.models.routing import mark_write, replica_read
 from community.models.user_model import UserRole, AdminIdentifierCode
+from community.utils.hash_pool import HashPoolSaturated
+from community.utils.jwt_utils import get_revocation_cache, now_ms
+from community.utils.passwords import hash_password
 
 
 class AuthController(BaseController):
@@ -10,6 +16,13 @@ class AuthController(BaseController):
         self.model_class = model_class
 
     def create(self, data: dict):
+        """Register a user.
+
+        The checks run in a read transaction and the password is hashed
+        before the write transaction, which only covers the INSERT: the
+        write lock is never held while hashing. A concurrent registration
+        of the same email fails on the unique constraint.
+        """
         existing_user = self.db_session.query(self.model_class).filter_by(email=data['email']).first()
         if existing_user:
             return {"error": "Email already registered"}, 409
@@ -35,11 +48,14 @@ class AuthController(BaseController):
             salt=salt,
             role=role
         )
+        self.db_session.rollback()  # end the read transaction before hashing
         user.set_password(data['password'], salt)
 
         try:
-            self.db_session.add(user)
-            self.db_session.commit()
+            with writing():
+                self.db_session.add(user)
+                self.db_session.commit()
+            mark_write(f"email:{data['email']}")
             return {"message": "User registered successfully"}, 201
         except IntegrityError:
             self.db_session.rollback()
@@ -62,34 +78,51 @@ class AuthController(BaseController):
         return {"error": "User not found"}, 404
 
     def update(self, item_id: int, data: dict):
-        user = self.db_session.query(self.model_class).get(item_id)
-        if not user:
-            return {"error": "User not found"}, 404
-
-        try:
-            for key in ['first_name', 'last_name', 'email']:
-                if key in data:
-                    setattr(user, key.replace('first_name', 'firstname').replace('last_name', 'lastname'), data[key])
-
-            if 'password' in data:
-                salt = secrets.token_hex(16)
-                user.set_password(data['password'], salt)
-                user.salt = salt
-
-            self.db_session.commit()
-            return {"message": "User updated successfully"}, 200
-        except Exception as e:
-            self.db_session.rollback()
-            return {"error": str(e)}, 500
-
+        password_hash = salt = valid_after = None
+        if 'password' in data:
+            # hashed before the write transaction: the write lock is never held while hashing
+            salt = secrets.token_hex(16)
+            password_hash = hash_password(data['password'] + salt)
+
+        with writing():
+            user = self.db_session.query(self.model_class).get(item_id)
+            if not user:
+                return {"error": "User not found"}, 404
+
+            try:
+                for key in ['first_name', 'last_name', 'email']:
+                    if key in data:
+                        setattr(user, key.replace('first_name', 'firstname').replace('last_name', 'lastname'),
+                                data[key])
+
+                if password_hash is not None:
+                    # the tokens issued with the old password are revoked in the same transaction
+                    user.password_hash = password_hash
+                    user.salt = salt
+                    user.tokens_valid_after = valid_after = now_ms()
+
+                self.db_session.commit()
+                if valid_after is not None:
+                    get_revocation_cache().store(item_id, valid_after)
+                mark_write(f"user:{item_id}", f"email:{user.email}")
+                return {"message": "User updated successfully"}, 200
+            except Exception as e:
+                self.db_session.rollback()
+                return {"error": str(e)}, 500
+
+    @write_transaction
     def delete(self, item_id: int):
         user = self.db_session.query(self.model_class).get(item_id)
         if not user:
             return {"error": "User not found"}, 404
 
         try:
+            email = user.email
             self.db_session.delete(user)
             self.db_session.commit()
+            # the tokens of a deleted user are rejected by every process, see load_valid_after
+            get_revocation_cache().store(item_id, math.inf)
+            mark_write(f"user:{item_id}", f"email:{email}")
             return {"message": "User deleted successfully"}, 200
         except Exception as e:
             self.db_session.rollback()
@@ -98,9 +131,34 @@ class AuthController(BaseController):
     def convert_dict_to_model(self, data: dict):
         return self.model_class(**data)
 
+    def authenticate(self, email: str, password: str):
+        """Return the user matching the credentials, or None.
+
+        Hashes made with an outdated method or cost are transparently
+        replaced by a hash using the configured PASSWORD_HASH_METHOD.
+        """
+        # primary read: the user may have registered a moment ago, and a rehash writes back
+        user = self.db_session.query(self.model_class).filter_by(email=email).first()
+        if not user or not user.check_password(password):
+            return None
+
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password, user.salt)
+                self.db_session.commit()
+            except HashPoolSaturated:
+                pass  # rehashed on a later login
+            except Exception:
+                self.db_session.rollback()
+        # the admin routes then check the revocation time without a query
+        get_revocation_cache().store(user.id, user.tokens_valid_after or 0)
+        return user
+
+    @replica_read("email:{0}")
     def get_by_email(self, email: str):
         return self.db_session.query(self.model_class).filter_by(email=email).first()
 
+    @replica_read("user:{0}")
     def get_by_id(self, user_id: int):
         user = self.db_session.query(self.model_class).filter_by(id=user_id).first()
         if not user:
@@ -1,39 +1,162 @@
-from datetime import datetime, timedelta
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from itertools import islice
 
+import numpy as np
 from flask import jsonify
 
 from community.models.contribution_model import (
+    ContributionMemberSummary,
+    ContributionMonthSummary,
     ContributionRun,
+    PayoutSlot,
     UserContributionRun,
     Contribution,
     ContributionStatus,
     UserMonthlyContribution,
     PaymentStatus
 )
+from community.models.engine import write_transaction
+from community.models.routing import mark_write, replica_read
 from community.models.user_model import User
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from community.simulation import SimulationError, payout_order
+from community.utils.response_cache import invalidate_responses
+from sqlalchemy import bindparam, case, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, contains_eager, joinedload
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# number of schedule rows written per INSERT statement
+GENERATION_CHUNK_SIZE = 1000
+# number of ids bound per UPDATE ... WHERE id IN (...) statement of a payment batch
+PAYMENT_BATCH_CHUNK_SIZE = 500
+# number of rows fetched at a time by the streaming exports
+STREAM_BATCH_SIZE = 1000
+
+
+@dataclass
+class ScheduledContribution:
+    """A cell of a lazy schedule that has not been persisted yet.
+
+    It exposes the attributes the routes read on ``Contribution`` and
+    ``UserMonthlyContribution`` so both can be serialized the same way.
+    """
+    contribution_run_id: int
+    user_contribution_run_id: int
+    user_id: int
+    month: date
+    amount: float
+    id: Optional[int] = None
+    contribution_id: Optional[int] = None
+    status: ContributionStatus = ContributionStatus.PENDING
+    payment_date: Optional[date] = None
+    winner_user_id: Optional[int] = None
+
+
+@dataclass
+class SummaryTotals:
+    """Amounts and cell counts of a session, a month or a member.
+
+    A cell is paid once ``paid_count`` reaches ``expected_count``; it is late
+    when its month started before the summary date and it is not paid.
+    """
+    expected: float = 0.0
+    collected: float = 0.0
+    cells: int = 0
+    paid_cells: int = 0
+    late_cells: int = 0
+    late_amount: float = 0.0
+
+    @property
+    def outstanding(self) -> float:
+        return self.expected - self.collected
+
+    def add(self, other: "SummaryTotals"):
+        self.expected += other.expected
+        self.collected += other.collected
+        self.cells += other.cells
+        self.paid_cells += other.paid_cells
+        self.late_cells += other.late_cells
+        self.late_amount += other.late_amount
+
+
+@dataclass
+class MonthSummary(SummaryTotals):
+    month: Optional[date] = None
+    winner_user_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class MemberSummary(SummaryTotals):
+    user_id: Optional[int] = None
+    user_contribution_run_id: Optional[int] = None
+    number_of_parts: int = 1
+    wins: int = 0
+
+
+@dataclass
+class SessionSummary:
+    session_id: int
+    as_of: date
+    totals: SummaryTotals
+    months: List[MonthSummary]
+    members: List[MemberSummary]
+
+
+def iter_schedule(
+        session: ContributionRun,
+        user_runs: List[Tuple[int, int, int]],
+        first_month: int = 0
+) -> Iterator[Tuple[date, int, int, float]]:
+    """Yield (month, user_contribution_run_id, user_id, amount) for every cell of a session.
+
+    ``user_runs`` holds (id, user_id, number_of_parts) tuples; the session
+    lasts one month per part. ``first_month`` skips the months before it.
+    """
+    months_duration = sum(parts for _, _, parts in user_runs)
+    for month_index in range(max(first_month, 0), months_duration):
+        contribution_month = session.start_date + timedelta(days=30 * month_index)
+        for user_contrib_id, user_id, parts in user_runs:
+            yield contribution_month, user_contrib_id, user_id, parts * session.minimal_contribution
+
+
+def iter_member_schedule(
+        session: ContributionRun,
+        user_contrib: UserContributionRun,
+        months_duration: int,
+        first_month: int = 0
+) -> Iterator[Tuple[date, int, int, float]]:
+    """Yield the cells of one member, as ``iter_schedule`` does for the whole session."""
+    amount = user_contrib.number_of_parts * session.minimal_contribution
+    for month_index in range(max(first_month, 0), months_duration):
+        yield session.start_date + timedelta(days=30 * month_index), user_contrib.id, user_contrib.user_id, amount
 
 
 class ContributionController:
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    @write_transaction
     def create_session(
             self,
             number_of_members: int,
             minimal_contribution: float,
-            start_date: datetime.date
+            start_date: datetime.date,
+            lazy_schedule: bool = False
     ) -> ContributionRun:
         session = ContributionRun(
             number_of_members=number_of_members,
             minimal_contribution=minimal_contribution,
-            start_date=start_date
+            start_date=start_date,
+            lazy_schedule=lazy_schedule
         )
         self.db_session.add(session)
         self.db_session.commit()
+        mark_write("sessions")
+        invalidate_responses("sessions")
         return session
 
+    @write_transaction
     def add_user_to_session(
             self,
             session_id: int,
@@ -55,97 +178,1101 @@ class ContributionController:
         )
         self.db_session.add(user_contrib)
         self.db_session.commit()
+        mark_write("sessions", f"session:{session_id}", f"user:{user_id}")
+        invalidate_responses(f"session:{session_id}")
         return user_contrib
 
-    def generate_monthly_contributions(self, session_id: int) -> None:
+    @write_transaction
+    def generate_monthly_contributions(
+            self,
+            session_id: int,
+            chunk_size: int = GENERATION_CHUNK_SIZE,
+            progress: Optional[Callable[[int, int], None]] = None
+    ) -> List[int]:
+        """Generate the monthly schedule of a session and return the new contribution ids.
+
+        The schedule is computed as column arrays and written with Core
+        ``insert()`` statements in chunks of ``chunk_size`` rows, instead of
+        one ORM object per member and per month.
+
+        Generation is incremental: only the (member, month) cells that do not
+        exist yet are written, so calling it again is a no-op and a member
+        added after a first generation only gets their own rows (plus the
+        extra months their parts add to the session).
+
+        Lazy sessions are never materialized here: their schedule is computed
+        on read and only paid, overridden or won cells are stored.
+
+        With ``progress`` (background jobs) every chunk is committed on its
+        own, then reported as ``progress(written_cells, total_cells)``; an
+        interrupted generation resumes where it stopped since it is
+        incremental.
+        """
         session = self.db_session.get(ContributionRun, session_id)
         if not session:
             raise ValueError("Session not found")
+        if session.lazy_schedule:
+            return []
 
-        total_parts = sum(uc.number_of_parts for uc in session.user_contributions)
-        months_duration = total_parts
-        for month_index in range(months_duration):
-            contribution_month = session.start_date + timedelta(days=30 * month_index)
+        user_runs = self._load_user_runs(session_id)
+        existing_cells = self._existing_cells(session_id)
 
-            for user_contrib in session.user_contributions:
-                amount = user_contrib.number_of_parts * session.minimal_contribution
+        # schedule as column arrays: one entry per missing (month, member) cell
+        user_contribution_run_ids = []
+        user_ids = []
+        months = []
+        amounts = []
+        for contribution_month, user_contrib_id, user_id, amount in iter_schedule(session, user_runs):
+            if (user_contrib_id, contribution_month) in existing_cells:
+                continue
+            user_contribution_run_ids.append(user_contrib_id)
+            user_ids.append(user_id)
+            months.append(contribution_month)
+            amounts.append(amount)
 
-                contribution = Contribution(
-                    contribution_run_id=session.id,
-                    user_contribution_run_id=user_contrib.id,
-                    month=contribution_month,
-                    amount=amount,
-                    status=ContributionStatus.PENDING
-                )
-                self.db_session.add(contribution)
-
-                user_monthly_contrib = UserMonthlyContribution(
-                    user_id=user_contrib.user_id,
-                    contribution=contribution,
-                    amount=amount,
-                    status=PaymentStatus.PENDING
-                )
-                self.db_session.add(user_monthly_contrib)
+        contribution_ids = []
+        for start in range(0, len(months), chunk_size):
+            end = start + chunk_size
+            inserted_ids = self.db_session.scalars(
+                insert(Contribution).returning(Contribution.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "contribution_run_id": session_id,
+                        "user_contribution_run_id": user_contrib_id,
+                        "month": month,
+                        "amount": amount,
+                        "status": ContributionStatus.PENDING,
+                        "expected_count": 1
+                    }
+                    for user_contrib_id, month, amount in zip(
+                        user_contribution_run_ids[start:end], months[start:end], amounts[start:end]
+                    )
+                ]
+            ).all()
+            self.db_session.execute(
+                insert(UserMonthlyContribution),
+                [
+                    {
+                        "user_id": user_id,
+                        "contribution_id": contribution_id,
+                        "amount": amount,
+                        "status": PaymentStatus.PENDING
+                    }
+                    for user_id, contribution_id, amount in zip(
+                        user_ids[start:end], inserted_ids, amounts[start:end]
+                    )
+                ]
+            )
+            contribution_ids.extend(inserted_ids)
+            self._add_to_summaries(
+                ((session_id, user_contrib_id, month, 1, 0, amount, 0.0)
+                 for user_contrib_id, month, amount in zip(
+                    user_contribution_run_ids[start:end], months[start:end], amounts[start:end]
+                )),
+                new_cells=True
+            )
+            if progress is not None:
+                self.db_session.commit()
+                progress(len(contribution_ids), len(months))
 
         self.db_session.commit()
+        mark_write(f"session:{session_id}", *(f"user:{user_id}" for _, user_id, _ in user_runs))
+        invalidate_responses(f"session:{session_id}")
+        return contribution_ids
+
+    def _add_to_summaries(self, deltas, new_cells: bool = False):
+        """Apply cell deltas to the month and member summaries of their sessions.
+
+        ``deltas`` holds (session_id, user_contribution_run_id, month, cells,
+        paid_cells, expected_amount, paid_amount) tuples. With ``new_cells``
+        the missing summary rows are created first; payments only touch
+        cells that already exist, so their summary rows exist too.
+        """
+        by_month = {}
+        by_member = {}
+        for session_id, ucr_id, month, *values in deltas:
+            for key, totals in (((session_id, month), by_month), ((session_id, ucr_id), by_member)):
+                current = totals.get(key, (0, 0, 0.0, 0.0))
+                totals[key] = tuple(a + b for a, b in zip(current, values))
+        if not by_month:
+            return
+
+        if new_cells:
+            for session_id in {session_id for session_id, _ in by_month}:
+                existing_months = set(self.db_session.scalars(
+                    select(ContributionMonthSummary.month)
+                    .where(ContributionMonthSummary.contribution_run_id == session_id)
+                ))
+                existing_members = set(self.db_session.scalars(
+                    select(ContributionMemberSummary.user_contribution_run_id)
+                    .where(ContributionMemberSummary.contribution_run_id == session_id)
+                ))
+                missing_months = [
+                    {"contribution_run_id": session_id, "month": month}
+                    for s_id, month in by_month if s_id == session_id and month not in existing_months
+                ]
+                missing_members = [
+                    {"contribution_run_id": session_id, "user_contribution_run_id": ucr_id}
+                    for s_id, ucr_id in by_member if s_id == session_id and ucr_id not in existing_members
+                ]
+                if missing_months:
+                    self.db_session.execute(insert(ContributionMonthSummary), missing_months)
+                if missing_members:
+                    self.db_session.execute(insert(ContributionMemberSummary), missing_members)
+
+        def increments(table):
+            return dict(
+                cells=table.c.cells + bindparam("d_cells"),
+                paid_cells=table.c.paid_cells + bindparam("d_paid_cells"),
+                expected_amount=table.c.expected_amount + bindparam("d_expected"),
+                paid_amount=table.c.paid_amount + bindparam("d_paid")
+            )
+
+        def params(values):
+            return dict(zip(("d_cells", "d_paid_cells", "d_expected", "d_paid"), values))
+
+        months = ContributionMonthSummary.__table__
+        self.db_session.execute(
+            update(months)
+            .where(months.c.contribution_run_id == bindparam("s_id"), months.c.month == bindparam("s_month"))
+            .values(**increments(months)),
+            [dict(params(values), s_id=session_id, s_month=month) for (session_id, month), values in by_month.items()]
+        )
+        members = ContributionMemberSummary.__table__
+        self.db_session.execute(
+            update(members)
+            .where(members.c.user_contribution_run_id == bindparam("s_ucr"))
+            .values(**increments(members)),
+            [dict(params(values), s_ucr=ucr_id) for (_, ucr_id), values in by_member.items()]
+        )
+
+    def _rebuild_wins(self, session_id: Optional[int] = None):
+        """Recompute the ``wins`` counters of session members from the won contributions."""
+        wins = (
+            select(func.count(Contribution.id))
+            .where(
+                Contribution.contribution_run_id == UserContributionRun.contribution_run_id,
+                Contribution.winner_user_id == UserContributionRun.user_id
+            )
+            .scalar_subquery()
+        )
+        query = update(UserContributionRun).values(wins=wins).execution_options(synchronize_session=False)
+        if session_id is not None:
+            query = query.where(UserContributionRun.contribution_run_id == session_id)
+        self.db_session.execute(query)
+
+    @write_transaction
+    def rebuild_session_summaries(self, session_id: Optional[int] = None):
+        """Recompute the month and member summaries from the contribution counters (all sessions by default)."""
+        paid_cell = case(((Contribution.expected_count > 0)
+                          & (Contribution.paid_count >= Contribution.expected_count), 1), else_=0)
+        aggregates = (func.count(), func.sum(paid_cell), func.sum(Contribution.amount),
+                      func.sum(Contribution.paid_amount))
+        month_rows = select(Contribution.contribution_run_id, Contribution.month, *aggregates).group_by(
+            Contribution.contribution_run_id, Contribution.month
+        )
+        member_rows = select(Contribution.user_contribution_run_id, Contribution.contribution_run_id,
+                             *aggregates).group_by(Contribution.user_contribution_run_id,
+                                                   Contribution.contribution_run_id)
+        delete_months = ContributionMonthSummary.__table__.delete()
+        delete_members = ContributionMemberSummary.__table__.delete()
+        if session_id is not None:
+            month_rows = month_rows.where(Contribution.contribution_run_id == session_id)
+            member_rows = member_rows.where(Contribution.contribution_run_id == session_id)
+            delete_months = delete_months.where(ContributionMonthSummary.contribution_run_id == session_id)
+            delete_members = delete_members.where(ContributionMemberSummary.contribution_run_id == session_id)
+
+        columns = ("cells", "paid_cells", "expected_amount", "paid_amount")
+        self.db_session.execute(delete_months)
+        self.db_session.execute(delete_members)
+        self.db_session.execute(insert(ContributionMonthSummary).from_select(
+            ("contribution_run_id", "month", *columns), month_rows
+        ))
+        self.db_session.execute(insert(ContributionMemberSummary).from_select(
+            ("user_contribution_run_id", "contribution_run_id", *columns), member_rows
+        ))
+
+    def _load_user_runs(self, session_id: int) -> List[Tuple[int, int, int]]:
+        return self.db_session.execute(
+            select(
+                UserContributionRun.id,
+                UserContributionRun.user_id,
+                UserContributionRun.number_of_parts
+            ).where(UserContributionRun.contribution_run_id == session_id)
+            .order_by(UserContributionRun.id)
+        ).all()
+
+    def _load_user_runs_of_sessions(self, session_ids: List[int]) -> dict:
+        """Same as ``_load_user_runs`` for several sessions in one query, keyed by session id."""
+        user_runs = {session_id: [] for session_id in session_ids}
+        rows = self.db_session.execute(
+            select(
+                UserContributionRun.contribution_run_id,
+                UserContributionRun.id,
+                UserContributionRun.user_id,
+                UserContributionRun.number_of_parts
+            ).where(UserContributionRun.contribution_run_id.in_(session_ids))
+            .order_by(UserContributionRun.id)
+        )
+        for session_id, user_contrib_id, user_id, parts in rows:
+            user_runs[session_id].append((user_contrib_id, user_id, parts))
+        return user_runs
+
+    def _existing_cells(self, session_id: int) -> set:
+        """(user_contribution_run_id, month) pairs already stored, read from the uq_contribution_cell index."""
+        return set(self.db_session.execute(
+            select(Contribution.user_contribution_run_id, Contribution.month)
+            .where(Contribution.contribution_run_id == session_id)
+        ).all())
+
+    @write_transaction
+    def materialize_cell(
+            self,
+            session_id: int,
+            user_id: int,
+            month: date,
+            amount: Optional[float] = None
+    ) -> UserMonthlyContribution:
+        """Persist one (member, month) cell of a session and return its payment row.
+
+        Used for lazy sessions before recording a payment, an amount override
+        or a winner. An existing cell is returned as is, unless ``amount``
+        overrides it.
+        """
+        session = self.db_session.get(ContributionRun, session_id)
+        if not session:
+            raise ValueError("Session not found")
+
+        user_contrib = self.db_session.execute(
+            select(UserContributionRun).filter_by(contribution_run_id=session_id, user_id=user_id)
+        ).scalar_one_or_none()
+        if not user_contrib:
+            raise ValueError("Utilisateur ne fait pas partie de la session")
+
+        user_runs = self._load_user_runs(session_id)
+        scheduled_months = {cell_month for cell_month, _, _, _ in iter_schedule(session, user_runs)}
+        if month not in scheduled_months:
+            raise ValueError("Mois hors du calendrier de la session")
 
+        payment = self.db_session.execute(
+            select(UserMonthlyContribution).join(UserMonthlyContribution.contribution).where(
+                Contribution.contribution_run_id == session_id,
+                Contribution.user_contribution_run_id == user_contrib.id,
+                Contribution.month == month
+            )
+        ).scalar_one_or_none()
 
+        if payment is None:
+            cell_amount = user_contrib.number_of_parts * session.minimal_contribution if amount is None else amount
+            contribution = Contribution(
+                contribution_run_id=session_id,
+                user_contribution_run_id=user_contrib.id,
+                month=month,
+                amount=cell_amount,
+                status=ContributionStatus.PENDING,
+                expected_count=1
+            )
+            payment = UserMonthlyContribution(
+                user_id=user_id,
+                contribution=contribution,
+                amount=cell_amount,
+                status=PaymentStatus.PENDING
+            )
+            self.db_session.add_all([contribution, payment])
+            self._add_to_summaries([(session_id, user_contrib.id, month, 1, 0, cell_amount, 0.0)], new_cells=True)
+        elif amount is not None:
+            self._add_to_summaries([(session_id, user_contrib.id, month, 0, 0, amount - payment.contribution.amount,
+                                     0.0)])
+            payment.amount = amount
+            payment.contribution.amount = amount
+
+        self.db_session.commit()
+        mark_write(f"session:{session_id}", f"user:{user_id}")
+        invalidate_responses(f"session:{session_id}")
+        return payment
+
+    @write_transaction
     def record_payment(
             self,
             user_monthly_contrib_id: int,
             payment_date: Optional[datetime.date] = None
     ) -> UserMonthlyContribution:
+        """Mark a payment as PAID and settle its contribution in constant time.
+
+        The PENDING -> PAID transition is a guarded UPDATE, so only the first
+        of concurrent payments of the same row bumps the contribution
+        counters; settlement then compares ``paid_count`` with
+        ``expected_count`` instead of loading every payment of the
+        contribution.
+        """
         payment = self.db_session.get(UserMonthlyContribution, user_monthly_contrib_id)
         if not payment:
             raise ValueError("Paiement non trouvé")
 
-        payment.status = PaymentStatus.PAID
-        payment.payment_date = payment_date or datetime.utcnow().date()
+        paid = self.db_session.execute(
+            update(UserMonthlyContribution)
+            .where(
+                UserMonthlyContribution.id == payment.id,
+                UserMonthlyContribution.status != PaymentStatus.PAID
+            )
+            .values(status=PaymentStatus.PAID, payment_date=payment_date or datetime.utcnow().date())
+        ).rowcount
 
-        contribution = payment.contribution
-        unpaid = [
-            u for u in contribution.user_monthly_contributions
-            if u.status != PaymentStatus.PAID
-        ]
-        if not unpaid:
-            contribution.status = ContributionStatus.PAID
+        session_id = None
+        if paid:
+            session_id, user_contrib_id, month, paid_count, expected_count = self.db_session.execute(
+                update(Contribution)
+                .where(Contribution.id == payment.contribution_id)
+                .values(
+                    paid_count=Contribution.paid_count + 1,
+                    paid_amount=Contribution.paid_amount + payment.amount
+                )
+                .returning(
+                    Contribution.contribution_run_id,
+                    Contribution.user_contribution_run_id,
+                    Contribution.month,
+                    Contribution.paid_count,
+                    Contribution.expected_count
+                )
+            ).one()
+            settled = int(paid_count == expected_count)  # the cell just became fully paid
+            self._add_to_summaries([(session_id, user_contrib_id, month, 0, settled, 0.0, payment.amount)])
+            self.db_session.execute(
+                update(Contribution)
+                .where(
+                    Contribution.id == payment.contribution_id,
+                    Contribution.status == ContributionStatus.PENDING,
+                    Contribution.paid_count >= Contribution.expected_count
+                )
+                .values(status=ContributionStatus.PAID)
+            )
 
+        user_id = payment.user_id
         self.db_session.commit()
+        if session_id is not None:
+            mark_write(f"session:{session_id}", f"user:{user_id}")
+            invalidate_responses(f"session:{session_id}")
         return payment
 
+    @write_transaction
+    def record_payments_batch(
+            self,
+            items: List[Tuple[int, Optional[date]]],
+            chunk_size: int = PAYMENT_BATCH_CHUNK_SIZE
+    ) -> List[dict]:
+        """Record many payments in one transaction and return one result per item.
+
+        ``items`` holds (user_monthly_contrib_id, payment_date) pairs. Payments
+        are flipped with set-based UPDATE ... RETURNING statements grouped by
+        payment date, then the counters and the settlement status of every
+        affected contribution are updated in one pass. Each result carries the
+        item ``status``: ``PAID``, ``ALREADY_PAID``, ``NOT_FOUND`` or
+        ``DUPLICATE`` (same id earlier in the batch).
+        """
+        today = datetime.utcnow().date()
+        results = []
+        ids_by_date = {}
+        seen = set()
+        for payment_id, payment_date in items:
+            result = {"user_monthly_contrib_id": payment_id, "status": None}
+            results.append(result)
+            if payment_id in seen:
+                result["status"] = "DUPLICATE"
+                continue
+            seen.add(payment_id)
+            ids_by_date.setdefault(payment_date or today, []).append(payment_id)
+
+        paid_ids = set()
+        totals_by_contribution = {}
+        for payment_date, payment_ids in ids_by_date.items():
+            for start in range(0, len(payment_ids), chunk_size):
+                updated = self.db_session.execute(
+                    update(UserMonthlyContribution)
+                    .where(
+                        UserMonthlyContribution.id.in_(payment_ids[start:start + chunk_size]),
+                        UserMonthlyContribution.status != PaymentStatus.PAID
+                    )
+                    .values(status=PaymentStatus.PAID, payment_date=payment_date)
+                    .returning(
+                        UserMonthlyContribution.id,
+                        UserMonthlyContribution.contribution_id,
+                        UserMonthlyContribution.amount
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                for payment_id, contribution_id, amount in updated:
+                    paid_ids.add(payment_id)
+                    count, total = totals_by_contribution.get(contribution_id, (0, 0.0))
+                    totals_by_contribution[contribution_id] = (count + 1, total + amount)
+
+        # ids that were not flipped: either already paid or unknown
+        remaining = [r["user_monthly_contrib_id"] for r in results
+                     if r["status"] is None and r["user_monthly_contrib_id"] not in paid_ids]
+        existing_ids = set()
+        for start in range(0, len(remaining), chunk_size):
+            existing_ids.update(self.db_session.scalars(
+                select(UserMonthlyContribution.id)
+                .where(UserMonthlyContribution.id.in_(remaining[start:start + chunk_size]))
+            ))
+
+        if totals_by_contribution:
+            contributions = Contribution.__table__
+            self.db_session.execute(
+                update(contributions)
+                .where(contributions.c.id == bindparam("contribution_id"))
+                .values(
+                    paid_count=contributions.c.paid_count + bindparam("count"),
+                    paid_amount=contributions.c.paid_amount + bindparam("total")
+                ),
+                [
+                    {"contribution_id": contribution_id, "count": count, "total": total}
+                    for contribution_id, (count, total) in totals_by_contribution.items()
+                ]
+            )
+            contribution_ids = list(totals_by_contribution)
+            summary_deltas = []
+            for start in range(0, len(contribution_ids), chunk_size):
+                self.db_session.execute(
+                    update(Contribution)
+                    .where(
+                        Contribution.id.in_(contribution_ids[start:start + chunk_size]),
+                        Contribution.status == ContributionStatus.PENDING,
+                        Contribution.paid_count >= Contribution.expected_count
+                    )
+                    .values(status=ContributionStatus.PAID)
+                    .execution_options(synchronize_session=False)
+                )
+                for contribution_id, session_id, user_contrib_id, month, paid_count, expected_count in (
+                    self.db_session.execute(
+                        select(Contribution.id, Contribution.contribution_run_id,
+                               Contribution.user_contribution_run_id, Contribution.month,
+                               Contribution.paid_count, Contribution.expected_count)
+                        .where(Contribution.id.in_(contribution_ids[start:start + chunk_size]))
+                    )
+                ):
+                    count, total = totals_by_contribution[contribution_id]
+                    # fully paid now, and not before this batch
+                    settled = int(0 < expected_count <= paid_count < expected_count + count)
+                    summary_deltas.append((session_id, user_contrib_id, month, 0, settled, 0.0, total))
+            self._add_to_summaries(summary_deltas)
+
+        self.db_session.commit()
+        mark_write("*")
+        invalidate_responses("*")
+
+        for result in results:
+            if result["status"] is not None:
+                continue
+            payment_id = result["user_monthly_contrib_id"]
+            if payment_id in paid_ids:
+                result["status"] = "PAID"
+            elif payment_id in existing_ids:
+                result["status"] = "ALREADY_PAID"
+            else:
+                result["status"] = "NOT_FOUND"
+        return results
+
+    @write_transaction
+    def rebuild_contribution_counters(self, session_id: Optional[int] = None, dry_run: bool = False) -> List[int]:
+        """Recompute the payment counters of contributions from their payments.
+
+        Returns the ids of the contributions whose counters or settlement
+        status were out of date; they are fixed unless ``dry_run`` is set,
+        and the session summaries are then recomputed from the counters.
+        """
+        paid = UserMonthlyContribution.status == PaymentStatus.PAID
+        totals = (
+            select(
+                UserMonthlyContribution.contribution_id.label("contribution_id"),
+                func.count().label("expected_count"),
+                func.sum(case((paid, 1), else_=0)).label("paid_count"),
+                func.sum(case((paid, UserMonthlyContribution.amount), else_=0.0)).label("paid_amount")
+            )
+            .group_by(UserMonthlyContribution.contribution_id)
+            .subquery()
+        )
+        query = select(
+            Contribution.id,
+            Contribution.status,
+            Contribution.expected_count,
+            Contribution.paid_count,
+            Contribution.paid_amount,
+            func.coalesce(totals.c.expected_count, 0),
+            func.coalesce(totals.c.paid_count, 0),
+            func.coalesce(totals.c.paid_amount, 0.0)
+        ).outerjoin(totals, totals.c.contribution_id == Contribution.id)
+        if session_id is not None:
+            query = query.where(Contribution.contribution_run_id == session_id)
+
+        fixes = []
+        for (contribution_id, status, expected_count, paid_count, paid_amount,
+             real_expected, real_paid, real_amount) in self.db_session.execute(query):
+            real_status = status
+            if status != ContributionStatus.RECEIVED:
+                settled = real_expected > 0 and real_paid >= real_expected
+                real_status = ContributionStatus.PAID if settled else ContributionStatus.PENDING
+            if (expected_count, paid_count, paid_amount, status) != (real_expected, real_paid, real_amount,
+                                                                     real_status):
+                fixes.append({
+                    "id": contribution_id,
+                    "expected_count": real_expected,
+                    "paid_count": real_paid,
+                    "paid_amount": real_amount,
+                    "status": real_status
+                })
+
+        if not dry_run:
+            if fixes:
+                self.db_session.execute(update(Contribution), fixes)
+            self.rebuild_session_summaries(session_id)
+            self._rebuild_wins(session_id)
+            self.db_session.commit()
+            mark_write("*")
+            invalidate_responses("*")
+        return [fix["id"] for fix in fixes]
+
+    @write_transaction
     def set_month_winner(self, contribution_id: int, winner_user_id: int) -> Contribution:
+        """Give the pot of a contribution's month to ``winner_user_id``.
+
+        A member wins at most once per part: the ``wins`` counter of their
+        membership is bumped by a guarded UPDATE. A month has a single
+        winner, and when ``schedule_winners`` planned the month only the
+        planned member can win it.
+        """
         contribution = self.db_session.get(Contribution, contribution_id)
         if not contribution:
             raise ValueError("Contribution non trouvée")
+        session_id = contribution.contribution_run_id
 
-        session_user_ids = [
-            uc.user_id for uc in contribution.contribution_run.user_contributions
-        ]
-        if winner_user_id not in session_user_ids:
+        member = self._member(session_id, winner_user_id)
+        if member is None:
             raise ValueError("Utilisateur gagnant ne fait pas partie de la session")
+        if contribution.winner_user_id == winner_user_id:
+            return contribution
+
+        if self._month_winner_cell(session_id, contribution.month, exclude_id=contribution.id) is not None:
+            raise ValueError("Ce mois a déjà un gagnant")
+        slot = self.db_session.get(PayoutSlot, (session_id, contribution.month))
+        if slot is not None and slot.user_contribution_run_id != member.id:
+            raise ValueError("Ce mois est attribué à un autre membre par le calendrier des gagnants")
+
+        won = self.db_session.execute(
+            update(UserContributionRun)
+            .where(UserContributionRun.id == member.id, UserContributionRun.wins < UserContributionRun.number_of_parts)
+            .values(wins=UserContributionRun.wins + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not won:
+            self.db_session.rollback()
+            raise ValueError("Ce membre a déjà gagné autant de fois qu'il a de parts")
+        if contribution.winner_user_id is not None:
+            # le mois change de gagnant: l'ancien retrouve une part éligible
+            self.db_session.execute(
+                update(UserContributionRun)
+                .where(
+                    UserContributionRun.contribution_run_id == session_id,
+                    UserContributionRun.user_id == contribution.winner_user_id,
+                    UserContributionRun.wins > 0
+                )
+                .values(wins=UserContributionRun.wins - 1)
+                .execution_options(synchronize_session=False)
+            )
 
         contribution.winner_user_id = winner_user_id
         contribution.status = ContributionStatus.RECEIVED
 
         self.db_session.commit()
+        mark_write(f"session:{session_id}")
+        invalidate_responses(f"session:{session_id}")
         return contribution
 
-    def list_sessions(self) -> List[ContributionRun]:
-        return self.db_session.query(ContributionRun).all()
+    def _member(self, session_id: int, user_id: int) -> Optional[UserContributionRun]:
+        return self.db_session.execute(
+            select(UserContributionRun).filter_by(contribution_run_id=session_id, user_id=user_id)
+        ).scalar_one_or_none()
+
+    def _month_winner_cell(self, session_id: int, month: date, exclude_id: Optional[int] = None):
+        """(contribution id, winner user id) of the month's won cell, if any."""
+        query = select(Contribution.id, Contribution.winner_user_id).where(
+            Contribution.contribution_run_id == session_id,
+            Contribution.status == ContributionStatus.RECEIVED,
+            Contribution.month == month,
+            Contribution.winner_user_id.isnot(None)
+        )
+        if exclude_id is not None:
+            query = query.where(Contribution.id != exclude_id)
+        return self.db_session.execute(query.limit(1)).first()
+
+    @write_transaction
+    def schedule_winners(
+            self,
+            session_id: int,
+            method: str = "random",
+            seed: Optional[int] = None,
+            order: Optional[List[int]] = None,
+            bids: Optional[List[Tuple[int, float]]] = None
+    ) -> List[PayoutSlot]:
+        """Assign the whole payout order of a session up front, one month per part.
+
+        ``method`` is ``random`` (draw seeded with ``seed``), ``fixed``
+        (``order`` lists a user id per part, members in joining order by
+        default) or ``bidding`` (``bids`` holds (user_id, amount) pairs, at
+        most one per remaining part: the highest bids get the earliest open
+        months, the parts without a bid are drawn at random after them).
+        Months that already have a winner keep it; the previous plan is
+        replaced.
+        """
+        session = self.db_session.get(ContributionRun, session_id)
+        if not session:
+            raise ValueError("Session not found")
 
-    def get_session_contributions(self, session_id: int) -> List[Contribution]:
-        return self.db_session.query(Contribution).filter_by(
+        members = self.db_session.execute(
+            select(UserContributionRun.id, UserContributionRun.user_id,
+                   UserContributionRun.number_of_parts, UserContributionRun.wins)
+            .where(UserContributionRun.contribution_run_id == session_id)
+            .order_by(UserContributionRun.id)
+        ).all()
+        if not members:
+            raise ValueError("La session n'a aucun membre")
+        index_of_user = {user_id: index for index, (_, user_id, _, _) in enumerate(members)}
+        months = [session.start_date + timedelta(days=30 * index)
+                  for index in range(sum(m.number_of_parts for m in members))]
+
+        won = dict(self.db_session.execute(
+            select(Contribution.month, Contribution.winner_user_id).where(
+                Contribution.contribution_run_id == session_id,
+                Contribution.status == ContributionStatus.RECEIVED,
+                Contribution.winner_user_id.isnot(None)
+            )
+        ).all())
+        open_months = [month for month in months if month not in won]
+        parts_left = np.array([max(m.number_of_parts - m.wins, 0) for m in members], dtype=np.int64)
+        if int(parts_left.sum()) != len(open_months):
+            raise ValueError("Les gains enregistrés ne correspondent pas au calendrier de la session")
+
+        def indexes(user_ids):
+            unknown = [user_id for user_id in user_ids if user_id not in index_of_user]
+            if unknown:
+                raise SimulationError(f"Utilisateurs hors de la session: {unknown}")
+            return [index_of_user[user_id] for user_id in user_ids]
+
+        if method == "random":
+            winners = payout_order(parts_left, "random", seed)
+        elif method == "fixed":
+            winners = payout_order(parts_left, indexes(order) if order is not None else "fixed")
+        elif method == "bidding":
+            bids = sorted(bids or [], key=lambda bid: -bid[1])  # tri stable: à égalité, premier arrivé
+            bidders = indexes([user_id for user_id, _ in bids])
+            rest = parts_left - np.bincount(bidders, minlength=len(members)).astype(np.int64)
+            if (rest < 0).any():
+                raise SimulationError("Au plus une enchère par part restante")
+            winners = np.concatenate([np.array(bidders, dtype=np.int64), payout_order(rest, "random", seed)])
+        else:
+            raise SimulationError("method doit être random, fixed ou bidding")
+
+        bid_amounts = [amount for _, amount in bids] if method == "bidding" else []
+        ucr_of_user = {m.user_id: m.id for m in members}
+        slots = [
+            {"contribution_run_id": session_id, "month": month, "user_contribution_run_id": ucr_of_user[user_id],
+             "bid": None}
+            for month, user_id in won.items() if user_id in ucr_of_user
+        ] + [
+            {"contribution_run_id": session_id, "month": month, "user_contribution_run_id": members[index].id,
+             "bid": bid_amounts[position] if position < len(bid_amounts) else None}
+            for position, (month, index) in enumerate(zip(open_months, winners.tolist()))
+        ]
+        self.db_session.execute(PayoutSlot.__table__.delete().where(PayoutSlot.contribution_run_id == session_id))
+        self.db_session.execute(insert(PayoutSlot), slots)
+        self.db_session.commit()
+        mark_write(f"session:{session_id}")
+        invalidate_responses(f"session:{session_id}")
+        return self.get_payout_schedule(session_id)
+
+    @replica_read("session:{0}")
+    def get_payout_schedule(self, session_id: int) -> List[PayoutSlot]:
+        """Planned winner of each month, ordered by month."""
+        return self.db_session.scalars(
+            select(PayoutSlot)
+            .options(joinedload(PayoutSlot.user_contribution_run).load_only(UserContributionRun.user_id))
+            .where(PayoutSlot.contribution_run_id == session_id)
+            .order_by(PayoutSlot.month)
+        ).all()
+
+    @replica_read("session:{0}")
+    def eligible_winners(self, session_id: int, month: date) -> List[int]:
+        """User ids that may win ``month``.
+
+        Nobody once the month has a winner; the planned member when
+        ``schedule_winners`` assigned it (a primary key lookup); otherwise the
+        members whose ``wins`` counter is below their number of parts.
+        """
+        if self._month_winner_cell(session_id, month) is not None:
+            return []
+        slot = self.db_session.get(PayoutSlot, (session_id, month))
+        if slot is not None:
+            return [slot.user_contribution_run.user_id]
+        return list(self.db_session.scalars(
+            select(UserContributionRun.user_id)
+            .where(
+                UserContributionRun.contribution_run_id == session_id,
+                UserContributionRun.wins < UserContributionRun.number_of_parts
+            )
+            .order_by(UserContributionRun.id)
+        ))
+
+    @replica_read("sessions")
+    def list_sessions(self, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[ContributionRun]:
+        """Sessions ordered by id; ``after_id``/``limit`` select a keyset page."""
+        query = self.db_session.query(ContributionRun)
+        if after_id is not None:
+            query = query.filter(ContributionRun.id > after_id)
+        if limit is not None:
+            query = query.order_by(ContributionRun.id).limit(limit)
+        return query.all()
+
+    @replica_read("session:{0}")
+    def get_session_contributions(
+            self,
+            session_id: int,
+            after: Optional[Tuple[date, int]] = None,
+            limit: Optional[int] = None
+    ) -> List[Contribution]:
+        """Contributions of a session; for a lazy session, stored rows merged with the virtual schedule.
+
+        Pages are keyed on (month, user_contribution_run_id), which is unique
+        per session for stored and virtual cells alike. A lazy page only
+        builds the ``limit`` virtual cells after the cursor and reads the
+        stored rows up to the last of them.
+        """
+        session = self.db_session.get(ContributionRun, session_id)
+        lazy = session is not None and session.lazy_schedule
+
+        query = self.db_session.query(Contribution).options(
+            joinedload(Contribution.user_contribution_run).load_only(UserContributionRun.user_id)
+        ).filter_by(
             contribution_run_id=session_id
+        )
+        cell_key = tuple_(Contribution.month, Contribution.user_contribution_run_id)
+        if after is not None:
+            query = query.filter(cell_key > tuple_(*after))
+        if limit is not None:
+            query = query.order_by(Contribution.month, Contribution.user_contribution_run_id)
+        if not lazy:
+            return (query.limit(limit) if limit is not None else query).all()
+
+        # virtual cells of the page window only: from the cursor month, at most ``limit`` of them
+        first_month = (after[0] - session.start_date).days // 30 if after is not None else 0
+        cells = iter_schedule(session, self._load_user_runs(session_id), first_month)
+        if after is not None:
+            cells = (cell for cell in cells if (cell[0], cell[1]) > after)
+        if limit is not None:
+            cells = list(islice(cells, limit))
+            if len(cells) == limit:
+                # the page ends at the last virtual cell at the latest
+                query = query.filter(cell_key <= tuple_(cells[-1][0], cells[-1][1]))
+            query = query.limit(limit)
+        contributions = query.all()
+
+        stored = {(c.user_contribution_run_id, c.month) for c in contributions}
+        merged = list(contributions)
+        for month, user_contrib_id, user_id, amount in cells:
+            if (user_contrib_id, month) not in stored:
+                merged.append(ScheduledContribution(
+                    contribution_run_id=session_id,
+                    user_contribution_run_id=user_contrib_id,
+                    user_id=user_id,
+                    month=month,
+                    amount=amount
+                ))
+        merged.sort(key=lambda c: (c.month, c.user_contribution_run_id))
+        return merged[:limit] if limit is not None else merged
+
+    @replica_read("user:{0}")
+    def get_user_payments(
+            self,
+            user_id: int,
+            after: Optional[Tuple[date, int]] = None,
+            limit: Optional[int] = None
+    ) -> List[UserMonthlyContribution]:
+        """Payments of a user, with the virtual cells of the lazy sessions the user belongs to.
+
+        Pages are keyed on the (month, user_contribution_run_id) of the cell.
+        A lazy page only builds the user's ``limit`` first virtual cells after
+        the cursor and reads the stored payments up to the last of them.
+        """
+        lazy_runs = self.db_session.query(UserContributionRun).join(
+            UserContributionRun.contribution_run
+        ).options(
+            contains_eager(UserContributionRun.contribution_run)
+        ).filter(
+            UserContributionRun.user_id == user_id,
+            ContributionRun.lazy_schedule.is_(True)
         ).all()
 
-    def get_user_payments(self, user_id: int) -> List[UserMonthlyContribution]:
-        return self.db_session.query(UserMonthlyContribution).filter_by(
-            user_id=user_id
+        query = self.db_session.query(UserMonthlyContribution).join(
+            UserMonthlyContribution.contribution
+        ).options(
+            contains_eager(UserMonthlyContribution.contribution)
+        ).filter(
+            UserMonthlyContribution.user_id == user_id
+        )
+        cell_key = tuple_(Contribution.month, Contribution.user_contribution_run_id)
+        if after is not None:
+            query = query.filter(cell_key > tuple_(*after))
+        if limit is not None:
+            query = query.order_by(Contribution.month, Contribution.user_contribution_run_id)
+        if not lazy_runs:
+            return (query.limit(limit) if limit is not None else query).all()
+
+        # the user's cells only, from the cursor month, at most ``limit`` of them
+        durations = dict(self.db_session.execute(
+            select(UserContributionRun.contribution_run_id, func.sum(UserContributionRun.number_of_parts))
+            .where(UserContributionRun.contribution_run_id.in_([uc.contribution_run_id for uc in lazy_runs]))
+            .group_by(UserContributionRun.contribution_run_id)
+        ).all())
+        schedules = []
+        for user_contrib in lazy_runs:
+            session = user_contrib.contribution_run
+            first_month = (after[0] - session.start_date).days // 30 if after is not None else 0
+            schedules.append(iter_member_schedule(session, user_contrib, durations[session.id], first_month))
+        cells = heapq.merge(*schedules, key=lambda cell: (cell[0], cell[1]))
+        if after is not None:
+            cells = (cell for cell in cells if (cell[0], cell[1]) > after)
+        if limit is not None:
+            cells = list(islice(cells, limit))
+            if len(cells) == limit:
+                # the page ends at the last virtual cell at the latest
+                query = query.filter(cell_key <= tuple_(cells[-1][0], cells[-1][1]))
+            query = query.limit(limit)
+        payments = query.all()
+
+        stored = {(p.contribution.user_contribution_run_id, p.contribution.month) for p in payments}
+        session_ids = {uc.id: uc.contribution_run_id for uc in lazy_runs}
+        merged = list(payments)
+        for month, user_contrib_id, _, amount in cells:
+            if (user_contrib_id, month) not in stored:
+                merged.append(ScheduledContribution(
+                    contribution_run_id=session_ids[user_contrib_id],
+                    user_contribution_run_id=user_contrib_id,
+                    user_id=user_id,
+                    month=month,
+                    amount=amount
+                ))
+        if limit is None:
+            return merged
+        merged.sort(key=lambda p: (p.month, p.user_contribution_run_id))
+        return merged[:limit]
+
+    @replica_read("session:{0}")
+    def iter_session_contributions(self, session_id: int, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+        """Stream the contributions of a session, ``batch_size`` rows at a time.
+
+        Same items as ``get_session_contributions`` without building the list;
+        for a lazy session only the (few) stored cells are held in memory.
+        """
+        session = self.db_session.get(ContributionRun, session_id)
+        query = self.db_session.query(Contribution).options(
+            joinedload(Contribution.user_contribution_run).load_only(UserContributionRun.user_id)
+        ).filter_by(
+            contribution_run_id=session_id
+        ).order_by(Contribution.month, Contribution.user_contribution_run_id)
+
+        if session is None or not session.lazy_schedule:
+            yield from query.yield_per(batch_size)
+            return
+
+        stored = {(c.user_contribution_run_id, c.month): c for c in query}
+        for month, user_contrib_id, user_id, amount in iter_schedule(session, self._load_user_runs(session_id)):
+            contribution = stored.get((user_contrib_id, month))
+            yield contribution or ScheduledContribution(
+                contribution_run_id=session_id,
+                user_contribution_run_id=user_contrib_id,
+                user_id=user_id,
+                month=month,
+                amount=amount
+            )
+
+    @replica_read("user:{0}")
+    def iter_user_payments(self, user_id: int, batch_size: int = STREAM_BATCH_SIZE) -> Iterator:
+        """Stream the payments of a user, then the virtual cells of their lazy sessions."""
+        lazy_runs = self.db_session.query(UserContributionRun).join(
+            UserContributionRun.contribution_run
+        ).options(
+            contains_eager(UserContributionRun.contribution_run)
+        ).filter(
+            UserContributionRun.user_id == user_id,
+            ContributionRun.lazy_schedule.is_(True)
         ).all()
+        lazy_run_ids = {uc.id for uc in lazy_runs}
+
+        query = self.db_session.query(UserMonthlyContribution).join(
+            UserMonthlyContribution.contribution
+        ).options(
+            contains_eager(UserMonthlyContribution.contribution)
+        ).filter(
+            UserMonthlyContribution.user_id == user_id
+        ).order_by(Contribution.month, Contribution.user_contribution_run_id)
+
+        stored = set()
+        for payment in query.yield_per(batch_size):
+            if payment.contribution.user_contribution_run_id in lazy_run_ids:
+                stored.add((payment.contribution.user_contribution_run_id, payment.contribution.month))
+            yield payment
 
-    def get_all_user_monthly_contribution(self):
-        """ this method will only be use for testcase with pytest"""
-        user_list = self.db_session.query(UserMonthlyContribution).all()
-        if not user_list:
-            return None
-        return [user.user_id for user in user_list]
+        if not lazy_runs:
+            return
+        user_runs_by_session = self._load_user_runs_of_sessions([uc.contribution_run_id for uc in lazy_runs])
+        for user_contrib in lazy_runs:
+            session = user_contrib.contribution_run
+            for month, user_contrib_id, cell_user_id, amount in iter_schedule(
+                    session, user_runs_by_session[session.id]):
+                if cell_user_id != user_id or (user_contrib_id, month) in stored:
+                    continue
+                yield ScheduledContribution(
+                    contribution_run_id=session.id,
+                    user_contribution_run_id=user_contrib_id,
+                    user_id=user_id,
+                    month=month,
+                    amount=amount
+                )
+
+    @replica_read("session:{0}")
+    def get_session_summary(self, session_id: int, as_of: Optional[date] = None) -> SessionSummary:
+        """Collected, outstanding and late amounts of a session per month and per member, plus winners.
+
+        Totals come from the summary tables maintained by the write methods,
+        so the cost grows with the number of months and members, not of
+        payments. Late cells (month started before ``as_of``, not fully paid)
+        and winners are read through ``ix_contributions_run_status_month``,
+        which only visits unsettled and won cells. For a lazy session the
+        cells that are not stored yet are added from the schedule: they are
+        unpaid, at their default amount.
+        """
+        session = self.db_session.get(ContributionRun, session_id)
+        if not session:
+            raise ValueError("Session not found")
+        as_of = as_of or datetime.utcnow().date()
+
+        members = {}
+        default_amounts = {}
+        for ucr_id, user_id, parts, cells, paid_cells, expected, collected in self.db_session.execute(
+            select(
+                UserContributionRun.id,
+                UserContributionRun.user_id,
+                UserContributionRun.number_of_parts,
+                func.coalesce(ContributionMemberSummary.cells, 0),
+                func.coalesce(ContributionMemberSummary.paid_cells, 0),
+                func.coalesce(ContributionMemberSummary.expected_amount, 0.0),
+                func.coalesce(ContributionMemberSummary.paid_amount, 0.0)
+            )
+            .outerjoin(ContributionMemberSummary,
+                       ContributionMemberSummary.user_contribution_run_id == UserContributionRun.id)
+            .where(UserContributionRun.contribution_run_id == session_id)
+            .order_by(UserContributionRun.id)
+        ):
+            members[ucr_id] = MemberSummary(user_id=user_id, user_contribution_run_id=ucr_id, number_of_parts=parts,
+                                            cells=cells, paid_cells=paid_cells, expected=expected,
+                                            collected=collected)
+            default_amounts[ucr_id] = parts * session.minimal_contribution
+
+        months = {
+            month: MonthSummary(month=month, cells=cells, paid_cells=paid_cells, expected=expected,
+                                collected=collected)
+            for month, cells, paid_cells, expected, collected in self.db_session.execute(
+                select(
+                    ContributionMonthSummary.month,
+                    ContributionMonthSummary.cells,
+                    ContributionMonthSummary.paid_cells,
+                    ContributionMonthSummary.expected_amount,
+                    ContributionMonthSummary.paid_amount
+                ).where(ContributionMonthSummary.contribution_run_id == session_id)
+            )
+        }
+
+        is_paid = (Contribution.expected_count > 0) & (Contribution.paid_count >= Contribution.expected_count)
+        for ucr_id, month, outstanding in self.db_session.execute(
+            select(Contribution.user_contribution_run_id, Contribution.month,
+                   Contribution.amount - Contribution.paid_amount)
+            .where(
+                Contribution.contribution_run_id == session_id,
+                Contribution.status.in_([ContributionStatus.PENDING, ContributionStatus.RECEIVED]),
+                Contribution.month < as_of,
+                ~is_paid
+            )
+        ):
+            for summary in (members[ucr_id], months[month]):
+                summary.late_cells += 1
+                summary.late_amount += outstanding
+
+        if session.lazy_schedule:
+            self._add_virtual_cells(session, members, months, default_amounts, as_of)
+
+        wins_by_user = {}
+        for month, winner_user_id in self.db_session.execute(
+            select(Contribution.month, Contribution.winner_user_id)
+            .where(
+                Contribution.contribution_run_id == session_id,
+                Contribution.status == ContributionStatus.RECEIVED,
+                Contribution.winner_user_id.isnot(None)
+            )
+        ):
+            months[month].winner_user_ids.append(winner_user_id)
+            wins_by_user[winner_user_id] = wins_by_user.get(winner_user_id, 0) + 1
+
+        totals = SummaryTotals()
+        for member in members.values():
+            member.wins = wins_by_user.get(member.user_id, 0)
+            totals.add(member)
+
+        return SessionSummary(
+            session_id=session_id,
+            as_of=as_of,
+            totals=totals,
+            months=sorted(months.values(), key=lambda m: m.month),
+            members=list(members.values())
+        )
+
+    def _add_virtual_cells(self, session, members, months, default_amounts, as_of):
+        """Add the not yet stored cells of a lazy session to its summary, in O(stored cells + months + members)."""
+        duration = sum(member.number_of_parts for member in members.values())
+        schedule = [session.start_date + timedelta(days=30 * month_index) for month_index in range(duration)]
+        months_before = sum(1 for month in schedule if month < as_of)
+        month_default = sum(default_amounts.values())
+
+        stored_default = {}
+        stored_before = {}
+        for ucr_id, month in self.db_session.execute(
+            select(Contribution.user_contribution_run_id, Contribution.month)
+            .where(Contribution.contribution_run_id == session.id)
+        ):
+            stored_default[month] = stored_default.get(month, 0.0) + default_amounts[ucr_id]
+            if month < as_of:
+                stored_before[ucr_id] = stored_before.get(ucr_id, 0) + 1
+
+        for ucr_id, member in members.items():
+            late = months_before - stored_before.get(ucr_id, 0)
+            member.add(SummaryTotals(expected=(duration - member.cells) * default_amounts[ucr_id],
+                                     cells=duration - member.cells, late_cells=late,
+                                     late_amount=late * default_amounts[ucr_id]))
+        for month in schedule:
+            summary = months.setdefault(month, MonthSummary(month=month))
+            cells = len(members) - summary.cells
+            expected = month_default - stored_default.get(month, 0.0)
+            late = month < as_of
+            summary.add(SummaryTotals(expected=expected, cells=cells, late_cells=cells if late else 0,
+                                      late_amount=expected if late else 0.0))
+
+    def get_all_user_monthly_contribution(self, after_id: Optional[int] = None, limit: Optional[int] = None):
+        """ this method will only be use for testcase with pytest
+
+        Returns (id, user_id) rows ordered by id.
+        """
+        query = select(UserMonthlyContribution.id, UserMonthlyContribution.user_id).order_by(
+            UserMonthlyContribution.id
+        )
+        if after_id is not None:
+            query = query.where(UserMonthlyContribution.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        return self.db_session.execute(query).all()
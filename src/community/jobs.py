@@ -0,0 +1,214 @@
+"""Background jobs for the heavy contribution operations.
+
+A job is a row of the ``jobs`` table, in the application database. A route
+submits it with ``submit_job`` and answers 202 with its id at once. A
+worker process (``flask jobs worker``) claims the oldest queued job with
+one atomic ``UPDATE ... RETURNING``, so several workers never run the same
+job. It then runs the handler registered for the job ``kind`` and stores
+its progress, result or error. Clients poll ``GET /jobs/<id>``.
+
+A job left RUNNING by a worker that died is put back in the queue once its
+heartbeat is older than JOB_STALE_SECONDS, up to JOB_MAX_ATTEMPTS runs.
+Handlers must therefore be safe to run again.
+
+A worker invalidates the response cache it can see: jobs are refused
+while the cache is the per-process ``lru`` backend, whose pages in the web
+processes would stay stale. Use RESPONSE_CACHE_BACKEND=redis or no cache.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from community.models import db
+from community.models.job_model import Job, JobStatus
+from community.utils.response_cache import is_process_local
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+class JobError(ValueError):
+    """Unknown job kind or invalid job parameters."""
+
+
+def job_handler(kind):
+    """Register ``handler(controller, params, progress) -> result`` for ``kind``.
+
+    ``progress(done, total)`` records how far the job went; the result must
+    be JSON serializable.
+    """
+    def decorator(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+
+    return decorator
+
+
+def check_shared_cache(config):
+    """Refuse jobs while the response cache lives in the web processes only."""
+    if is_process_local(config):
+        raise JobError("Jobs indisponibles avec le cache de réponses par processus: "
+                       "utiliser RESPONSE_CACHE_BACKEND=redis ou RESPONSE_CACHE_ENABLED=0")
+
+
+def submit_job(kind: str, params: dict) -> Job:
+    check_shared_cache(current_app.config)
+    if kind not in JOB_HANDLERS:
+        raise JobError(f"Type de job inconnu: {kind}")
+    job = Job(kind=kind, params=params, status=JobStatus.QUEUED)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def get_job(job_id: int) -> Job:
+    job = db.session.get(Job, job_id)
+    if not job:
+        raise ValueError("Job non trouvé")
+    return job
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_stale_jobs(now=None) -> int:
+    """Give the RUNNING jobs whose worker stopped sending heartbeats to another worker."""
+    now = now or datetime.utcnow()
+    stale = Job.heartbeat_at < now - timedelta(seconds=current_app.config['JOB_STALE_SECONDS'])
+    running = Job.status == JobStatus.RUNNING
+    requeued = db.session.execute(
+        update(Job)
+        .where(running, stale, Job.attempts < current_app.config['JOB_MAX_ATTEMPTS'])
+        .values(status=JobStatus.QUEUED, worker=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.execute(
+        update(Job)
+        .where(running, stale)
+        .values(status=JobStatus.FAILED, finished_at=now, error="Worker perdu: nombre maximal de tentatives atteint")
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return requeued
+
+
+def claim_job(worker_id: str):
+    """Mark the oldest queued job RUNNING for ``worker_id`` and return it, or None when the queue is empty."""
+    now = datetime.utcnow()
+    oldest = (
+        select(Job.id)
+        .where(Job.status == JobStatus.QUEUED)
+        .order_by(Job.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    job_id = db.session.execute(
+        update(Job)
+        .where(Job.id == oldest, Job.status == JobStatus.QUEUED)
+        .values(status=JobStatus.RUNNING, worker=worker_id, started_at=now, heartbeat_at=now,
+                attempts=Job.attempts + 1, progress_done=0, progress_total=None)
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.session.commit()
+    return db.session.get(Job, job_id) if job_id is not None else None
+
+
+def run_job(job: Job):
+    """Run the handler of a claimed job and record its outcome."""
+    from community.controllers.contribution_controller import ContributionController
+
+    job_id = job.id
+
+    def progress(done, total=None):
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(progress_done=done, progress_total=total, heartbeat_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    started = time.perf_counter()
+    try:
+        result = JOB_HANDLERS[job.kind](ContributionController(db.session), dict(job.params), progress)
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('job failed', extra={'job_id': job_id, 'kind': job.kind})
+        values = dict(status=JobStatus.FAILED, error=str(e) or type(e).__name__)
+    else:
+        values = dict(status=JobStatus.SUCCEEDED, result=result)
+        logger.info('job done', extra={'job_id': job_id, 'kind': job.kind,
+                                       'duration_ms': round((time.perf_counter() - started) * 1000, 1)})
+    db.session.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(finished_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    db.session.expire(job)
+    return job
+
+
+def run_worker(worker_id=None, poll_interval=None, once=False, max_jobs=None) -> int:
+    """Claim and run jobs until stopped; with ``once``, stop when the queue is empty.
+
+    Returns the number of jobs run.
+    """
+    check_shared_cache(current_app.config)
+    worker_id = worker_id or default_worker_id()
+    poll_interval = current_app.config['JOB_POLL_INTERVAL'] if poll_interval is None else poll_interval
+    processed = 0
+    logger.info('job worker started', extra={'worker': worker_id})
+    while max_jobs is None or processed < max_jobs:
+        requeue_stale_jobs()
+        job = claim_job(worker_id)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        db.session.remove()
+        processed += 1
+    return processed
+
+
+@job_handler('generate_months')
+def generate_months_job(controller, params, progress):
+    contribution_ids = controller.generate_monthly_contributions(int(params['session_id']), progress=progress)
+    return {"session_id": int(params['session_id']), "contributions_created": len(contribution_ids)}
+
+
+@job_handler('record_payments_batch')
+def record_payments_batch_job(controller, params, progress):
+    """Payments of ``params["payments"]`` ([id, "YYYY-MM-DD" or null] pairs), one transaction per slice."""
+    items = []
+    seen = set()
+    results = []
+    for payment_id, payment_date in params['payments']:
+        if payment_id in seen:
+            results.append({"user_monthly_contrib_id": payment_id, "status": "DUPLICATE"})
+            continue
+        seen.add(payment_id)
+        items.append((payment_id, datetime.strptime(payment_date, "%Y-%m-%d").date() if payment_date else None))
+
+    batch_size = current_app.config['JOB_BATCH_SIZE']
+    progress(0, len(items))
+    for start in range(0, len(items), batch_size):
+        results.extend(controller.record_payments_batch(items[start:start + batch_size]))
+        progress(min(start + batch_size, len(items)), len(items))
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    # only the payments that were not recorded are listed, the batch may be large
+    return {"summary": summary, "not_paid": [result for result in results if result["status"] != "PAID"]}
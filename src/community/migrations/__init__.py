@@ -0,0 +1,158 @@
+"""Versioned schema migrations.
+
+Each migration is a module of this package exposing ``VERSION``,
+``DESCRIPTION`` and ``upgrade(context)``. Migrations must be idempotent:
+a database created before versioning existed is stamped with the baseline
+and every later migration is replayed on it. An empty database goes
+through all of them, the baseline first, so a new install runs the same
+code as an upgraded one.
+
+Apply them with ``flask schema upgrade``; application startup only
+compares the stored version with the latest one (see ``check_schema``).
+"""
+import logging
+
+from sqlalchemy import inspect, text
+
+from community.migrations import (
+    v0001_baseline,
+    v0002_lazy_schedule,
+    v0003_contribution_counters,
+    v0004_hot_indexes,
+    v0005_session_summaries,
+    v0006_winner_rotation,
+    v0007_jobs,
+    v0008_token_revocation,
+)
+from community.models import db
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    v0001_baseline,
+    v0002_lazy_schedule,
+    v0003_contribution_counters,
+    v0004_hot_indexes,
+    v0005_session_summaries,
+    v0006_winner_rotation,
+    v0007_jobs,
+    v0008_token_revocation,
+]
+HEAD_VERSION = MIGRATIONS[-1].VERSION
+
+# default number of rows touched per transaction by data migrations
+DEFAULT_BATCH_SIZE = 5000
+
+schema_version = db.Table(
+    'schema_version',
+    db.Column('version', db.Integer, nullable=False),
+)
+
+
+class MigrationContext:
+    """What a migration gets: the engine plus dialect-aware DDL helpers."""
+
+    def __init__(self, engine, batch_size=DEFAULT_BATCH_SIZE):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    @property
+    def dialect(self):
+        return self.engine.dialect.name
+
+    def has_column(self, table, column):
+        return column in {c['name'] for c in inspect(self.engine).get_columns(table)}
+
+    def add_column(self, table, column, ddl):
+        """``ALTER TABLE ... ADD COLUMN`` unless the column already exists."""
+        if self.has_column(table, column):
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+    def create_index(self, name, table, columns, unique=False):
+        """Create an index if missing, without blocking writes where the backend allows it."""
+        unique_sql = 'UNIQUE ' if unique else ''
+        column_sql = ', '.join(columns)
+        if self.dialect == 'postgresql':
+            # CONCURRENTLY cannot run inside a transaction block
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(text(
+                    f'CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column_sql})'
+                ))
+        else:
+            with self.engine.begin() as conn:
+                conn.execute(text(f'CREATE {unique_sql}INDEX IF NOT EXISTS {name} ON {table} ({column_sql})'))
+
+    def drop_index(self, name):
+        """Drop an index if it exists, without blocking writes where the backend allows it."""
+        if self.dialect == 'postgresql':
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {name}'))
+        else:
+            with self.engine.begin() as conn:
+                conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+
+    def run_in_batches(self, table, statement, **params):
+        """Run ``statement`` over ``table`` by primary key ranges, one transaction per batch.
+
+        ``statement`` must filter on ``id > :low AND id <= :high``.
+        """
+        with self.engine.connect() as conn:
+            max_id = conn.execute(text(f'SELECT max(id) FROM {table}')).scalar() or 0
+        for low in range(0, max_id, self.batch_size):
+            with self.engine.begin() as conn:
+                conn.execute(text(statement), dict(params, low=low, high=low + self.batch_size))
+
+
+def current_version(connection):
+    """Stored schema version, or None when the database is not versioned yet."""
+    if not inspect(connection).has_table('schema_version'):
+        return None
+    return connection.execute(text('SELECT max(version) FROM schema_version')).scalar()
+
+
+def _stamp(connection, version):
+    connection.execute(schema_version.delete())
+    connection.execute(schema_version.insert().values(version=version))
+
+
+def upgrade(engine, target=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Bring the database to ``target`` (default: latest) and return the applied versions."""
+    target = HEAD_VERSION if target is None else target
+    with engine.begin() as conn:
+        version = current_version(conn)
+        if version is None:
+            model_tables = set(db.metadata.tables) - {'schema_version'}
+            if model_tables & set(inspect(conn).get_table_names()):
+                # tables created before versioning: they match the baseline
+                version = v0001_baseline.VERSION
+            else:
+                # empty database: every migration runs, the baseline first
+                version = 0
+            schema_version.create(conn, checkfirst=True)
+            _stamp(conn, version)
+
+    context = MigrationContext(engine, batch_size)
+    applied = []
+    for migration in MIGRATIONS:
+        if version < migration.VERSION <= target:
+            logger.info('Applying migration %04d: %s', migration.VERSION, migration.DESCRIPTION)
+            migration.upgrade(context)
+            with engine.begin() as conn:
+                _stamp(conn, migration.VERSION)
+            applied.append(migration.VERSION)
+    return applied
+
+
+def check_schema(app):
+    """Startup check: one version lookup, and an upgrade only when AUTO_MIGRATE is set."""
+    with db.engine.connect() as conn:
+        version = current_version(conn)
+    if version == HEAD_VERSION:
+        return
+    if app.config.get('AUTO_MIGRATE'):
+        upgrade(db.engine)
+    else:
+        app.logger.error('Database schema is at version %s, expected %s: run "flask schema upgrade"',
+                         version, HEAD_VERSION)
@@ -0,0 +1,74 @@
+"""Schema as it was before versioned migrations.
+
+The tables are declared here as they were then, not taken from the models:
+a new database is built by this baseline and every later migration.
+"""
+from sqlalchemy import (Column, Date, Enum, Float, ForeignKey, Integer, MetaData, String, Table,
+                        UniqueConstraint)
+
+VERSION = 1
+DESCRIPTION = 'baseline schema'
+
+metadata = MetaData()
+
+Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('firstname', String(80), unique=True, nullable=False),
+    Column('lastname', String(80), unique=True, nullable=False),
+    Column('email', String(120), unique=True, nullable=False),
+    Column('password_hash', String(200), nullable=False),
+    Column('salt', String(200), nullable=False),
+    Column('role', Enum('ADMIN', 'USER', name='userrole'), nullable=False),
+    Column('admin_identifier', String(200)),
+)
+
+Table(
+    'admin_identifier_codes', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('code', String(64), unique=True, nullable=False),
+)
+
+Table(
+    'contribution_runs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('number_of_members', Integer, nullable=False),
+    Column('minimal_contribution', Float, nullable=False),
+    Column('start_date', Date, nullable=False),
+    Column('end_date', Date),
+)
+
+Table(
+    'user_contribution_runs', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('contribution_run_id', Integer, ForeignKey('contribution_runs.id'), nullable=False),
+    Column('number_of_parts', Integer, nullable=False),
+    UniqueConstraint('user_id', 'contribution_run_id', name='uq_user_contribution_run'),
+)
+
+Table(
+    'contributions', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('contribution_run_id', Integer, ForeignKey('contribution_runs.id'), nullable=False),
+    Column('user_contribution_run_id', Integer, ForeignKey('user_contribution_runs.id'), nullable=False),
+    Column('month', Date, nullable=False),
+    Column('amount', Float, nullable=False),
+    Column('status', Enum('PENDING', 'PAID', 'RECEIVED', name='contributionstatus'), nullable=False),
+    Column('winner_user_id', Integer, ForeignKey('users.id')),
+)
+
+Table(
+    'user_monthly_contributions', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('contribution_id', Integer, ForeignKey('contributions.id'), nullable=False),
+    Column('amount', Float, nullable=False),
+    Column('status', Enum('PENDING', 'PAID', name='paymentstatus'), nullable=False),
+    Column('payment_date', Date),
+)
+
+
+def upgrade(context):
+    with context.engine.begin() as conn:
+        metadata.create_all(conn, checkfirst=True)
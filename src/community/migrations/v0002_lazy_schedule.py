@@ -0,0 +1,7 @@
+"""ContributionRun.lazy_schedule flag."""
+VERSION = 2
+DESCRIPTION = 'lazy schedule flag on contribution runs'
+
+
+def upgrade(context):
+    context.add_column('contribution_runs', 'lazy_schedule', 'BOOLEAN NOT NULL DEFAULT FALSE')
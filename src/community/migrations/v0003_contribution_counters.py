@@ -0,0 +1,21 @@
+"""Payment counters of Contribution, backfilled from the existing payments."""
+VERSION = 3
+DESCRIPTION = 'payment counters on contributions'
+
+BACKFILL = '''
+UPDATE contributions SET
+    expected_count = (SELECT count(*) FROM user_monthly_contributions u
+                      WHERE u.contribution_id = contributions.id),
+    paid_count = (SELECT count(*) FROM user_monthly_contributions u
+                  WHERE u.contribution_id = contributions.id AND u.status = :paid),
+    paid_amount = (SELECT coalesce(sum(u.amount), 0) FROM user_monthly_contributions u
+                   WHERE u.contribution_id = contributions.id AND u.status = :paid)
+WHERE id > :low AND id <= :high
+'''
+
+
+def upgrade(context):
+    context.add_column('contributions', 'expected_count', 'INTEGER NOT NULL DEFAULT 0')
+    context.add_column('contributions', 'paid_count', 'INTEGER NOT NULL DEFAULT 0')
+    context.add_column('contributions', 'paid_amount', 'FLOAT NOT NULL DEFAULT 0')
+    context.run_in_batches('contributions', BACKFILL, paid='PAID')
@@ -0,0 +1,104 @@
+"""Unique schedule cells and indexes on the hot contribution columns.
+
+Before versioning, generating the months of a session twice created the
+same cells twice: the duplicates are merged before the unique index.
+"""
+import logging
+
+from sqlalchemy import text
+
+from community.migrations.v0003_contribution_counters import BACKFILL as BACKFILL_COUNTERS
+
+logger = logging.getLogger(__name__)
+
+VERSION = 4
+DESCRIPTION = 'schedule cell uniqueness and hot column indexes'
+
+INDEXES = [
+    ('uq_contribution_cell', 'contributions', ['contribution_run_id', 'user_contribution_run_id', 'month'], True),
+    ('ix_contributions_run_month', 'contributions', ['contribution_run_id', 'month', 'user_contribution_run_id'],
+     False),
+    ('ix_contributions_run_status', 'contributions', ['contribution_run_id', 'status'], False),
+    ('ix_contributions_user_contribution_run', 'contributions', ['user_contribution_run_id'], False),
+    ('ix_user_monthly_contributions_user_status', 'user_monthly_contributions', ['user_id', 'status'], False),
+    ('ix_user_monthly_contributions_contribution', 'user_monthly_contributions', ['contribution_id', 'status'],
+     False),
+    ('ix_user_contribution_runs_run', 'user_contribution_runs', ['contribution_run_id', 'id'], False),
+]
+
+# cells of the same (session, member, month), the oldest one first
+DUPLICATE_CELLS = '''
+SELECT c.id, d.keeper, c.status, c.winner_user_id
+FROM contributions c
+JOIN (SELECT contribution_run_id, user_contribution_run_id, month, min(id) AS keeper
+      FROM contributions
+      GROUP BY contribution_run_id, user_contribution_run_id, month
+      HAVING count(*) > 1) d
+  ON c.contribution_run_id = d.contribution_run_id
+ AND c.user_contribution_run_id = d.user_contribution_run_id
+ AND c.month = d.month
+ORDER BY d.keeper, c.id
+'''
+
+# payments of a cell, for each member the one to keep first: a PAID one when there is one
+CELL_PAYMENTS = '''
+SELECT id, user_id FROM user_monthly_contributions
+WHERE contribution_id = :keeper
+ORDER BY user_id, CASE WHEN status = 'PAID' THEN 0 ELSE 1 END, id
+'''
+
+
+# the furthest status of the merged cells wins
+STATUS_RANK = {'PENDING': 0, 'PAID': 1, 'RECEIVED': 2}
+
+
+def merge_duplicate_cells(context) -> int:
+    """Merge the duplicated cells into the oldest one; return the number of cells deleted.
+
+    The payments of the duplicates move to the kept cell, its status and
+    winner are the furthest ones of the group and its counters are
+    recomputed. One transaction per ``batch_size`` groups.
+    """
+    with context.engine.connect() as conn:
+        rows = conn.execute(text(DUPLICATE_CELLS)).all()
+    groups = {}
+    for cell_id, keeper, status, winner_user_id in rows:
+        groups.setdefault(keeper, []).append((cell_id, status, winner_user_id))
+
+    keepers = list(groups)
+    for start in range(0, len(keepers), context.batch_size):
+        with context.engine.begin() as conn:
+            for keeper in keepers[start:start + context.batch_size]:
+                cells = groups[keeper]
+                duplicates = [{"id": cell_id, "keeper": keeper} for cell_id, _, _ in cells if cell_id != keeper]
+                conn.execute(text(
+                    "UPDATE user_monthly_contributions SET contribution_id = :keeper WHERE contribution_id = :id"
+                ), duplicates)
+                conn.execute(text("DELETE FROM contributions WHERE id = :id"), duplicates)
+                # one payment per member and cell; ids read first, MySQL cannot delete from a table it reads
+                kept_users = set()
+                extra_payments = []
+                for payment_id, user_id in conn.execute(text(CELL_PAYMENTS), {"keeper": keeper}):
+                    if user_id in kept_users:
+                        extra_payments.append({"id": payment_id})
+                    kept_users.add(user_id)
+                if extra_payments:
+                    conn.execute(text("DELETE FROM user_monthly_contributions WHERE id = :id"), extra_payments)
+                conn.execute(text(
+                    "UPDATE contributions SET status = :status, winner_user_id = :winner WHERE id = :keeper"
+                ), {
+                    "keeper": keeper,
+                    "status": max((status for _, status, _ in cells), key=STATUS_RANK.get),
+                    "winner": next((winner for _, _, winner in cells if winner is not None), None),
+                })
+                conn.execute(text(BACKFILL_COUNTERS), {"paid": "PAID", "low": keeper - 1, "high": keeper})
+    merged = len(rows) - len(keepers)
+    if merged:
+        logger.warning('Merged %s duplicated contribution cells into %s', merged, len(keepers))
+    return merged
+
+
+def upgrade(context):
+    merge_duplicate_cells(context)
+    for name, table, columns, unique in INDEXES:
+        context.create_index(name, table, columns, unique)
@@ -0,0 +1,38 @@
+"""Per-month and per-member session summaries, backfilled from the contribution counters."""
+from community.models.contribution_model import ContributionMemberSummary, ContributionMonthSummary
+
+VERSION = 5
+DESCRIPTION = 'session summary tables'
+
+PAID_CELL = 'CASE WHEN expected_count > 0 AND paid_count >= expected_count THEN 1 ELSE 0 END'
+
+BACKFILL_MONTHS = f'''
+INSERT INTO contribution_month_summaries
+    (contribution_run_id, month, cells, paid_cells, expected_amount, paid_amount)
+SELECT contribution_run_id, month, count(*), sum({PAID_CELL}), sum(amount), sum(paid_amount)
+FROM contributions
+WHERE contribution_run_id > :low AND contribution_run_id <= :high
+GROUP BY contribution_run_id, month
+'''
+
+BACKFILL_MEMBERS = f'''
+INSERT INTO contribution_member_summaries
+    (user_contribution_run_id, contribution_run_id, cells, paid_cells, expected_amount, paid_amount)
+SELECT user_contribution_run_id, contribution_run_id, count(*), sum({PAID_CELL}), sum(amount), sum(paid_amount)
+FROM contributions
+WHERE contribution_run_id > :low AND contribution_run_id <= :high
+GROUP BY user_contribution_run_id, contribution_run_id
+'''
+
+
+def upgrade(context):
+    with context.engine.begin() as conn:
+        # tables recréées: la migration peut être rejouée
+        for model in (ContributionMonthSummary, ContributionMemberSummary):
+            model.__table__.drop(conn, checkfirst=True)
+            model.__table__.create(conn)
+    context.run_in_batches('contribution_runs', BACKFILL_MONTHS)
+    context.run_in_batches('contribution_runs', BACKFILL_MEMBERS)
+    context.create_index('ix_contributions_run_status_month', 'contributions',
+                         ['contribution_run_id', 'status', 'month'])
+    context.drop_index('ix_contributions_run_status')
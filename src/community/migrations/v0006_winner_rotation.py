@@ -0,0 +1,20 @@
+"""Win counters of session members and the precomputed payout schedule."""
+from community.models.contribution_model import PayoutSlot
+
+VERSION = 6
+DESCRIPTION = 'win counters and payout slots'
+
+BACKFILL = '''
+UPDATE user_contribution_runs SET
+    wins = (SELECT count(*) FROM contributions c
+            WHERE c.contribution_run_id = user_contribution_runs.contribution_run_id
+              AND c.winner_user_id = user_contribution_runs.user_id)
+WHERE id > :low AND id <= :high
+'''
+
+
+def upgrade(context):
+    context.add_column('user_contribution_runs', 'wins', 'INTEGER NOT NULL DEFAULT 0')
+    context.run_in_batches('user_contribution_runs', BACKFILL)
+    with context.engine.begin() as conn:
+        PayoutSlot.__table__.create(conn, checkfirst=True)
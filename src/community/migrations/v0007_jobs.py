@@ -0,0 +1,10 @@
+"""Queue of background jobs."""
+from community.models.job_model import Job
+
+VERSION = 7
+DESCRIPTION = 'background jobs'
+
+
+def upgrade(context):
+    with context.engine.begin() as conn:
+        Job.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,7 @@
+"""User.tokens_valid_after: revocations shared by every worker process."""
+VERSION = 8
+DESCRIPTION = 'token revocation time on users'
+
+
+def upgrade(context):
+    context.add_column('users', 'tokens_valid_after', 'BIGINT')
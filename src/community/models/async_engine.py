@@ -0,0 +1,44 @@
+"""SQLAlchemy asyncio engine of the ASGI serving mode, see community.asgi.
+
+The drivers (aiosqlite, asyncpg, aiomysql) are optional dependencies, only
+imported when the ASGI mode starts.
+"""
+from sqlalchemy.engine import make_url
+
+from community.models.engine import configure_engine, engine_options, is_sqlite_memory
+
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+
+
+def async_database_url(config):
+    """ASYNC_DATABASE_URL, or SQLALCHEMY_DATABASE_URI with the asyncio driver of its backend."""
+    if config.get('ASYNC_DATABASE_URL'):
+        return make_url(config['ASYNC_DATABASE_URL'])
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend}, set ASYNC_DATABASE_URL")
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+
+def init_async_engine(app):
+    """Create the asyncio read engine of ``app``, stored in ``app.extensions['async_engine']``."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(app.config)
+    if is_sqlite_memory(url):
+        # a second engine would open a second, empty, in-memory database
+        raise ValueError("The ASGI mode needs a database file or server, not an in-memory SQLite database")
+
+    options = engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=url))
+    if url.get_backend_name() == 'postgresql':
+        # asyncpg takes the server settings directly, not a libpq "options" string
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(app.config['DB_STATEMENT_TIMEOUT_MS'])}}
+    try:
+        engine = create_async_engine(url, **options)
+    except ImportError as e:
+        raise RuntimeError(f"The ASGI mode requires the '{url.get_driver_name()}' package") from e
+    # lecture seule: une transaction différée ne prend pas le verrou d'écriture
+    configure_engine(engine.sync_engine, dict(app.config, SQLITE_BEGIN_MODE=''))
+    app.extensions['async_engine'] = engine
+    return engine
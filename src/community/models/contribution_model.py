@@ -15,6 +15,8 @@ class ContributionRun(db.Model):
     minimal_contribution = db.Column(db.Float, nullable=False)  # montant minimal par part
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=True)  # facultatif au début
+    # calendrier calculé à la lecture: seuls paiements, ajustements et gagnants sont stockés
+    lazy_schedule = db.Column(db.Boolean, nullable=False, default=False)
 
     # Relation vers UserContributionRun (association utilisateurs → session avec nombre de parts)
     user_contributions = db.relationship("UserContributionRun", back_populates="contribution_run")
@@ -31,12 +33,16 @@ class UserContributionRun(db.Model):
 
     number_of_parts = db.Column(db.Integer, nullable=False,
                                 default=1)  # combien de parts ce user prend dans cette session
+    # nombre de mois déjà gagnés, maintenu par set_month_winner: éligible tant que wins < number_of_parts
+    wins = db.Column(db.Integer, nullable=False, default=0)
 
     user = db.relationship("User", back_populates="user_contribution_runs")
     contribution_run = db.relationship("ContributionRun", back_populates="user_contributions")
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "contribution_run_id", name="uq_user_contribution_run"),
+        # membres d'une session (génération, calendrier virtuel)
+        db.Index("ix_user_contribution_runs_run", "contribution_run_id", "id"),
     )
 
 
@@ -53,12 +59,68 @@ class Contribution(db.Model):
 
     winner_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)  # gagnant ce mois
 
+    # compteurs maintenus par record_payment (voir rebuild_contribution_counters)
+    expected_count = db.Column(db.Integer, nullable=False, default=0)  # nombre de paiements attendus
+    paid_count = db.Column(db.Integer, nullable=False, default=0)  # nombre de paiements reçus
+    paid_amount = db.Column(db.Float, nullable=False, default=0.0)  # montant déjà versé
+
     contribution_run = db.relationship("ContributionRun", back_populates="contributions")
     user_contribution_run = db.relationship("UserContributionRun")
     winner_user = db.relationship("User", foreign_keys=[winner_user_id], back_populates='won_contributions')
 
     user_monthly_contributions = db.relationship('UserMonthlyContribution', back_populates='contribution')
 
+    @property
+    def user_id(self):
+        return self.user_contribution_run.user_id
+
+    __table_args__ = (
+        # une seule ligne par membre et par mois dans une session
+        db.UniqueConstraint("contribution_run_id", "user_contribution_run_id", "month", name="uq_contribution_cell"),
+        # calendrier d'une session trié par mois (pagination par curseur)
+        db.Index("ix_contributions_run_month", "contribution_run_id", "month", "user_contribution_run_id"),
+        # cellules non réglées d'une session, par mois (retards du résumé)
+        db.Index("ix_contributions_run_status_month", "contribution_run_id", "status", "month"),
+        db.Index("ix_contributions_user_contribution_run", "user_contribution_run_id"),
+    )
+
+
+class PayoutSlot(db.Model):
+    """Mois attribué à l'avance à un membre par schedule_winners (une ligne par mois du calendrier)."""
+    __tablename__ = "payout_slots"
+    contribution_run_id = db.Column(db.Integer, db.ForeignKey("contribution_runs.id"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    user_contribution_run_id = db.Column(db.Integer, db.ForeignKey("user_contribution_runs.id"), nullable=False)
+    bid = db.Column(db.Float, nullable=True)  # enchère retenue, pour un tirage par enchères
+
+    user_contribution_run = db.relationship("UserContributionRun")
+
+
+class ContributionMonthSummary(db.Model):
+    """Totaux d'un mois d'une session, maintenus à chaque génération et paiement."""
+    __tablename__ = "contribution_month_summaries"
+    contribution_run_id = db.Column(db.Integer, db.ForeignKey("contribution_runs.id"), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    cells = db.Column(db.Integer, nullable=False, default=0)  # cellules (membre, mois) enregistrées
+    paid_cells = db.Column(db.Integer, nullable=False, default=0)  # cellules entièrement payées
+    expected_amount = db.Column(db.Float, nullable=False, default=0.0)
+    paid_amount = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class ContributionMemberSummary(db.Model):
+    """Totaux d'un membre dans une session, maintenus comme ContributionMonthSummary."""
+    __tablename__ = "contribution_member_summaries"
+    user_contribution_run_id = db.Column(db.Integer, db.ForeignKey("user_contribution_runs.id"), primary_key=True)
+    contribution_run_id = db.Column(db.Integer, db.ForeignKey("contribution_runs.id"), nullable=False)
+    cells = db.Column(db.Integer, nullable=False, default=0)
+    paid_cells = db.Column(db.Integer, nullable=False, default=0)
+    expected_amount = db.Column(db.Float, nullable=False, default=0.0)
+    paid_amount = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index("ix_contribution_member_summaries_run", "contribution_run_id"),
+    )
+
 
 class PaymentStatus(Enum):
     PENDING = "PENDING"
@@ -78,5 +140,23 @@ class UserMonthlyContribution(db.Model):
     user = db.relationship('User', back_populates='monthly_contributions')
     contribution = db.relationship('Contribution', back_populates='user_monthly_contributions')
 
+    @property
+    def month(self):
+        return self.contribution.month
+
+    @property
+    def contribution_run_id(self):
+        return self.contribution.contribution_run_id
+
+    @property
+    def user_contribution_run_id(self):
+        return self.contribution.user_contribution_run_id
+
+    __table_args__ = (
+        # paiements d'un utilisateur, éventuellement filtrés par statut
+        db.Index("ix_user_monthly_contributions_user_status", "user_id", "status"),
+        db.Index("ix_user_monthly_contributions_contribution", "contribution_id", "status"),
+    )
+
     def __repr__(self):
         return f'<UserMonthlyContribution user_id={self.user_id} contribution_id={self.contribution_id} amount={self.amount} status={self.status}>'
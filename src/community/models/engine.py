@@ -0,0 +1,108 @@
+import contextlib
+import contextvars
+import functools
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# set while a write method runs, see write_transaction
+_writing = contextvars.ContextVar('writing', default=False)
+
+
+def is_sqlite_memory(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS built from the DB_* settings of a config.
+
+    Pool sizing applies to every server backend and to SQLite files; an
+    in-memory SQLite database keeps Flask-SQLAlchemy's single shared
+    connection.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if is_sqlite_memory(url):
+        return {}
+
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    if backend == 'sqlite':
+        # the driver-level busy handler, also set with PRAGMA busy_timeout below
+        options['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000}
+    elif backend == 'postgresql':
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    elif backend == 'mysql':
+        options['connect_args'] = {
+            'init_command': f"SET SESSION max_execution_time={config['DB_STATEMENT_TIMEOUT_MS']}"
+        }
+    return options
+
+
+def configure_engine(engine, config):
+    """Apply the SQLite PRAGMAs to every new connection of ``engine``.
+
+    WAL lets readers run while a writer commits, ``synchronous=NORMAL`` is
+    safe with WAL and avoids an fsync per commit, and the busy timeout makes
+    concurrent writers from several worker processes wait for the lock
+    instead of failing with "database is locked".
+
+    Transactions begin with SQLITE_BEGIN_MODE (deferred: reads never take
+    the write lock), those of the ``write_transaction`` methods with
+    SQLITE_WRITE_BEGIN_MODE. An empty SQLITE_BEGIN_MODE keeps the driver's
+    own BEGIN for every transaction.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    memory = is_sqlite_memory(engine.url)
+    begin_mode = config.get('SQLITE_BEGIN_MODE')
+    write_begin_mode = config.get('SQLITE_WRITE_BEGIN_MODE') or begin_mode
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if begin_mode:
+            # let SQLAlchemy emit BEGIN itself (see the 'begin' listener)
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if not memory:
+            cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+            cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.close()
+
+    if begin_mode:
+        @event.listens_for(engine, 'begin')
+        def begin_transaction(connection):
+            # IMMEDIATE takes the write lock up front: a read-then-write transaction can no
+            # longer fail on lock upgrade, it waits in the busy handler instead
+            connection.exec_driver_sql(f'BEGIN {write_begin_mode if _writing.get() else begin_mode}')
+
+
+@contextlib.contextmanager
+def writing():
+    """Begin the transactions opened in this block with SQLITE_WRITE_BEGIN_MODE.
+
+    Only a transaction not begun yet is affected: the session must not
+    have read anything since its last commit or rollback.
+    """
+    token = _writing.set(True)
+    try:
+        yield
+    finally:
+        _writing.reset(token)
+
+
+def write_transaction(method):
+    """Decorate a controller method that reads then writes, see ``writing``."""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with writing():
+            return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,42 @@
+from datetime import datetime
+from enum import Enum
+
+from community.models import db
+
+
+class JobStatus(Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class Job(db.Model):
+    """Background operation run by ``flask jobs worker``, see community.jobs."""
+    __tablename__ = "jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # clé de JOB_HANDLERS
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+
+    # avancement: unités traitées sur le total annoncé par le handler (lignes, paiements...)
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100), nullable=True)  # host:pid du worker qui l'exécute
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # rafraîchi à chaque progression: un job RUNNING sans heartbeat récent a perdu son worker
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # prochain job à réclamer, jobs bloqués
+        db.Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
@@ -0,0 +1,157 @@
+"""Read-replica routing for ``db.session``.
+
+Controller read methods decorated with ``replica_read`` run their queries
+on the replica engine (DATABASE_REPLICA_URL) when one is configured. The
+replica is not a Flask-SQLAlchemy bind: it holds a copy of the primary
+schema, so ``db.create_all`` and the migrations never touch it.
+Writes, flushes and read-your-writes paths always use the primary: a read
+falls back to the primary when one of its keys, or the requesting user,
+was written less than REPLICA_STALENESS_SECONDS ago in this process.
+
+The recent writes are only known to the process that made them: with
+several web workers (WEB_CONCURRENCY), a read served by another worker may
+still go to the replica and miss a write made a moment ago, by its own
+client included. Read-your-writes then holds only when the load balancer
+keeps a client on one worker, or when the replica lag stays well below the
+time between a write and the next read.
+"""
+import contextlib
+import functools
+import inspect
+import threading
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+from sqlalchemy.sql.expression import UpdateBase
+
+from community.models.engine import configure_engine, engine_options
+
+_USE_REPLICA = 'use_replica'
+
+
+def init_replica(app):
+    """Create the replica engine of ``app`` when DATABASE_REPLICA_URL is set."""
+    url = app.config.get('DATABASE_REPLICA_URL')
+    if not url:
+        return
+    engine = create_engine(url, **engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=url)))
+    # lecture seule: une transaction différée ne prend pas le verrou d'écriture
+    configure_engine(engine, dict(app.config, SQLITE_BEGIN_MODE=''))
+    app.extensions['replica_engine'] = engine
+
+
+def get_replica_engine():
+    """Replica engine of the current application, None without replica."""
+    return current_app.extensions.get('replica_engine') if has_app_context() else None
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica bind while ``use_replica`` is set."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(_USE_REPLICA) and not self._flushing \
+                and not isinstance(clause, UpdateBase):
+            replica = get_replica_engine()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class RecentWrites:
+    """Last write time per key (``session:1``, ``user:2``...), forgotten after ``ttl`` seconds.
+
+    In-process only: the other worker processes do not see these writes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._writes = {}
+        self._lock = threading.Lock()
+
+    def mark(self, *keys):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._writes) > 10000:
+                self._writes = {k: t for k, t in self._writes.items() if now - t < self.ttl}
+            for key in keys:
+                self._writes[key] = now
+
+    def is_recent(self, *keys) -> bool:
+        now = time.monotonic()
+        return any(now - self._writes.get(key, float('-inf')) < self.ttl for key in keys + ('*',))
+
+
+def get_recent_writes() -> RecentWrites:
+    writes = current_app.extensions.get('recent_writes')
+    if writes is None:
+        writes = current_app.extensions.setdefault(
+            'recent_writes', RecentWrites(current_app.config.get('REPLICA_STALENESS_SECONDS', 5))
+        )
+    return writes
+
+
+def _requester_key():
+    """``user:<id>`` of the bearer token sent with the current request, if any."""
+    if not has_request_context():
+        return None
+    if 'requester_key' not in g:
+        from community.utils.jwt_utils import decode_access_token
+
+        g.requester_key = None
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            try:
+                g.requester_key = f"user:{decode_access_token(auth_header.split(' ')[1], check_revocation=False)['sub']}"
+            except Exception:
+                pass
+    return g.requester_key
+
+
+def mark_write(*keys):
+    """Record a write on ``keys`` (and by the requesting user) for the staleness guard."""
+    if not has_app_context():
+        return
+    requester = _requester_key()
+    get_recent_writes().mark(*keys, *([requester] if requester else []))
+
+
+@contextlib.contextmanager
+def use_replica(db_session, *keys):
+    """Route the reads of ``db_session`` to the replica, unless ``keys`` were written recently."""
+    requester = _requester_key()
+    fresh_needed = get_recent_writes().is_recent(*keys, *([requester] if requester else []))
+    previous = db_session.info.get(_USE_REPLICA, False)
+    db_session.info[_USE_REPLICA] = not fresh_needed
+    try:
+        yield
+    finally:
+        db_session.info[_USE_REPLICA] = previous
+
+
+def replica_read(*key_templates):
+    """Decorate a controller read method so it runs on the replica.
+
+    ``key_templates`` are formatted with the positional arguments of the
+    call, e.g. ``@replica_read("session:{0}")`` for ``method(self, session_id)``.
+    Generator methods stay on the replica for their whole iteration.
+    """
+    def decorator(method):
+        def keys_for(args):
+            return tuple(template.format(*args) for template in key_templates)
+
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def generator_wrapper(self, *args, **kwargs):
+                with use_replica(self.db_session, *keys_for(args)):
+                    yield from method(self, *args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with use_replica(self.db_session, *keys_for(args)):
+                return method(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
@@ -1,6 +1,6 @@
 import enum
-from werkzeug.security import generate_password_hash, check_password_hash
 from community.models import db
+from community.utils.passwords import hash_password, needs_rehash, verify_password
 
 class UserRole(enum.Enum):
     ADMIN = 'admin'
@@ -18,6 +18,8 @@ class User(db.Model):  # << Corrigé ici
     salt = db.Column(db.String(200), nullable=False)
     role = db.Column(db.Enum(UserRole), nullable=False, default=UserRole.USER)
     admin_identifier = db.Column(db.String(200), nullable=True)
+    # epoch ms: the tokens issued before are revoked (password changed), see community.utils.jwt_utils
+    tokens_valid_after = db.Column(db.BigInteger, nullable=True)
     # Relations
     user_contribution_runs = db.relationship('UserContributionRun', back_populates='user')
     monthly_contributions = db.relationship('UserMonthlyContribution', back_populates='user')
@@ -26,10 +28,14 @@ class User(db.Model):  # << Corrigé ici
     won_contributions = db.relationship('Contribution', back_populates='winner_user')
 
     def set_password(self, password, salt):
-        self.password_hash = generate_password_hash(password + salt)
+        self.password_hash = hash_password(password + salt)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password + self.salt)
+        return verify_password(self.password_hash, password + self.salt)
+
+    def password_needs_rehash(self):
+        """True when the stored hash uses another method or cost than PASSWORD_HASH_METHOD."""
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -1,12 +1,17 @@
 import jwt
 from functools import wraps
-from flask import request, jsonify, current_app
-from community.controllers.auth_controller import AuthController
-from community.models import db
-from community.models.user_model import User, UserRole
+from flask import request, jsonify, g
+from community.models.user_model import UserRole
+from community.utils.jwt_utils import decode_access_token
 
 
 def require_admin(f):
+    """Allow only admin tokens.
+
+    The role is read from the signed claims, so no user lookup is needed;
+    the tokens of deleted users or revoked by a password change are rejected
+    through the revocation cache (one lookup per user and REVOCATION_CACHE_TTL).
+    """
     @wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization')
@@ -16,24 +21,16 @@ def require_admin(f):
 
         token = auth_header.split(" ")[1]
         try:
-            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            user_id = payload.get("sub")
-
-            if not user_id:
-                return jsonify({"error": "Token invalide"}), 401
-
-            # Utilisation du contrôleur pour récupérer l’utilisateur
-            controller = AuthController(db.session, User)
-            user = controller.get_by_id(user_id)
-
-            if not user or user.role != UserRole.ADMIN:
-                return jsonify({"error": "Accès réservé aux administrateurs"}), 403
-
+            claims = decode_access_token(token)
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expiré"}), 401
         except jwt.InvalidTokenError:
             return jsonify({"error": "Token invalide"}), 401
 
+        if claims.get("role") != UserRole.ADMIN.value:
+            return jsonify({"error": "Accès réservé aux administrateurs"}), 403
+
+        g.token_claims = claims
         return f(*args, **kwargs)
 
     return decorated_function
@@ -1,19 +1,28 @@
+import logging
 import re
 from flask import Blueprint, request, jsonify
 
-import datetime
-from flask import current_app
-import jwt
-
 from community.controllers.auth_controller import AuthController
 from community.models import db
 from community.models.user_model import User
 from community.routes import require_admin
+from community.utils.hash_pool import HashPoolSaturated, get_hash_pool
+from community.utils.jwt_utils import create_access_token
+from community.utils.rate_limit import limit_attempts
 
 EMAIL_REGEX = r"^[\w\.-]+@[\w\.-]+\.\w{2,}$"
+logger = logging.getLogger(__name__)
 controller = AuthController(db.session, User)
 
 auth = Blueprint('auth', __name__, url_prefix='/auth')
+# throttled before the view runs: a rejected attempt costs no query and no hash
+auth.before_request(limit_attempts('auth.login', 'auth.register'))
+
+
+def busy_response():
+    response = jsonify({"error": "Service busy, retry later"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 
 @auth.route('/register', methods=['POST'])
@@ -27,7 +36,7 @@ def register():
     last_name = data.get('last_name')
     email = data.get('email')
     password = data.get('password')
-    print("request data:", data)
+    logger.debug('register request', extra={'email': email})
 
     # verify required fields
     missing_fields = [field for field in ['first_name', 'last_name', 'email', 'password'] if not data.get(field)]
@@ -43,7 +52,10 @@ def register():
         return jsonify({"error": "Invalid email format"}), 400
 
     #  secure the password
-    response, status = controller.create(data)
+    try:
+        response, status = controller.create(data)
+    except HashPoolSaturated:
+        return busy_response()
     return jsonify(response), status
 
 
@@ -58,24 +70,19 @@ def login():
 
     if not email or not password:
         return jsonify({"error": "Email and password required"}), 400
-    # print(email, password)
-    user = controller.get_by_email(email)
     # check email format
     if not re.match(EMAIL_REGEX, email):
         return jsonify({"error": "Invalid email format"}), 400
     # check if user exists and password is correct
-    if not user or not user.check_password(password):
+    try:
+        user = controller.authenticate(email, password)
+    except HashPoolSaturated:
+        return busy_response()
+    if not user:
         return jsonify({"error": "Invalid credentials"}), 401
 
     # Generate JWT token
-    payload = {
-        "user_id": user.id,
-        "email": user.email,
-        "role": user.role.value,
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-    }
-    # print("SECRET_KEY type:", type(current_app.config['JWT_SECRET_KEY']), "value:", current_app.config['SECRET_KEY'])
-    token = jwt.encode(payload, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    token = create_access_token(user)
 
     return jsonify({"access_token": token}), 200
 
@@ -92,7 +99,10 @@ def update_user(user_id):
     if not data:
         return jsonify({"error": "Missing JSON body"}), 400
 
-    response, status = controller.update(user_id, data)
+    try:
+        response, status = controller.update(user_id, data)
+    except HashPoolSaturated:
+        return busy_response()
     return jsonify(response), status
 
 
@@ -107,4 +117,10 @@ def delete_user(user_id):
 #@require_admin
 def get_id(email):
     response, status = controller.provide_user_id(email)
-    return jsonify(response), status
\ No newline at end of file
+    return jsonify(response), status
+
+
+@auth.route('/metrics/hash-pool', methods=['GET'])
+def hash_pool_metrics():
+    pool = get_hash_pool()
+    return jsonify({"enabled": pool is not None, **(pool.stats() if pool else {})}), 200
@@ -1,8 +1,25 @@
+import csv
+import io
+import logging
+
 from flask import Blueprint, request, jsonify
-from datetime import datetime
+from datetime import date, datetime
 from community.controllers.contribution_controller import ContributionController
+from community.jobs import JobError, submit_job
 from community.models import db  # Tu dois avoir une session SQLAlchemy ici
+from community.routes.pagination import (
+    PaginationError,
+    encode_cursor,
+    parse_fields,
+    parse_page_args,
+    select_fields
+)
+from community.routes.job_routes import job_accepted, wants_job
+from community.routes.streaming import ndjson_response, wants_stream
+from community.simulation import SimulationError, simulate
+from community.utils.response_cache import cached_response
 
+logger = logging.getLogger(__name__)
 contribution_bp = Blueprint('contribution', __name__, url_prefix='/contribution')
 controller = ContributionController(db.session)
 
@@ -22,9 +39,11 @@ def create_contribution_session():
     if missing_fields:
         return jsonify({"error": f"Missing required fields: {', '.join(missing_fields)}"}), 400
 
+    lazy_schedule = bool(data.get('lazy_schedule', False))
+
     try:
         start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-        session = controller.create_session(number_of_members, minimal_contribution, start_date)
+        session = controller.create_session(number_of_members, minimal_contribution, start_date, lazy_schedule)
         return jsonify({"message": "Session created", "session_id": session.id}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -50,12 +69,17 @@ def add_user_to_contribution_session(session_id):
 
 @contribution_bp.route('/session/<int:session_id>/generate-months', methods=['POST'])
 def generate_monthly_contributions(session_id):
+    """Write the schedule of a session; with ``?async=1`` a background job does it (202 + job id)."""
+    if wants_job():
+        try:
+            return job_accepted(submit_job('generate_months', {"session_id": session_id}))
+        except JobError as je:
+            return jsonify({"error": str(je)}), 409
     try:
-        controller.generate_monthly_contributions(session_id)
-        #  print("the monthly contribution generated successfully")
-        return jsonify({"message": "monthly contribution generate"}), 200
+        contribution_ids = controller.generate_monthly_contributions(session_id)
+        return jsonify({"message": "monthly contribution generate", "generated": len(contribution_ids)}), 200
     except ValueError as ve:
-        print("the monthly contribution could not be generated")
+        logger.info('monthly contributions not generated', extra={'session_id': session_id, 'reason': str(ve)})
         return jsonify({"error": str(ve)}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -81,6 +105,203 @@ def record_payment(user_monthly_contrib_id):
         return jsonify({"error": str(e)}), 500
 
 
+@contribution_bp.route('/payments/batch', methods=['POST'])
+def record_payments_batch():
+    """Record many payments at once.
+
+    Accepts a JSON body ``{"payments": [{"user_monthly_contrib_id": 1, "payment_date": "2025-01-31"}]}``
+    or a CSV upload (``file`` form field or ``text/csv`` body) with the same
+    two columns. Lines that cannot be parsed are reported as ``INVALID``.
+    With ``?async=1`` the valid lines are recorded by a background job and
+    the answer is 202 with the job id; invalid lines are still reported here.
+    """
+    if request.files.get('file') or request.mimetype == 'text/csv':
+        upload = request.files.get('file')
+        try:
+            text = (upload.read() if upload else request.get_data()).decode('utf-8-sig')
+            lines = list(csv.DictReader(io.StringIO(text)))
+        except (UnicodeDecodeError, csv.Error) as e:
+            return jsonify({"error": f"Invalid CSV file: {e}"}), 400
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get('payments'), list):
+            return jsonify({"error": "Missing payments list"}), 400
+        lines = data['payments']
+
+    items = []
+    invalid = {}
+    for index, line in enumerate(lines):
+        try:
+            payment_id = int(line['user_monthly_contrib_id'])
+            payment_date = line.get('payment_date')
+            payment_date = datetime.strptime(payment_date, "%Y-%m-%d").date() if payment_date else None
+        except (KeyError, TypeError, ValueError, AttributeError):
+            invalid[index] = {"line": index + 1, "status": "INVALID"}
+            continue
+        items.append((payment_id, payment_date))
+
+    if wants_job():
+        try:
+            job = submit_job('record_payments_batch', {
+                "payments": [[payment_id, payment_date.isoformat() if payment_date else None]
+                             for payment_id, payment_date in items]
+            })
+        except JobError as je:
+            return jsonify({"error": str(je)}), 409
+        return job_accepted(job, invalid=list(invalid.values()))
+
+    try:
+        recorded = iter(controller.record_payments_batch(items))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    results = [invalid[index] if index in invalid else dict(next(recorded), line=index + 1)
+               for index in range(len(lines))]
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return jsonify({"message": "Paiements traités", "summary": summary, "results": results}), 200
+
+
+@contribution_bp.route('/session/<int:session_id>/payment', methods=['POST'])
+def record_scheduled_payment(session_id):
+    """Record the payment of a (member, month) cell, materializing it first for lazy sessions."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Missing JSON body"}), 400
+
+    user_id = data.get('user_id')
+    month = data.get('month')
+    payment_date = data.get('payment_date')  # Optionnel
+    if not user_id or not month:
+        return jsonify({"error": "user_id et month requis"}), 400
+
+    try:
+        month = datetime.strptime(month, "%Y-%m-%d").date()
+        if payment_date:
+            payment_date = datetime.strptime(payment_date, "%Y-%m-%d").date()
+        payment = controller.materialize_cell(session_id, user_id, month)
+        result = controller.record_payment(payment.id, payment_date)
+        return jsonify({
+            "message": "Paiement enregistré",
+            "payment_id": result.id,
+            "status": result.status.name
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@contribution_bp.route('/session/<int:session_id>/override', methods=['POST'])
+def override_scheduled_amount(session_id):
+    """Persist a custom amount for one (member, month) cell of a session."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Missing JSON body"}), 400
+
+    user_id = data.get('user_id')
+    month = data.get('month')
+    amount = data.get('amount')
+    if not user_id or not month or amount is None:
+        return jsonify({"error": "user_id, month et amount requis"}), 400
+
+    try:
+        month = datetime.strptime(month, "%Y-%m-%d").date()
+        payment = controller.materialize_cell(session_id, user_id, month, amount)
+        return jsonify({
+            "message": "Montant ajusté",
+            "payment_id": payment.id,
+            "contribution_id": payment.contribution_id,
+            "amount": payment.amount
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@contribution_bp.route('/session/<int:session_id>/winner', methods=['POST'])
+def set_scheduled_winner(session_id):
+    """Set the winner of a month, materializing the winner's cell first for lazy sessions."""
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Missing JSON body"}), 400
+
+    winner_user_id = data.get('winner_user_id')
+    month = data.get('month')
+    if not winner_user_id or not month:
+        return jsonify({"error": "winner_user_id et month requis"}), 400
+
+    try:
+        month = datetime.strptime(month, "%Y-%m-%d").date()
+        payment = controller.materialize_cell(session_id, winner_user_id, month)
+        contribution = controller.set_month_winner(payment.contribution_id, winner_user_id)
+        return jsonify({
+            "message": "winner defined",
+            "contribution_id": contribution.id,
+            "status": contribution.status.name,
+            "winner_user_id": contribution.winner_user_id
+        }), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@contribution_bp.route('/session/<int:session_id>/schedule-winners', methods=['POST'])
+def schedule_session_winners(session_id):
+    """Plan the winner of every month: ``{"method": "random" | "fixed" | "bidding", ...}``.
+
+    ``seed`` seeds the random draw, ``order`` lists a user id per part for
+    ``fixed``, ``bids`` holds ``{"user_id": 1, "amount": 20}`` entries for
+    ``bidding``.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Le corps JSON doit être un objet"}), 400
+    try:
+        bids = [(int(bid['user_id']), float(bid['amount'])) for bid in data.get('bids') or []]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "bids doit être une liste de {user_id, amount}"}), 400
+    order = data.get('order')
+    if order is not None and not (isinstance(order, list)
+                                  and all(isinstance(user_id, int) and not isinstance(user_id, bool)
+                                          for user_id in order)):
+        return jsonify({"error": "order doit être une liste d'identifiants d'utilisateurs"}), 400
+
+    try:
+        slots = controller.schedule_winners(session_id, data.get('method', 'random'), data.get('seed'),
+                                            order, bids)
+        return jsonify({"message": "calendrier des gagnants défini",
+                        "schedule": [serialize_slot(slot) for slot in slots]}), 200
+    except SimulationError as se:
+        return jsonify({"error": str(se)}), 400
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@contribution_bp.route('/session/<int:session_id>/payout-schedule', methods=['GET'])
+@cached_response("session:{session_id}")
+def get_payout_schedule(session_id):
+    slots = controller.get_payout_schedule(session_id)
+    return jsonify([serialize_slot(slot) for slot in slots]), 200
+
+
+@contribution_bp.route('/session/<int:session_id>/eligible-winners', methods=['GET'])
+def get_eligible_winners(session_id):
+    month = request.args.get('month')
+    if not month:
+        return jsonify({"error": "month requis"}), 400
+    try:
+        month = datetime.strptime(month, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "month doit être au format YYYY-MM-DD"}), 400
+    return jsonify({"month": month.isoformat(), "user_ids": controller.eligible_winners(session_id, month)}), 200
+
+
 @contribution_bp.route('/<int:contribution_id>/winner', methods=['POST'])
 def set_contribution_winner(contribution_id):
     data = request.get_json()
@@ -103,56 +324,254 @@ def set_contribution_winner(contribution_id):
         return jsonify({"error": str(e)}), 500
 
 
+# maximum number of scenarios evaluated by one /simulate request
+MAX_SIMULATION_SCENARIOS = 5000
+
+
+def run_scenario(data):
+    if not isinstance(data, dict):
+        raise SimulationError("Chaque scénario doit être un objet JSON")
+    parts = data.get('parts')
+    if parts is None:
+        number_of_members = data.get('number_of_members')
+        if not isinstance(number_of_members, int) or number_of_members < 1:
+            raise SimulationError("parts ou number_of_members requis")
+        parts = [1] * number_of_members
+    start_date = data.get('start_date')
+    try:
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        return simulate(parts, data.get('minimal_contribution'), data.get('payout_order', 'fixed'),
+                        data.get('seed'), start_date)
+    except (TypeError, ValueError) as e:
+        raise SimulationError(str(e)) from e
+
+
+def serialize_simulation(sim, include_balances=True):
+    months = sim.number_of_months
+    data = {
+        "number_of_members": len(sim.parts),
+        "number_of_months": months,
+        "pot": sim.pot,
+        "months": [month.isoformat() for month in sim.months] if sim.start_date else None,
+        "winners": sim.winners.tolist(),
+        "members": [
+            {
+                "member": member,
+                "parts": parts,
+                "contribution": contribution,
+                "total_paid": contribution * months,
+                "total_received": parts * sim.pot,
+                "payout_months": sim.payout_months(member),
+                "max_advance": advance,
+                "max_credit": credit
+            }
+            for member, (parts, contribution, advance, credit) in enumerate(zip(
+                sim.parts.tolist(), sim.contributions.tolist(), sim.max_advance.tolist(), sim.max_credit.tolist()
+            ))
+        ]
+    }
+    if include_balances:
+        data["balances"] = sim.balances.tolist()
+    return data
+
+
+@contribution_bp.route('/simulate', methods=['POST'])
+def simulate_sessions():
+    """Plan one scenario, or ``{"scenarios": [...]}``, without touching the database.
+
+    A scenario holds ``parts`` (one entry per member) or ``number_of_members``,
+    ``minimal_contribution`` and optionally ``payout_order`` (``fixed``,
+    ``random`` or a list of member indexes), ``seed``, ``start_date`` and
+    ``include_balances`` (per member cumulative balance, default true).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Missing JSON body"}), 400
+
+    batch = 'scenarios' in data
+    scenarios = data['scenarios'] if batch else [data]
+    if not isinstance(scenarios, list) or not scenarios or len(scenarios) > MAX_SIMULATION_SCENARIOS:
+        return jsonify({"error": f"scenarios doit contenir de 1 à {MAX_SIMULATION_SCENARIOS} scénarios"}), 400
+
+    results = []
+    for index, scenario in enumerate(scenarios):
+        try:
+            sim = run_scenario(scenario)
+        except SimulationError as se:
+            return jsonify({"error": str(se), "scenario": index}), 400
+        results.append(serialize_simulation(sim, bool(scenario.get('include_balances', True))))
+    return jsonify({"scenarios": results} if batch else results[0]), 200
+
+
+SESSION_FIELDS = ("id", "minimal_contribution", "start_date", "number_of_members", "lazy_schedule")
+CONTRIBUTION_FIELDS = ("id", "month", "amount", "status", "user_id")
+PAYMENT_FIELDS = ("id", "amount", "status", "payment_date", "contribution_id", "session_id", "month")
+
+
+def serialize_session(s):
+    return {
+        "id": s.id,
+        "minimal_contribution": s.minimal_contribution,
+        "start_date": s.start_date.isoformat(),
+        "number_of_members": s.number_of_members,
+        "lazy_schedule": s.lazy_schedule
+    }
+
+
+def serialize_contribution(c):
+    return {
+        "id": c.id,
+        "month": c.month.isoformat(),
+        "amount": c.amount,
+        "status": c.status.name,
+        "user_id": c.user_id
+    }
+
+
+def serialize_payment(p):
+    return {
+        "id": p.id,
+        "amount": p.amount,
+        "status": p.status.name,
+        "payment_date": p.payment_date.isoformat() if p.payment_date else None,
+        "contribution_id": p.contribution_id,
+        "session_id": p.contribution_run_id,
+        "month": p.month.isoformat()
+    }
+
+
+def list_response(items, serialize, fields, paginated, limit, cursor_of):
+    """Serialize a list endpoint result, as a plain list or as a keyset page."""
+    data = [select_fields(serialize(item), fields) for item in items]
+    if not paginated:
+        return jsonify(data), 200
+    next_cursor = encode_cursor(cursor_of(items[-1])) if len(items) == limit else None
+    return jsonify({"items": data, "next_cursor": next_cursor}), 200
+
+
 @contribution_bp.route('/sessions', methods=['GET'])
+@cached_response("sessions")
 def list_all_sessions():
-    sessions = controller.list_sessions()
-    return jsonify([
-        {
-            "id": s.id,
-            "minimal_contribution": s.minimal_contribution,
-            "start_date": s.start_date.isoformat(),
-            "number_of_members": s.number_of_members
-        } for s in sessions
-    ]), 200
+    try:
+        paginated, limit, after = parse_page_args((int,))
+        fields = parse_fields(SESSION_FIELDS)
+    except PaginationError as pe:
+        return jsonify({"error": str(pe)}), 400
+
+    sessions = controller.list_sessions(after[0] if after else None, limit)
+    return list_response(sessions, serialize_session, fields, paginated, limit, lambda s: (s.id,))
 
 
 @contribution_bp.route('/session/<int:session_id>/contributions', methods=['GET'])
+@cached_response("session:{session_id}", bypass=wants_stream)
 def get_session_contributions(session_id):
-    contributions = controller.get_session_contributions(session_id)
-    return jsonify([
-        {
-            "id": c.id,
-            "month": c.month.isoformat(),
-            "amount": c.amount,
-            "status": c.status.name,
-            "user_id": c.user_contribution.user_id
-        } for c in contributions
-    ]), 200
+    try:
+        paginated, limit, after = parse_page_args((date, int))
+        fields = parse_fields(CONTRIBUTION_FIELDS)
+    except PaginationError as pe:
+        return jsonify({"error": str(pe)}), 400
+
+    if wants_stream():
+        return ndjson_response(controller.iter_session_contributions(session_id), serialize_contribution, fields)
+
+    contributions = controller.get_session_contributions(session_id, after, limit)
+    return list_response(contributions, serialize_contribution, fields, paginated, limit,
+                         lambda c: (c.month, c.user_contribution_run_id))
+
+
+def serialize_slot(slot):
+    return {
+        "month": slot.month.isoformat(),
+        "user_id": slot.user_contribution_run.user_id,
+        "bid": slot.bid
+    }
+
+
+def serialize_totals(t):
+    return {
+        "expected": t.expected,
+        "collected": t.collected,
+        "outstanding": t.outstanding,
+        "cells": t.cells,
+        "paid_cells": t.paid_cells,
+        "late_cells": t.late_cells,
+        "late_amount": t.late_amount
+    }
+
+
+def serialize_summary(summary):
+    return {
+        "session_id": summary.session_id,
+        "as_of": summary.as_of.isoformat(),
+        "totals": serialize_totals(summary.totals),
+        "months": [
+            {"month": m.month.isoformat(), **serialize_totals(m), "winner_user_ids": m.winner_user_ids}
+            for m in summary.months
+        ],
+        "members": [
+            {
+                "user_id": m.user_id,
+                "user_contribution_run_id": m.user_contribution_run_id,
+                "number_of_parts": m.number_of_parts,
+                **serialize_totals(m),
+                "wins": m.wins
+            }
+            for m in summary.members
+        ]
+    }
+
+
+@contribution_bp.route('/session/<int:session_id>/summary', methods=['GET'])
+@cached_response("session:{session_id}")
+def get_session_summary(session_id):
+    """Collected, outstanding and late totals of a session per month and per member, with the winners."""
+    as_of = request.args.get('as_of')
+    try:
+        as_of = datetime.strptime(as_of, "%Y-%m-%d").date() if as_of else None
+    except ValueError:
+        return jsonify({"error": "as_of doit être au format YYYY-MM-DD"}), 400
+
+    try:
+        summary = controller.get_session_summary(session_id, as_of)
+        return jsonify(serialize_summary(summary)), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 @contribution_bp.route('/user/<int:user_id>/payments', methods=['GET'])
 def get_user_payments(user_id):
-    payments = controller.get_user_payments(user_id)
-    return jsonify([
-        {
-            "id": p.id,
-            "amount": p.amount,
-            "status": p.status.name,
-            "payment_date": p.payment_date.isoformat() if p.payment_date else None,
-            "contribution_id": p.contribution_id
-        } for p in payments
-    ]), 200
+    try:
+        paginated, limit, after = parse_page_args((date, int))
+        fields = parse_fields(PAYMENT_FIELDS)
+    except PaginationError as pe:
+        return jsonify({"error": str(pe)}), 400
+
+    if wants_stream():
+        return ndjson_response(controller.iter_user_payments(user_id), serialize_payment, fields)
+
+    payments = controller.get_user_payments(user_id, after, limit)
+    return list_response(payments, serialize_payment, fields, paginated, limit,
+                         lambda p: (p.month, p.user_contribution_run_id))
 
 
 @contribution_bp.route('/all_user_contributions', methods=['GET'])
 def get_all_user_contributions():
     """This endpoint will allways be used in the pytest testcase"""
-    user_contribution_id_list = controller.get_all_user_monthly_contribution()
-    print(f"user_contribution_id_list: {user_contribution_id_list}")
-    return jsonify([
-        {
-            "response": "successful",
-            "number": len(user_contribution_id_list),
-            "list_of_user_id": user_contribution_id_list
-        }
-    ]), 200
+    try:
+        paginated, limit, after = parse_page_args((int,))
+    except PaginationError as pe:
+        return jsonify({"error": str(pe)}), 400
+
+    rows = controller.get_all_user_monthly_contribution(after[0] if after else None, limit)
+    user_contribution_id_list = [user_id for _, user_id in rows]
+    logger.debug('user contributions listed', extra={'count': len(user_contribution_id_list)})
+    response = {
+        "response": "successful",
+        "number": len(user_contribution_id_list),
+        "list_of_user_id": user_contribution_id_list
+    }
+    if paginated:
+        response["next_cursor"] = encode_cursor((rows[-1][0],)) if len(rows) == limit else None
+    return jsonify([response]), 200
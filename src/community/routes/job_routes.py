@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify, request, url_for
+
+from community.jobs import get_job
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+
+def wants_job():
+    """True when the client asked to run the operation in the background, with ``?async=1``."""
+    return request.args.get('async') in ('1', 'true')
+
+
+def serialize_job(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status.name,
+        "progress": {"done": job.progress_done, "total": job.progress_total},
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+
+def job_accepted(job, **extra):
+    """202 answer of a submitted job, pointing at its status."""
+    status_url = url_for('jobs.get_job_status', job_id=job.id)
+    response = jsonify({"message": "Job en file d'attente", "job_id": job.id, "status_url": status_url, **extra})
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    try:
+        return jsonify(serialize_job(get_job(job_id))), 200
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 404
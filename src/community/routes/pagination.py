@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import date
+
+from flask import request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Raised when the pagination query parameters are invalid."""
+
+
+def encode_cursor(values):
+    """Encode the keyset values of the last item of a page as an opaque cursor."""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, types):
+    """Decode a cursor produced by ``encode_cursor``; ``types`` converts each keyset value."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if len(values) != len(types):
+            raise ValueError
+        return tuple(
+            date.fromisoformat(value) if value_type is date else value_type(value)
+            for value_type, value in zip(types, values)
+        )
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise PaginationError("Invalid cursor")
+
+
+def parse_page_args(cursor_types):
+    """Read ``limit`` and ``cursor`` from the query string.
+
+    Returns ``(paginated, limit, after)``; ``paginated`` is False when the
+    client sent neither parameter, in which case the legacy full list is
+    returned.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return False, None, None
+
+    try:
+        limit = int(limit) if limit is not None else DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise PaginationError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    after = decode_cursor(cursor, cursor_types) if cursor else None
+    return True, limit, after
+
+
+def parse_fields(allowed):
+    """Read the ``fields=a,b`` selector; returns None when every field is wanted."""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in allowed]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def select_fields(item, fields):
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields}
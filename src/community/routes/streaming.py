@@ -0,0 +1,24 @@
+import json
+
+from flask import Response, request, stream_with_context
+
+from community.routes.pagination import select_fields
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_stream():
+    """True when the client asked for NDJSON, with ``?stream=1`` or the Accept header."""
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(items, serialize, fields=None):
+    """Stream ``items`` as one JSON document per line while they are produced."""
+
+    def generate():
+        for item in items:
+            yield json.dumps(select_fields(serialize(item), fields)) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,115 @@
+"""Planning of tontine rounds without touching the database.
+
+A scenario is a list of parts per member and a minimal contribution, as
+given to ``create_session`` and ``add_user_to_session``. The session lasts
+one month per part; every month each member pays ``parts * minimal`` and
+one part wins the whole pot. The schedule is computed on (member, month)
+NumPy arrays, the same cells ``generate_monthly_contributions`` would
+write.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+PAYOUT_ORDERS = ('fixed', 'random')
+
+# above this many (member, month) cells a scenario is refused
+MAX_SIMULATION_CELLS = 1_000_000
+
+
+class SimulationError(ValueError):
+    """Invalid scenario."""
+
+
+@dataclass
+class Simulation:
+    """Schedule of a scenario; member ``i`` is the i-th entry of ``parts``."""
+    parts: np.ndarray  # (members,)
+    minimal_contribution: float
+    contributions: np.ndarray  # (members,) amount paid by each member every month
+    pot: float  # amount won every month
+    winners: np.ndarray  # (months,) member index receiving the pot
+    balances: np.ndarray  # (members, months) cumulative received - paid at the end of each month
+    start_date: Optional[date] = None
+
+    @property
+    def number_of_months(self) -> int:
+        return len(self.winners)
+
+    @property
+    def months(self) -> Optional[List[date]]:
+        if self.start_date is None:
+            return None
+        # même calendrier que iter_schedule: un mois = 30 jours
+        return [self.start_date + timedelta(days=30 * index) for index in range(self.number_of_months)]
+
+    def payout_months(self, member: int) -> List[int]:
+        return np.flatnonzero(self.winners == member).tolist()
+
+    @property
+    def max_advance(self) -> np.ndarray:
+        """Per member, the most the group owes them: how much they saved before winning."""
+        return np.maximum(-self.balances.min(axis=1), 0.0)
+
+    @property
+    def max_credit(self) -> np.ndarray:
+        """Per member, the most they owe the group: how much they received before paying it back."""
+        return np.maximum(self.balances.max(axis=1), 0.0)
+
+
+def payout_order(parts: np.ndarray, order: Union[str, Sequence[int]] = 'fixed', seed: Optional[int] = None):
+    """Member index winning each month.
+
+    ``fixed`` gives the pot to the members in the given order, one month per
+    part; ``random`` shuffles those months with ``seed``; an explicit list of
+    member indexes is used as is after checking that every member wins once
+    per part.
+    """
+    slots = np.repeat(np.arange(len(parts)), parts)
+    if isinstance(order, str):
+        if order == 'fixed':
+            return slots
+        if order == 'random':
+            return np.random.default_rng(seed).permutation(slots)
+        raise SimulationError(f"payout_order doit être l'un de {', '.join(PAYOUT_ORDERS)} ou une liste")
+
+    winners = np.asarray(order, dtype=np.int64)
+    if winners.shape != slots.shape or not np.array_equal(np.sort(winners), slots):
+        raise SimulationError("payout_order doit attribuer à chaque membre un mois par part")
+    return winners
+
+
+def simulate(
+        parts: Sequence[int],
+        minimal_contribution: float,
+        order: Union[str, Sequence[int]] = 'fixed',
+        seed: Optional[int] = None,
+        start_date: Optional[date] = None
+) -> Simulation:
+    """Compute the full schedule of one scenario."""
+    parts = np.asarray(parts, dtype=np.int64)
+    if parts.ndim != 1 or len(parts) == 0 or (parts < 1).any():
+        raise SimulationError("parts doit être une liste non vide d'entiers positifs")
+    if not minimal_contribution or minimal_contribution <= 0:
+        raise SimulationError("minimal_contribution doit être positif")
+    months = int(parts.sum())
+    if len(parts) * months > MAX_SIMULATION_CELLS:
+        raise SimulationError(f"Scénario trop grand: plus de {MAX_SIMULATION_CELLS} cellules")
+
+    contributions = parts * float(minimal_contribution)
+    pot = float(contributions.sum())
+    winners = payout_order(parts, order, seed)
+
+    cash_flow = np.broadcast_to(-contributions[:, None], (len(parts), months)).copy()
+    cash_flow[winners, np.arange(months)] += pot
+    return Simulation(
+        parts=parts,
+        minimal_contribution=float(minimal_contribution),
+        contributions=contributions,
+        pot=pot,
+        winners=winners,
+        balances=np.cumsum(cash_flow, axis=1),
+        start_date=start_date
+    )
@@ -0,0 +1,130 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app
+
+
+class HashPoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full, or a job outlives the timeout."""
+
+
+def _timed_call(fn, args):
+    # runs in the worker process: report when the job actually started
+    return time.time(), fn(*args)
+
+
+class HashWorkerPool:
+    """Bounded process pool for CPU-bound password hashing and verification.
+
+    At most ``workers + queue_depth`` jobs are accepted at once; beyond that
+    ``run`` fails immediately with ``HashPoolSaturated`` instead of blocking
+    the request thread, so the route can answer 503. A job keeps its slot
+    until the worker is done with it, even when the request stopped waiting
+    for it after ``timeout`` seconds.
+    """
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float = 30.0):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a multi-threaded web worker is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def run(self, fn, *args):
+        """Run ``fn(*args)`` in a worker process and return its result."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected_total += 1
+            raise HashPoolSaturated("Password hashing pool saturated")
+
+        with self._lock:
+            self.in_flight += 1
+        submitted_at = time.time()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            started_at, result = future.result(self.timeout)
+        except FutureTimeoutError as e:
+            future.cancel()  # still queued: it will not run
+            with self._lock:
+                self.timed_out_total += 1
+            raise HashPoolSaturated("Password hashing timed out") from e
+        wait = max(started_at - submitted_at, 0.0)
+        with self._lock:
+            self.completed_total += 1
+            self.queue_wait_seconds_total += wait
+            self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, wait)
+        return result
+
+    def _release(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "completed_total": self.completed_total,
+                "rejected_total": self.rejected_total,
+                "timed_out_total": self.timed_out_total,
+                "queue_wait_seconds_total": self.queue_wait_seconds_total,
+                "queue_wait_seconds_max": self.queue_wait_seconds_max
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def get_hash_pool():
+    """Hash pool of the current application, or None when HASH_POOL_ENABLED is off."""
+    if not current_app.config.get('HASH_POOL_ENABLED'):
+        return None
+    pool = current_app.extensions.get('hash_pool')
+    if pool is None:
+        pool = current_app.extensions.setdefault('hash_pool', HashWorkerPool(
+            workers=current_app.config.get('HASH_POOL_WORKERS') or os.cpu_count() or 1,
+            queue_depth=current_app.config.get('HASH_POOL_QUEUE_DEPTH', 32),
+            timeout=current_app.config.get('HASH_POOL_TIMEOUT', 30.0)
+        ))
+    return pool
+
+
+def run_hashing(fn, *args):
+    """Run a hashing function on the application pool, or inline when it is disabled."""
+    pool = get_hash_pool()
+    if pool is None:
+        return fn(*args)
+    return pool.run(fn, *args)
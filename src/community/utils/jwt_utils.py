@@ -0,0 +1,131 @@
+import datetime
+import math
+import threading
+import time
+
+import jwt
+from flask import current_app
+from sqlalchemy import select
+
+from community.models import db
+from community.models.engine import writing
+from community.models.user_model import User
+
+JWT_ALGORITHM = "HS256"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def create_access_token(user) -> str:
+    """Sign an access token carrying the identity and the role of ``user``.
+
+    ``iat`` keeps the milliseconds, to be compared with the revocation time
+    of the user (``users.tokens_valid_after``).
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload = {
+        "sub": str(user.id),
+        "user_id": user.id,
+        "email": user.email,
+        "role": user.role.value,
+        "iat": int(now.timestamp() * 1000) / 1000,
+        "exp": now + datetime.timedelta(seconds=current_app.config['JWT_ACCESS_TOKEN_EXPIRES'])
+    }
+    return jwt.encode(payload, current_app.config['JWT_SECRET_KEY'], algorithm=JWT_ALGORITHM)
+
+
+def decode_access_token(token: str, check_revocation: bool = True) -> dict:
+    """Verify the signature and expiry of a token and return its claims.
+
+    Raises ``jwt.InvalidTokenError`` (or ``jwt.ExpiredSignatureError``) and,
+    unless ``check_revocation`` is false, also rejects the tokens of deleted
+    users and the tokens issued before the revocation time of the user.
+    """
+    claims = jwt.decode(
+        token,
+        current_app.config['JWT_SECRET_KEY'],
+        algorithms=[JWT_ALGORITHM],
+        options={"require": ["sub", "exp", "iat"]}
+    )
+    if check_revocation and round(claims["iat"] * 1000) < get_revocation_cache().valid_after(claims["sub"]):
+        raise jwt.InvalidTokenError("Token revoked")
+    return claims
+
+
+def load_valid_after(user_id) -> float:
+    """Revocation time of ``user_id`` in ms, read from the database; infinite for a deleted user."""
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        return math.inf
+    session = db.session()
+    began = not session.in_transaction()
+    try:
+        row = session.execute(select(User.tokens_valid_after).where(User.id == user_id)).first()
+    finally:
+        if began:
+            # leave no transaction open: the write methods begin their own
+            session.rollback()
+    if row is None:
+        return math.inf
+    return row[0] or 0
+
+
+class RevocationCache:
+    """In-process TTL cache of the revocation time of each user.
+
+    The revocations themselves are stored in the database (the
+    ``tokens_valid_after`` column, or the deleted row), so every worker
+    process applies them: the cache only spares the lookup. The process
+    that revokes updates its entry at once; the others see the revocation
+    after at most ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float, load=load_valid_after):
+        self.ttl = ttl
+        self.load = load
+        self._entries = {}  # user id -> (tokens valid after in ms, cached until)
+        self._lock = threading.Lock()
+
+    def valid_after(self, user_id) -> float:
+        """Time in ms before which the tokens of ``user_id`` are revoked."""
+        entry = self._entries.get(str(user_id))
+        if entry is None or entry[1] < time.monotonic():
+            return self.store(user_id, self.load(user_id))
+        return entry[0]
+
+    def store(self, user_id, valid_after) -> float:
+        """Record a revocation time known by this process (login, update, delete)."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            self._entries[str(user_id)] = (valid_after, now + self.ttl)
+        return valid_after
+
+    def _purge(self, now):
+        for user_id in [u for u, (_, expires_at) in self._entries.items() if expires_at < now]:
+            del self._entries[user_id]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_revocation_cache() -> RevocationCache:
+    """Revocation cache of the current application."""
+    cache = current_app.extensions.get('revocation_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'revocation_cache', RevocationCache(current_app.config.get('REVOCATION_CACHE_TTL', 5))
+        )
+    return cache
+
+
+def revoke_user_tokens(user_id):
+    """Invalidate every token already issued to ``user_id``, in every worker process."""
+    revoked_at = now_ms()
+    with writing():
+        db.session.query(User).filter_by(id=user_id).update({User.tokens_valid_after: revoked_at})
+        db.session.commit()
+    get_revocation_cache().store(user_id, revoked_at)
@@ -0,0 +1,42 @@
+"""Leveled, structured logging for the ``community`` loggers.
+
+Modules log with ``logging.getLogger(__name__)`` and pass context as
+``extra={...}``; with LOG_FORMAT=json every record is written to stderr as
+one JSON object holding the message, the level, the logger and those extra
+fields.
+"""
+import json
+import logging
+import sys
+
+# attributes every LogRecord has: anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(app):
+    """Attach one stderr handler to the ``community`` logger, at LOG_LEVEL."""
+    logger = logging.getLogger('community')
+    logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+    if any(getattr(handler, '_community', False) for handler in logger.handlers):
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    if app.config.get('LOG_FORMAT', 'json') == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handler._community = True
+    logger.addHandler(handler)
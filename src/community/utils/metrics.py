@@ -0,0 +1,182 @@
+"""Request metrics in the Prometheus text format.
+
+``init_metrics`` times every request and counts the SQL statements it runs
+(SQLAlchemy engine events) and the bytes it returns. Histograms are kept
+per route template and method, so the number of series stays bounded;
+``GET /metrics`` exposes them. Statements slower than SLOW_QUERY_MS are
+logged at WARNING level.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Histogram:
+    """Cumulative Prometheus histogram for one label set."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class MetricsRegistry:
+    """Per-route request metrics of one application."""
+
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Request latency.', DURATION_BUCKETS),
+        'http_request_db_statements': ('SQL statements executed per request.', STATEMENT_BUCKETS),
+        'http_request_db_seconds': ('Time spent in SQL statements per request.', DURATION_BUCKETS),
+        'http_response_size_bytes': ('Response body size.', SIZE_BUCKETS),
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {name: {} for name in self.HISTOGRAMS}
+        self._requests = {}  # (method, route, status) -> count
+        self.slow_queries = 0
+
+    def observe_request(self, method, route, status, duration, statements, db_seconds, size):
+        labels = (method, route)
+        with self._lock:
+            for name, value in (('http_request_duration_seconds', duration),
+                                ('http_request_db_statements', statements),
+                                ('http_request_db_seconds', db_seconds),
+                                ('http_response_size_bytes', size)):
+                series = self._histograms[name]
+                if labels not in series:
+                    series[labels] = Histogram(self.HISTOGRAMS[name][1])
+                series[labels].observe(value)
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def observe_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def render(self, extra_gauges=()):
+        """Exposition text; ``extra_gauges`` holds (name, help, value) tuples."""
+        lines = []
+        with self._lock:
+            lines += ['# HELP http_requests_total Requests served.', '# TYPE http_requests_total counter']
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            for name, (description, _) in self.HISTOGRAMS.items():
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for (method, route), histogram in sorted(self._histograms[name].items()):
+                    labels = f'method="{method}",route="{route}"'
+                    for bound, count in histogram.samples():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {sum(histogram.counts)}')
+            lines += ['# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.',
+                      '# TYPE db_slow_queries_total counter', f'db_slow_queries_total {self.slow_queries}']
+        for name, description, value in extra_gauges:
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def get_metrics() -> MetricsRegistry:
+    return current_app.extensions['metrics']
+
+
+def _route():
+    # the rule template, never the raw path: /session/<int:session_id>/contributions
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    g.sql_statements = 0
+    g.sql_seconds = 0.0
+
+
+def _after_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return response
+    size = response.calculate_content_length() or 0
+    get_metrics().observe_request(request.method, _route(), response.status_code, time.perf_counter() - started,
+                                  g.get('sql_statements', 0), g.get('sql_seconds', 0.0), size)
+    return response
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # on the execution context: a failed statement, which never reaches after_cursor_execute,
+    # leaves nothing behind on the pooled connection
+    if context is not None:
+        context.metrics_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'metrics_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if not has_request_context() or 'metrics' not in current_app.extensions:
+        return
+    g.sql_statements = g.get('sql_statements', 0) + 1
+    g.sql_seconds = g.get('sql_seconds', 0.0) + elapsed
+    if elapsed * 1000 >= current_app.config.get('SLOW_QUERY_MS', 200):
+        get_metrics().observe_slow_query()
+        logger.warning('slow query', extra={
+            'duration_ms': round(elapsed * 1000, 3),
+            'statement': statement[:1000],
+            'route': _route(),
+        })
+
+
+def _listen_engines():
+    # Engine class events: every engine, primary and replica, present or created later
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def metrics_view():
+    gauges = []
+    cache = current_app.extensions.get('response_cache')
+    if cache is not None:
+        gauges += [(f'response_cache_{name}', f'Response cache {name.replace("_", " ")}.', value)
+                   for name, value in cache.stats().items()]
+    pool = current_app.extensions.get('hash_pool')
+    if pool is not None:
+        gauges += [(f'hash_pool_{name}', f'Hash pool {name.replace("_", " ")}.', value)
+                   for name, value in pool.stats().items() if isinstance(value, (int, float))]
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is not None:
+        gauges += [(f'rate_limit_{name}', f'Rate limited auth attempts {name}.', value)
+                   for name, value in limiter.stats().items()]
+    return Response(get_metrics().render(gauges), mimetype='text/plain; version=0.0.4')
+
+
+def init_metrics(app):
+    """Register the request hooks, the SQL listeners and ``GET /metrics``."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.extensions['metrics'] = MetricsRegistry()
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    _listen_engines()
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
@@ -0,0 +1,42 @@
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from community.utils.hash_pool import run_hashing
+
+DEFAULT_PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+
+
+def normalize_method(method: str) -> str:
+    """Expand a werkzeug method string with its default parameters.
+
+    ``"scrypt"`` becomes ``"scrypt:32768:8:1"`` and ``"pbkdf2"`` becomes
+    ``"pbkdf2:sha256:<default iterations>"``, which is the prefix werkzeug
+    writes in front of the hashes it generates.
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        defaults = ["32768", "8", "1"]
+    elif name == "pbkdf2":
+        defaults = ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ":".join([name] + args + defaults[len(args):])
+
+
+def configured_method() -> str:
+    return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_PASSWORD_HASH_METHOD)
+
+
+def hash_password(password: str, method: str = None) -> str:
+    """Hash ``password``, on the hashing process pool when it is enabled."""
+    return run_hashing(generate_password_hash, password, method or configured_method())
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check ``password`` against ``password_hash``, on the hashing process pool when it is enabled."""
+    return run_hashing(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str, method: str = None) -> bool:
+    """True when ``password_hash`` was not produced with the configured method and cost."""
+    return password_hash.split("$", 1)[0] != normalize_method(method or configured_method())
@@ -0,0 +1,180 @@
+"""Token-bucket rate limiting of the login and registration attempts.
+
+Every attempt takes one token from a bucket of the client IP and one from a
+bucket of the email of the JSON body, per endpoint. A bucket holds at most
+``capacity`` tokens and regains them at ``capacity / period``: a rule
+``"10/minute"`` allows a burst of 10 attempts, then one every 6 seconds.
+An empty bucket answers 429 with Retry-After. The check runs in a
+``before_request`` hook of the auth blueprint, before any database query or
+password hash.
+
+A bucket left alone until it is full again is the same as no bucket, so
+the stores forget it then: memory only holds the clients seen recently.
+The in-process store also keeps at most RATE_LIMIT_MAX_KEYS buckets, least
+recently used evicted first. With several worker processes each one counts
+on its own; use RATE_LIMIT_BACKEND=redis to share the buckets.
+"""
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify, request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rule(rule: str):
+    """``"10/minute"`` -> (capacity 10, 10 / 60 tokens per second)."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(second|minute|hour|day)\s*', rule or '')
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid rate limit rule: {rule!r} (expected e.g. '10/minute')")
+    capacity = int(match.group(1))
+    return capacity, capacity / PERIODS[match.group(2)]
+
+
+class MemoryBucketStore:
+    """In-process store of at most ``max_keys`` buckets, least recently used evicted first."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated at, full again at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity: int, rate: float) -> float:
+        """Take one token from ``key``; return 0 when granted, else the seconds until the next token."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            self._buckets.move_to_end(key)
+            self._purge(now)
+            return wait
+
+    def _purge(self, now):
+        # the least recently used buckets come first: drop the full ones, then the excess
+        while self._buckets:
+            key, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.max_keys:
+                break
+            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RedisBucketStore:
+    """Store shared by every worker process, on a Redis server.
+
+    ``redis`` is an optional dependency, only imported when this store is
+    configured (RATE_LIMIT_BACKEND=redis). A bucket is a hash updated by one
+    Lua script, on the server clock, and expires once it is full again.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = capacity
+    if bucket[1] then
+        tokens = math.min(capacity, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * rate)
+    end
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = '2community:ratelimit:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key, capacity: int, rate: float) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[capacity, rate]))
+
+
+class RateLimiter:
+    """Per-IP and per-email buckets on top of a store (``take``)."""
+
+    def __init__(self, store, per_ip: str, per_email: str):
+        self.store = store
+        self.per_ip = parse_rule(per_ip)
+        self.per_email = parse_rule(per_email)
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, endpoint, ip, email=None) -> float:
+        """Seconds to wait before ``endpoint`` may be called again, 0 when the attempt is allowed."""
+        wait = self.store.take(f'{endpoint}:ip:{ip}', *self.per_ip)
+        if not wait and email:
+            wait = self.store.take(f'{endpoint}:email:{email}', *self.per_email)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict:
+        stats = {'allowed': self.allowed, 'rejected': self.rejected}
+        if isinstance(self.store, MemoryBucketStore):
+            stats['keys'] = len(self.store)
+        return stats
+
+
+def build_store(config):
+    backend = config.get('RATE_LIMIT_BACKEND', 'memory')
+    if backend == 'memory':
+        return MemoryBucketStore(config.get('RATE_LIMIT_MAX_KEYS', 100000))
+    if backend == 'redis':
+        return RedisBucketStore(config['RATE_LIMIT_REDIS_URL'])
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Rate limiter of the current application."""
+    limiter = current_app.extensions.get('rate_limiter')
+    if limiter is None:
+        config = current_app.config
+        limiter = current_app.extensions.setdefault(
+            'rate_limiter',
+            RateLimiter(build_store(config), config['RATE_LIMIT_PER_IP'], config['RATE_LIMIT_PER_EMAIL'])
+        )
+    return limiter
+
+
+def limit_attempts(*endpoints):
+    """``before_request`` hook answering 429 to the calls of ``endpoints`` beyond the limits.
+
+    The email comes from the JSON body, lower-cased, so that changing its
+    case or the client IP does not give an attacker new attempts.
+    """
+    def hook():
+        if request.endpoint not in endpoints or not current_app.config.get('RATE_LIMIT_ENABLED', True):
+            return None
+        data = request.get_json(silent=True)
+        email = data.get('email') if isinstance(data, dict) else None
+        email = email.strip().lower() if isinstance(email, str) else None
+        wait = get_rate_limiter().check(request.endpoint, request.remote_addr, email)
+        if not wait:
+            return None
+        response = jsonify({"error": "Too many attempts, retry later"})
+        response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+        return response, 429
+
+    return hook
@@ -0,0 +1,214 @@
+"""Cache of GET responses for the endpoints polled by the dashboard.
+
+Entries are stored under a namespace (``sessions``, ``session:<id>``) and
+invalidated by the controller write methods through
+``invalidate_responses``. Invalidation bumps a version counter kept in the
+backend rather than deleting keys, so it costs one operation whatever the
+number of cached pages, and a shared backend sees it from every process.
+
+Every cached response carries an ETag: a client sending it back in
+``If-None-Match`` gets ``304 Not Modified`` without a database query.
+
+The cache is off by default (RESPONSE_CACHE_ENABLED). The ``lru`` backend
+lives in one process and so does its invalidation: it is refused when
+WEB_CONCURRENCY declares more than one web process, which need the
+``redis`` backend.
+"""
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, has_app_context, make_response, request
+
+GLOBAL_NAMESPACE = '*'
+
+
+class LRUCacheBackend:
+    """In-process backend holding at most ``max_entries`` responses, least recently used evicted first.
+
+    Writes made by another process are not seen: one web process only.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires at, value)
+        self._versions = {}  # namespace versions are never evicted
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, namespace) -> int:
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Backend shared by every worker process, on a Redis server.
+
+    ``redis`` is an optional dependency, only imported when this backend is
+    configured (RESPONSE_CACHE_BACKEND=redis). Entries expire after the
+    cache TTL, which also bounds how long an entry can survive the eviction
+    of its namespace version by the server.
+    """
+
+    def __init__(self, url: str, prefix: str = '2community:cache:'):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl: float):
+        self._client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def version(self, namespace) -> int:
+        return int(self._client.get(f'{self.prefix}version:{namespace}') or 0)
+
+    def bump(self, namespace):
+        self._client.incr(f'{self.prefix}version:{namespace}')
+
+
+class ResponseCache:
+    """Versioned response cache on top of a backend (``get``/``set``/``version``/``bump``)."""
+
+    def __init__(self, backend, ttl: float = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def key_for(self, namespace, path):
+        return (f'{namespace}:{self.backend.version(GLOBAL_NAMESPACE)}:'
+                f'{self.backend.version(namespace)}:{path}')
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, etag, body, mimetype):
+        self.backend.set(key, {'etag': etag, 'body': body, 'mimetype': mimetype}, self.ttl)
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'not_modified': self.not_modified}
+
+
+def build_backend(config):
+    backend = config.get('RESPONSE_CACHE_BACKEND', 'lru')
+    if backend == 'lru':
+        return LRUCacheBackend(config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    if backend == 'redis':
+        return RedisCacheBackend(config['RESPONSE_CACHE_REDIS_URL'])
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+
+def is_process_local(config) -> bool:
+    """True when the cache is on and only the current process sees it (lru backend)."""
+    return bool(config.get('RESPONSE_CACHE_ENABLED', False)) and config.get('RESPONSE_CACHE_BACKEND', 'lru') == 'lru'
+
+
+def check_response_cache(app):
+    """Refuse to start several web processes on per-process caches: each would serve its stale pages."""
+    if is_process_local(app.config) and app.config.get('WEB_CONCURRENCY', 1) > 1:
+        raise RuntimeError(
+            f"RESPONSE_CACHE_BACKEND=lru is per process and WEB_CONCURRENCY={app.config['WEB_CONCURRENCY']}: "
+            "use RESPONSE_CACHE_BACKEND=redis or RESPONSE_CACHE_ENABLED=0"
+        )
+
+
+def get_response_cache() -> ResponseCache:
+    """Response cache of the current application."""
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            'response_cache',
+            ResponseCache(build_backend(current_app.config), current_app.config.get('RESPONSE_CACHE_TTL', 300))
+        )
+    return cache
+
+
+def invalidate_responses(*namespaces):
+    """Drop the cached responses of ``namespaces`` (``"*"`` drops everything)."""
+    if not has_app_context() or not current_app.config.get('RESPONSE_CACHE_ENABLED', False):
+        return
+    get_response_cache().invalidate(*namespaces)
+
+
+def etag_of(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()
+
+
+def cached_response(namespace_template, bypass=None):
+    """Cache the 200 responses of a GET view under ``namespace_template``.
+
+    The template is formatted with the view arguments, e.g.
+    ``@cached_response("session:{session_id}")``. The cache key includes the
+    query string; ``bypass()`` returning True (streamed responses) skips
+    the cache.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('RESPONSE_CACHE_ENABLED', False) or (bypass and bypass()):
+                return view(*args, **kwargs)
+
+            cache = get_response_cache()
+            # the key is taken before the query: a write committed meanwhile bumps the
+            # version and the (possibly stale) page is stored under a key nobody reads
+            key = cache.key_for(namespace_template.format(**kwargs), request.full_path)
+            entry = cache.get(key)
+            if entry is not None:
+                cache.hits += 1
+                response = make_response(entry['body'], 200)
+                response.mimetype = entry['mimetype']
+                response.set_etag(entry['etag'])
+            else:
+                cache.misses += 1
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                response.set_etag(etag_of(response.get_data()))
+                cache.set(key, response.get_etag()[0], response.get_data(as_text=True), response.mimetype)
+
+            response.cache_control.no_cache = True  # clients must revalidate with If-None-Match
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                cache.not_modified += 1
+            return response
+        return wrapper
+
+    return decorator
@@ -0,0 +1,154 @@
+"""Shared fixtures.
+
+``app`` is created once per test process on the in-memory database of
+TestingConfig, so ``pytest -n auto`` (pytest-xdist) gives every worker a
+database of its own and no file is shared. ``client`` and ``factory`` run
+each test in a transaction rolled back at the end: the commits of the code
+under test only release a SAVEPOINT of that transaction.
+"""
+import contextlib
+import itertools
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+# upper bound of SQL statements a list endpoint may issue, whatever the result size
+MAX_LIST_ENDPOINT_QUERIES = 6
+
+# per-application state that must not outlive a rolled back test
+TEST_SCOPED_EXTENSIONS = ('response_cache', 'recent_writes', 'revocation_cache', 'rate_limiter')
+
+
+@pytest.fixture(scope='session')
+def app():
+    from community import create_app
+
+    app = create_app(testing=True)
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == 'sqlite://', 'the shared app needs the in-memory database'
+    yield app
+
+
+@pytest.fixture
+def db_session(app):
+    """``db.session`` joined to a transaction rolled back after the test."""
+    from community import db
+
+    with app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        factory = db.session.session_factory
+        previous, previous_class = dict(factory.kw), factory.class_
+
+        class JoinedSession(previous_class):
+            # Flask-SQLAlchemy picks the engine itself and would ignore the bound connection
+            def get_bind(self, *args, **kwargs):
+                return self.bind
+
+        db.session.remove()
+        factory.class_ = JoinedSession
+        factory.configure(bind=connection, join_transaction_mode='create_savepoint')
+        try:
+            yield db.session
+        finally:
+            db.session.remove()
+            factory.class_ = previous_class
+            factory.kw.clear()
+            factory.kw.update(previous)
+            transaction.rollback()
+            connection.close()
+            for name in TEST_SCOPED_EXTENSIONS:
+                app.extensions.pop(name, None)
+
+
+@pytest.fixture
+def client(app, db_session):
+    return app.test_client()
+
+
+class Factory:
+    """Builds users, sessions and payout schedules directly, without HTTP round trips."""
+
+    def __init__(self, session):
+        from community.controllers.contribution_controller import ContributionController
+
+        self.session = session
+        self.controller = ContributionController(session)
+        self._sequence = itertools.count(1)
+
+    def user(self, email=None, password='password123', role=None, **fields):
+        from community.models.user_model import User, UserRole
+
+        n = next(self._sequence)
+        user = User(
+            firstname=fields.pop('firstname', f'first{n}'),
+            lastname=fields.pop('lastname', f'last{n}'),
+            email=email or f'user{n}@example.com',
+            salt='salt',
+            role=role or UserRole.USER,
+            **fields
+        )
+        user.set_password(password, 'salt')
+        self.session.add(user)
+        self.session.commit()
+        return user
+
+    def users(self, count, **fields):
+        return [self.user(**fields) for _ in range(count)]
+
+    def run(self, parts=(1,), minimal_contribution=100, start_date=date(2025, 1, 1), users=None,
+            lazy_schedule=False, generate=True):
+        """Session with one member per entry of ``parts``, new users unless ``users`` is given.
+
+        The months are generated unless ``generate`` is False or the session is lazy.
+        """
+        users = users or self.users(len(parts))
+        run = self.controller.create_session(len(parts), minimal_contribution, start_date, lazy_schedule)
+        for user, number_of_parts in zip(users, parts):
+            self.controller.add_user_to_session(run.id, user.id, number_of_parts)
+        if generate and not lazy_schedule:
+            self.controller.generate_monthly_contributions(run.id)
+        return run
+
+    def schedule(self, run, method='fixed', seed=None, order=None, bids=None):
+        return self.controller.schedule_winners(run.id, method, seed, order, bids)
+
+
+@pytest.fixture
+def factory(db_session):
+    return Factory(db_session)
+
+
+@pytest.fixture
+def capture_queries():
+    """Context manager recording the (statement, parameters) pairs executed inside it.
+
+    Must be used inside an application context::
+
+        with capture_queries() as queries:
+            client.get('/contribution/sessions')
+        assert len(queries) <= max_list_endpoint_queries
+    """
+    from community import db
+
+    @contextlib.contextmanager
+    def capturing():
+        queries = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            queries.append((statement, parameters))
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    return capturing
+
+
+@pytest.fixture
+def max_list_endpoint_queries():
+    """Upper bound of SQL statements a list endpoint may issue, whatever the result size."""
+    return MAX_LIST_ENDPOINT_QUERIES
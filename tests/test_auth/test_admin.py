@@ -0,0 +1,105 @@
+import datetime
+
+import jwt
+import pytest
+
+from community.models.user_model import User, UserRole
+
+
+@pytest.fixture(autouse=True)
+def users(factory):
+    return [factory.user(email=email, password="correct_password", role=role, firstname=email.split("@")[0],
+                         lastname=role.value)
+            for email, role in [("admin@example.com", UserRole.ADMIN), ("member@example.com", UserRole.USER)]]
+
+
+def login(client, email):
+    response = client.post('/auth/login', json={"email": email, "password": "correct_password"})
+    return response.get_json()["access_token"]
+
+
+def test_token_claims(client):
+    token = login(client, "admin@example.com")
+    claims = jwt.decode(token, client.application.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+    user = User.query.filter_by(email="admin@example.com").first()
+    assert claims["sub"] == str(user.id)
+    assert claims["user_id"] == user.id
+    assert claims["role"] == "admin"
+
+
+def test_admin_can_delete_user(client):
+    token = login(client, "admin@example.com")
+    member = User.query.filter_by(email="member@example.com").first()
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_non_admin_is_rejected_without_database_access(client, capture_queries):
+    token = login(client, "member@example.com")
+    admin = User.query.filter_by(email="admin@example.com").first()
+    with capture_queries() as queries:
+        response = client.delete(f'/auth/delete/{admin.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+    assert queries == []
+
+
+def test_missing_forged_and_expired_tokens(client):
+    member = User.query.filter_by(email="member@example.com").first()
+    assert client.delete(f'/auth/delete/{member.id}').status_code == 401
+
+    forged = jwt.encode({"sub": "1", "role": "admin", "iat": datetime.datetime.now(datetime.timezone.utc),
+                         "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)},
+                        "not_the_secret_key_but_long_enough", algorithm="HS256")
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
+
+    expired = jwt.encode({"sub": "1", "role": "admin", "iat": datetime.datetime(2020, 1, 1),
+                          "exp": datetime.datetime(2020, 1, 1, 1)},
+                         client.application.config['JWT_SECRET_KEY'], algorithm="HS256")
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {expired}"})
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "Token expiré"
+
+
+def test_revoked_admin_token_is_rejected(client):
+    from community.utils.jwt_utils import revoke_user_tokens
+
+    token = login(client, "admin@example.com")
+    admin = User.query.filter_by(email="admin@example.com").first()
+    member = User.query.filter_by(email="member@example.com").first()
+    revoke_user_tokens(admin.id)
+
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "Token invalide"
+
+
+def test_password_change_revokes_only_the_older_tokens(client):
+    token = login(client, "admin@example.com")
+    admin = User.query.filter_by(email="admin@example.com").first()
+    member = User.query.filter_by(email="member@example.com").first()
+    assert client.put(f'/auth/update/{admin.id}', json={"password": "new_password"}).status_code == 200
+
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+    # issued within the same second as the change: accepted
+    token = client.post('/auth/login', json={"email": "admin@example.com", "password": "new_password"}
+                        ).get_json()["access_token"]
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+
+def test_revocation_by_another_process_is_read_from_the_database(client, monkeypatch):
+    from community.models import db
+    from community.utils.jwt_utils import now_ms
+
+    monkeypatch.setitem(client.application.config, 'REVOCATION_CACHE_TTL', 0)
+    token = login(client, "admin@example.com")
+    admin = User.query.filter_by(email="admin@example.com").first()
+    member = User.query.filter_by(email="member@example.com").first()
+    # what another worker commits when the password changes; this process cached nothing newer
+    User.query.filter_by(id=admin.id).update({User.tokens_valid_after: now_ms() + 1})
+    db.session.commit()
+
+    response = client.delete(f'/auth/delete/{member.id}', headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+pytest.importorskip("asgiref")
+pytest.importorskip("aiosqlite")
+httpx = pytest.importorskip("httpx")
+
+from community import create_app, db  # noqa: E402
+from community.asgi import create_asgi_app  # noqa: E402
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    from community.config import TestingConfig
+
+    # the asyncio engine opens its own connections: the database must be a file
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'asgi.db'}")
+    monkeypatch.setattr(TestingConfig, 'RESPONSE_CACHE_ENABLED', True)
+    flask_app = create_app(testing=True)
+    asgi_app = create_asgi_app(flask_app)
+    yield asgi_app
+    with flask_app.app_context():
+        db.engine.dispose()
+
+
+def run_client(asgi_app, scenario):
+    async def main():
+        transport = httpx.ASGITransport(app=asgi_app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+                return await scenario(client)
+        finally:
+            await asgi_app.engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_reads_run_on_the_async_engine(asgi_app):
+    async_statements = []
+    event.listen(asgi_app.engine.sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: async_statements.append(statement))
+
+    async def scenario(client):
+        created = await client.post('/contribution/session', json={
+            'number_of_members': 2, 'minimal_contribution': 50, 'start_date': '2025-01-01'
+        })
+        assert created.status_code == 201
+        assert not async_statements  # writes keep the WSGI path
+
+        sessions = await asyncio.gather(*[client.get('/contribution/sessions') for _ in range(10)])
+        assert {response.status_code for response in sessions} == {200}
+        assert sessions[0].json()[0]['id'] == created.json()['session_id']
+        assert async_statements
+
+        etag = sessions[0].headers['etag']
+        assert (await client.get('/contribution/sessions', headers={'If-None-Match': etag})).status_code == 304
+
+        # a write invalidates the cached page read on the event loop
+        await client.post('/contribution/session', json={
+            'number_of_members': 3, 'minimal_contribution': 50, 'start_date': '2025-02-01'
+        })
+        assert len((await client.get('/contribution/sessions')).json()) == 2
+
+        assert (await client.get('/contribution/session/99/summary')).status_code == 404
+        assert (await client.get('/contribution/session/1/summary?as_of=demain')).status_code == 400
+        head = await client.head('/contribution/sessions')
+        assert head.status_code == 200 and head.content == b''
+
+        streamed = await client.get('/contribution/user/1/payments?stream=1')
+        assert streamed.headers['content-type'].startswith('application/x-ndjson')
+
+    run_client(asgi_app, scenario)
+
+
+def test_in_memory_database_is_refused():
+    with pytest.raises(ValueError, match="in-memory"):
+        create_asgi_app(create_app(testing=True))
@@ -1,20 +1,13 @@
+import io
+
 import pytest
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
-from community import create_app, db
+from community import db
+from community.controllers.contribution_controller import iter_member_schedule, iter_schedule
 from community.models.user_model import UserRole
 
 
-@pytest.fixture
-def client():
-    app = create_app(testing=True)
-    with app.app_context():
-        db.create_all()
-        yield app.test_client()
-        db.session.remove()
-        db.drop_all()
-
-
 def test_create_contribution_session(client):
     response = client.post('/contribution/session', json={
         'number_of_members': 3,
@@ -198,3 +191,600 @@ def test_set_month_winner(client):
     assert resp2.status_code == 200
     data = resp2.get_json()
     assert data['winner_user_id'] == user_id
+
+
+def test_generate_monthly_contributions_bulk(client):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.contribution_model import Contribution, UserMonthlyContribution
+    from community.models.user_model import User
+
+    users = []
+    for index in range(2):
+        user = User(firstname=f'bulk{index}', lastname=f'user{index}', email=f'bulk{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    session = controller.create_session(2, 100, datetime.utcnow().date())
+    controller.add_user_to_session(session.id, users[0].id, 1)
+    controller.add_user_to_session(session.id, users[1].id, 2)
+
+    # 3 parts -> 3 months, one row per member and per month
+    contribution_ids = controller.generate_monthly_contributions(session.id, chunk_size=4)
+    assert len(contribution_ids) == 6
+    assert len(set(contribution_ids)) == 6
+
+    contributions = Contribution.query.filter(Contribution.id.in_(contribution_ids)).all()
+    assert sorted(c.amount for c in contributions) == [100, 100, 100, 200, 200, 200]
+
+    monthly = UserMonthlyContribution.query.all()
+    assert len(monthly) == 6
+    assert {m.contribution_id for m in monthly} == set(contribution_ids)
+    for m in monthly:
+        assert m.amount == m.contribution.amount
+        assert m.user_id == m.contribution.user_contribution_run.user_id
+
+
+def test_generate_monthly_contributions_is_incremental(client):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.contribution_model import Contribution, UserMonthlyContribution
+    from community.models.user_model import User
+
+    users = []
+    for index in range(2):
+        user = User(firstname=f'inc{index}', lastname=f'user{index}', email=f'inc{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    session = controller.create_session(2, 100, datetime.utcnow().date())
+    controller.add_user_to_session(session.id, users[0].id, 2)
+
+    assert len(controller.generate_monthly_contributions(session.id)) == 2
+    # a second call does not duplicate anything
+    assert controller.generate_monthly_contributions(session.id) == []
+    assert Contribution.query.count() == 2
+
+    # late joiner: 3 months for them, plus the third month for the first member
+    late = controller.add_user_to_session(session.id, users[1].id, 1)
+    new_ids = controller.generate_monthly_contributions(session.id)
+    assert len(new_ids) == 4
+    new_rows = Contribution.query.filter(Contribution.id.in_(new_ids)).all()
+    assert sum(1 for c in new_rows if c.user_contribution_run_id == late.id) == 3
+    assert Contribution.query.count() == 6
+    assert UserMonthlyContribution.query.count() == 6
+
+    response = client.post(f'/contribution/session/{session.id}/generate-months')
+    assert response.status_code == 200
+    assert response.get_json()['generated'] == 0
+
+
+def test_lazy_schedule_session(client):
+    from community.models.contribution_model import Contribution, UserMonthlyContribution
+
+    start_date = datetime(2025, 1, 1).date()
+    resp = client.post('/contribution/session', json={
+        'number_of_members': 2,
+        'minimal_contribution': 100,
+        'start_date': start_date.isoformat(),
+        'lazy_schedule': True
+    })
+    session_id = resp.get_json()['session_id']
+
+    user_ids = []
+    for index, parts in enumerate([1, 2]):
+        client.post('auth/register', json={
+            'first_name': f'lazy{index}',
+            'last_name': f'member{index}',
+            'email': f'lazy{index}@example.com',
+            'password': 'password123'
+        })
+        user_id = client.get(f'auth/get_id/lazy{index}@example.com').get_json()['user_id']
+        client.post(f'/contribution/session/{session_id}/add-user', json={
+            'user_id': user_id,
+            'number_of_parts': parts
+        })
+        user_ids.append(user_id)
+
+    resp = client.post(f'/contribution/session/{session_id}/generate-months')
+    assert resp.get_json()['generated'] == 0
+    assert Contribution.query.count() == 0
+
+    # 3 months x 2 members, all virtual
+    schedule = client.get(f'/contribution/session/{session_id}/contributions').get_json()
+    assert len(schedule) == 6
+    assert all(c['id'] is None and c['status'] == 'PENDING' for c in schedule)
+    assert sorted(c['amount'] for c in schedule) == [100, 100, 100, 200, 200, 200]
+
+    # paying a virtual cell persists only that cell
+    resp = client.post(f'/contribution/session/{session_id}/payment', json={
+        'user_id': user_ids[1],
+        'month': start_date.isoformat()
+    })
+    assert resp.status_code == 200
+    assert resp.get_json()['status'] == 'PAID'
+    assert Contribution.query.count() == 1
+    assert UserMonthlyContribution.query.count() == 1
+
+    payments = client.get(f'/contribution/user/{user_ids[1]}/payments').get_json()
+    assert len(payments) == 3
+    assert [p['status'] for p in payments].count('PAID') == 1
+    assert sum(1 for p in payments if p['id'] is None) == 2
+
+    schedule = client.get(f'/contribution/session/{session_id}/contributions').get_json()
+    assert len(schedule) == 6
+    assert sum(1 for c in schedule if c['id'] is not None) == 1
+
+    resp = client.post(f'/contribution/session/{session_id}/winner', json={
+        'winner_user_id': user_ids[0],
+        'month': start_date.isoformat()
+    })
+    assert resp.status_code == 200
+    assert resp.get_json()['winner_user_id'] == user_ids[0]
+    assert Contribution.query.count() == 2
+
+    resp = client.post(f'/contribution/session/{session_id}/payment', json={
+        'user_id': user_ids[0],
+        'month': '2030-01-01'
+    })
+    assert resp.status_code == 404
+
+
+def test_record_payment_maintains_counters(client):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.contribution_model import Contribution, ContributionStatus
+    from community.models.user_model import User
+
+    user = User(firstname='counter', lastname='user', email='counter@example.com',
+                salt='salt', role=UserRole.USER)
+    user.set_password('password123', 'salt')
+    db.session.add(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    session = controller.create_session(1, 100, datetime.utcnow().date())
+    controller.add_user_to_session(session.id, user.id, 2)
+    contribution_ids = controller.generate_monthly_contributions(session.id)
+
+    contribution = db.session.get(Contribution, contribution_ids[0])
+    assert (contribution.expected_count, contribution.paid_count, contribution.paid_amount) == (1, 0, 0)
+
+    payment = contribution.user_monthly_contributions[0]
+    controller.record_payment(payment.id)
+    # paying twice does not count twice
+    controller.record_payment(payment.id)
+
+    contribution = db.session.get(Contribution, contribution_ids[0])
+    assert (contribution.paid_count, contribution.paid_amount) == (1, 200)
+    assert contribution.status == ContributionStatus.PAID
+
+    # corrupt the counters, then rebuild them from the CLI
+    contribution.paid_count = 0
+    contribution.paid_amount = 0
+    db.session.commit()
+    runner = client.application.test_cli_runner()
+    result = runner.invoke(args=['contributions', 'rebuild-counters', '--check'])
+    assert result.exit_code == 1
+    assert f'1 contribution counter(s) found: {contribution.id}' in result.output
+
+    result = runner.invoke(args=['contributions', 'rebuild-counters'])
+    assert result.exit_code == 0
+    contribution = db.session.get(Contribution, contribution_ids[0])
+    assert (contribution.paid_count, contribution.paid_amount) == (1, 200)
+    assert controller.rebuild_contribution_counters() == []
+
+
+def test_record_payments_batch(client):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.contribution_model import Contribution, ContributionStatus, UserMonthlyContribution
+    from community.models.user_model import User
+
+    users = []
+    for index in range(3):
+        user = User(firstname=f'batch{index}', lastname=f'user{index}', email=f'batch{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    session = controller.create_session(3, 100, datetime.utcnow().date())
+    for user in users:
+        controller.add_user_to_session(session.id, user.id, 1)
+    controller.generate_monthly_contributions(session.id)
+    payment_ids = [p.id for p in UserMonthlyContribution.query.order_by(UserMonthlyContribution.id)]
+    assert len(payment_ids) == 9
+
+    controller.record_payment(payment_ids[0])
+
+    response = client.post('/contribution/payments/batch', json={'payments': [
+        {'user_monthly_contrib_id': payment_ids[0]},
+        {'user_monthly_contrib_id': payment_ids[1], 'payment_date': '2025-01-31'},
+        {'user_monthly_contrib_id': payment_ids[1]},
+        {'user_monthly_contrib_id': 9999},
+        {'user_monthly_contrib_id': payment_ids[2], 'payment_date': 'not-a-date'},
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r['status'] for r in data['results']] == ['ALREADY_PAID', 'PAID', 'DUPLICATE', 'NOT_FOUND', 'INVALID']
+    assert data['summary'] == {'ALREADY_PAID': 1, 'PAID': 1, 'DUPLICATE': 1, 'NOT_FOUND': 1, 'INVALID': 1}
+
+    csv_body = 'user_monthly_contrib_id,payment_date\n' + '\n'.join(
+        f'{payment_id},2025-02-01' for payment_id in payment_ids[2:])
+    response = client.post('/contribution/payments/batch', data=csv_body, content_type='text/csv')
+    assert response.status_code == 200
+    assert response.get_json()['summary'] == {'PAID': 7}
+
+    db.session.expire_all()
+    assert all(p.status.name == 'PAID' for p in UserMonthlyContribution.query)
+    for contribution in Contribution.query:
+        assert contribution.status == ContributionStatus.PAID
+        assert (contribution.paid_count, contribution.paid_amount) == (1, 100)
+    assert controller.rebuild_contribution_counters() == []
+
+    for body in ([{'user_monthly_contrib_id': payment_ids[0]}], 'payments', {'payments': 'x'}):
+        assert client.post('/contribution/payments/batch', json=body).status_code == 400
+
+    # not UTF-8, then a field beyond csv.field_size_limit()
+    for csv_body in ('user_monthly_contrib_id\n1\xe9\n'.encode('latin-1'),
+                     ('user_monthly_contrib_id\n"' + 'x' * 200000 + '"\n').encode()):
+        response = client.post('/contribution/payments/batch', data={'file': (io.BytesIO(csv_body), 'payments.csv')})
+        assert response.status_code == 400
+        assert response.get_json()['error'].startswith('Invalid CSV file')
+
+
+def _walk_pages(client, url, limit):
+    items, cursor = [], None
+    while True:
+        query = f'{url}?limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(query).get_json()
+        items.extend(page['items'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return items
+
+
+def test_keyset_pagination_and_fields(client):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.user_model import User
+
+    users = []
+    for index in range(3):
+        user = User(firstname=f'page{index}', lastname=f'user{index}', email=f'page{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    eager = controller.create_session(3, 100, datetime(2025, 1, 1).date())
+    lazy = controller.create_session(3, 100, datetime(2025, 1, 1).date(), lazy_schedule=True)
+    for session in (eager, lazy):
+        for index, user in enumerate(users):
+            controller.add_user_to_session(session.id, user.id, index + 1)
+    controller.generate_monthly_contributions(eager.id)
+    lazy_payment = controller.materialize_cell(lazy.id, users[0].id, datetime(2025, 1, 31).date())
+    controller.record_payment(lazy_payment.id)
+
+    for session in (eager, lazy):
+        url = f'/contribution/session/{session.id}/contributions'
+        full = client.get(url).get_json()
+        assert len(full) == 18
+        paged = _walk_pages(client, url, 4)
+        assert sorted(paged, key=lambda c: (c['month'], c['user_id'])) == \
+            sorted(full, key=lambda c: (c['month'], c['user_id']))
+        assert [c['month'] for c in paged] == sorted(c['month'] for c in paged)
+
+    payments = _walk_pages(client, f'/contribution/user/{users[0].id}/payments', 5)
+    assert len(payments) == 12
+    assert sum(1 for p in payments if p['status'] == 'PAID') == 1
+
+    sessions = _walk_pages(client, '/contribution/sessions', 1)
+    assert [s['id'] for s in sessions] == [eager.id, lazy.id]
+
+    response = client.get('/contribution/sessions?fields=id,start_date')
+    assert response.get_json() == [{'id': eager.id, 'start_date': '2025-01-01'},
+                                   {'id': lazy.id, 'start_date': '2025-01-01'}]
+
+    assert client.get('/contribution/sessions?fields=id,password').status_code == 400
+    assert client.get('/contribution/sessions?limit=0').status_code == 400
+    assert client.get(f'/contribution/session/{eager.id}/contributions?cursor=garbage').status_code == 400
+
+
+def test_lazy_pages_only_build_their_window(factory, monkeypatch):
+    from community.controllers import contribution_controller
+
+    run = factory.run(parts=(1,) * 10, lazy_schedule=True)
+    user_runs = factory.controller._load_user_runs(run.id)
+    for month_index in (0, 3, 7):
+        month = run.start_date + timedelta(days=30 * month_index)
+        factory.controller.materialize_cell(run.id, user_runs[month_index][1], month)
+    full = [(c.month, c.user_contribution_run_id) for c in factory.controller.get_session_contributions(run.id)]
+    assert len(full) == 100
+
+    built = []
+
+    def counting_schedule(*args):
+        for cell in iter_schedule(*args):
+            built.append(cell)
+            yield cell
+
+    monkeypatch.setattr(contribution_controller, 'iter_schedule', counting_schedule)
+    pages, after = [], None
+    while True:
+        built.clear()
+        page = factory.controller.get_session_contributions(run.id, after=after, limit=7)
+        # the cursor month plus the page, never the whole schedule
+        assert len(built) <= 7 + 10
+        if not page:
+            break
+        pages.extend((c.month, c.user_contribution_run_id) for c in page)
+        after = pages[-1]
+    assert pages == full
+
+
+def test_lazy_user_payment_pages_only_build_the_user_cells(factory, monkeypatch):
+    from community.controllers import contribution_controller
+    from community.models.contribution_model import UserMonthlyContribution
+
+    def cell_of(payment):
+        cell = payment.contribution if isinstance(payment, UserMonthlyContribution) else payment
+        return cell.month, cell.user_contribution_run_id
+
+    member = factory.user()
+    factory.run(parts=(2, 1), users=[member, factory.user()])
+    lazy = [factory.run(parts=(1,) * 8, users=[member] + factory.users(7), lazy_schedule=True, start_date=start)
+            for start in (date(2025, 1, 1), date(2025, 3, 15))]
+    for month_index in (0, 5):
+        factory.controller.materialize_cell(lazy[0].id, member.id, lazy[0].start_date + timedelta(days=30 * month_index))
+    full = sorted(cell_of(p) for p in factory.controller.get_user_payments(member.id))
+    assert len(full) == 3 + 8 + 8
+
+    built = []
+
+    def counting(schedule):
+        def counting_schedule(*args):
+            for cell in schedule(*args):
+                built.append(cell)
+                yield cell
+        return counting_schedule
+
+    monkeypatch.setattr(contribution_controller, 'iter_schedule', counting(iter_schedule))
+    monkeypatch.setattr(contribution_controller, 'iter_member_schedule', counting(iter_member_schedule))
+    pages, after = [], None
+    while True:
+        built.clear()
+        page = factory.controller.get_user_payments(member.id, after=after, limit=4)
+        # the page plus the cursor month of each lazy session, never the other members' cells
+        assert len(built) <= 4 + 2 * len(lazy)
+        if not page:
+            break
+        pages.extend(cell_of(p) for p in page)
+        after = pages[-1]
+    assert pages == full
+
+
+def test_list_endpoints_query_count_is_bounded(client, capture_queries, max_list_endpoint_queries, monkeypatch):
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.user_model import User
+
+    monkeypatch.setitem(client.application.config, 'RESPONSE_CACHE_ENABLED', False)  # count the queries, not the cache hits
+    controller = ContributionController(db.session)
+    eager = controller.create_session(6, 100, datetime(2025, 1, 1).date())
+    lazy = controller.create_session(6, 100, datetime(2025, 1, 1).date(), lazy_schedule=True)
+
+    def add_member(index):
+        user = User(firstname=f'count{index}', lastname=f'user{index}', email=f'count{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        db.session.commit()
+        for session in (eager, lazy):
+            controller.add_user_to_session(session.id, user.id, 1)
+        controller.generate_monthly_contributions(eager.id)
+        return user.id
+
+    first_user_id = add_member(0)
+    urls = [
+        '/contribution/sessions',
+        f'/contribution/session/{eager.id}/contributions',
+        f'/contribution/session/{lazy.id}/contributions',
+        f'/contribution/user/{first_user_id}/payments',
+        f'/contribution/user/{first_user_id}/payments?limit=2',
+        '/contribution/all_user_contributions',
+    ]
+
+    def statement_counts():
+        counts = []
+        for url in urls:
+            db.session.expire_all()
+            with capture_queries() as queries:
+                assert client.get(url).status_code == 200
+            counts.append(len(queries))
+        return counts
+
+    small = statement_counts()
+    for index in range(1, 6):
+        add_member(index)
+    large = statement_counts()
+
+    assert small == large
+    assert max(large) <= max_list_endpoint_queries
+
+
+def test_ndjson_streaming_exports(client):
+    import json
+    from community.controllers.contribution_controller import ContributionController
+    from community.models.user_model import User
+
+    users = []
+    for index in range(2):
+        user = User(firstname=f'stream{index}', lastname=f'user{index}', email=f'stream{index}@example.com',
+                    salt='salt', role=UserRole.USER)
+        user.set_password('password123', 'salt')
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    controller = ContributionController(db.session)
+    eager = controller.create_session(2, 100, datetime(2025, 1, 1).date())
+    lazy = controller.create_session(2, 100, datetime(2025, 1, 1).date(), lazy_schedule=True)
+    for session in (eager, lazy):
+        for user in users:
+            controller.add_user_to_session(session.id, user.id, 2)
+    controller.generate_monthly_contributions(eager.id)
+    controller.record_payment(controller.materialize_cell(lazy.id, users[0].id, datetime(2025, 1, 1).date()).id)
+
+    def by_key(items):
+        return sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+
+    for session in (eager, lazy):
+        url = f'/contribution/session/{session.id}/contributions'
+        response = client.get(url + '?stream=1')
+        assert response.mimetype == 'application/x-ndjson'
+        streamed = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert by_key(streamed) == by_key(client.get(url).get_json())
+
+    url = f'/contribution/user/{users[0].id}/payments'
+    response = client.get(url + '?fields=id,status,month', headers={'Accept': 'application/x-ndjson'})
+    streamed = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(streamed) == 8
+    assert all(set(item) == {'id', 'status', 'month'} for item in streamed)
+    expected = [{k: p[k] for k in ('id', 'status', 'month')} for p in client.get(url).get_json()]
+    assert by_key(streamed) == by_key(expected)
+
+
+def test_session_summary_totals_per_month_and_member(client, factory):
+    from community.models.contribution_model import Contribution, UserMonthlyContribution
+
+    controller = factory.controller
+    users = factory.users(2)
+    first, second = (user.id for user in users)
+    session = factory.run(parts=(1, 1), users=users)
+
+    payments = db.session.query(UserMonthlyContribution).join(Contribution).order_by(
+        Contribution.month, UserMonthlyContribution.user_id
+    ).all()
+    controller.record_payment(payments[0].id)
+    controller.record_payments_batch([(payments[1].id, None), (payments[2].id, None)])
+    controller.set_month_winner(payments[0].contribution_id, first)
+
+    response = client.get(f'/contribution/session/{session.id}/summary?as_of=2025-03-01')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["totals"] == {"expected": 400, "collected": 300, "outstanding": 100, "cells": 4,
+                              "paid_cells": 3, "late_cells": 1, "late_amount": 100}
+    assert [(m["month"], m["collected"], m["late_cells"], m["winner_user_ids"]) for m in data["months"]] == [
+        ("2025-01-01", 200, 0, [first]),
+        ("2025-01-31", 100, 1, []),
+    ]
+    assert [(m["user_id"], m["collected"], m["outstanding"], m["wins"]) for m in data["members"]] == [
+        (first, 200, 0, 1),
+        (second, 100, 100, 0),
+    ]
+
+    # the maintained summaries match a rebuild from the contribution counters
+    controller.rebuild_session_summaries(session.id)
+    db.session.commit()
+    rebuilt = controller.get_session_summary(session.id, datetime(2025, 3, 1).date())
+    assert rebuilt.totals.paid_cells == 3
+    assert [m.collected for m in rebuilt.months] == [200, 100]
+
+
+def test_lazy_session_summary_counts_virtual_cells(factory):
+    controller = factory.controller
+    users = factory.users(2)
+    first = users[0].id
+    session = factory.run(parts=(1, 2), users=users, lazy_schedule=True)
+    payment = controller.materialize_cell(session.id, first, datetime(2025, 1, 1).date())
+    controller.record_payment(payment.id)
+
+    summary = controller.get_session_summary(session.id, datetime(2025, 2, 15).date())
+    # 3 months (one per part), first pays 100 per month, second 200
+    assert (summary.totals.cells, summary.totals.expected, summary.totals.collected) == (6, 900, 100)
+    assert [(m.cells, m.expected, m.late_cells) for m in summary.months] == [(2, 300, 1), (2, 300, 2), (2, 300, 0)]
+    assert [(m.late_cells, m.late_amount) for m in summary.members] == [(1, 100), (2, 400)]
+
+
+def test_session_summary_unknown_session(client):
+    assert client.get('/contribution/session/999/summary').status_code == 404
+    assert client.get('/contribution/session/999/summary?as_of=demain').status_code == 400
+
+
+def rotation_session(factory, parts):
+    users = factory.users(len(parts))
+    session = factory.run(parts=parts, users=users)
+    return factory.controller, session.id, [user.id for user in users]
+
+
+def cell_id(session_id, user_id, month):
+    from community.models.contribution_model import Contribution, UserContributionRun
+
+    return db.session.query(Contribution.id).join(UserContributionRun).filter(
+        Contribution.contribution_run_id == session_id,
+        UserContributionRun.user_id == user_id,
+        Contribution.month == month
+    ).scalar()
+
+
+def test_set_month_winner_allows_one_win_per_part(client, factory):
+    controller, session_id, (first, second) = rotation_session(factory, [1, 1])
+    january, february = datetime(2025, 1, 1).date(), datetime(2025, 1, 31).date()
+
+    controller.set_month_winner(cell_id(session_id, first, january), first)
+    assert controller.eligible_winners(session_id, january) == []
+    assert controller.eligible_winners(session_id, february) == [second]
+    with pytest.raises(ValueError, match="déjà gagné"):
+        controller.set_month_winner(cell_id(session_id, first, february), first)
+    with pytest.raises(ValueError, match="déjà un gagnant"):
+        controller.set_month_winner(cell_id(session_id, second, january), second)
+
+    response = client.post(f'/contribution/{cell_id(session_id, second, february)}/winner',
+                           json={'winner_user_id': second})
+    assert response.status_code == 200
+
+
+def test_schedule_winners_random_and_bidding(client, factory):
+    controller, session_id, user_ids = rotation_session(factory, [1, 2, 1])
+
+    response = client.post(f'/contribution/session/{session_id}/schedule-winners', json={'method': 'random', 'seed': 3})
+    assert response.status_code == 200
+    schedule = response.get_json()['schedule']
+    assert sorted(slot['user_id'] for slot in schedule) == sorted([user_ids[0], user_ids[1], user_ids[1], user_ids[2]])
+    again = client.post(f'/contribution/session/{session_id}/schedule-winners', json={'method': 'random', 'seed': 3})
+    assert again.get_json()['schedule'] == schedule
+
+    first_month = datetime.strptime(schedule[0]['month'], "%Y-%m-%d").date()
+    planned = schedule[0]['user_id']
+    assert controller.eligible_winners(session_id, first_month) == [planned]
+    other = next(user_id for user_id in user_ids if user_id != planned)
+    with pytest.raises(ValueError, match="calendrier"):
+        controller.set_month_winner(cell_id(session_id, other, first_month), other)
+    controller.set_month_winner(cell_id(session_id, planned, first_month), planned)
+
+    # the won month is kept, the three open months go to the highest bids first
+    remaining = [user_ids[0], user_ids[1], user_ids[1], user_ids[2]]
+    remaining.remove(planned)
+    bids = [{'user_id': user_id, 'amount': 10 * index} for index, user_id in enumerate(remaining)]
+    response = client.post(f'/contribution/session/{session_id}/schedule-winners',
+                           json={'method': 'bidding', 'bids': bids})
+    schedule = response.get_json()['schedule']
+    assert schedule[0]['user_id'] == planned
+    assert [slot['user_id'] for slot in schedule[1:]] == remaining[::-1]
+    assert [slot['bid'] for slot in schedule[1:]] == [20, 10, 0]
+
+    response = client.post(f'/contribution/session/{session_id}/schedule-winners',
+                           json={'method': 'fixed', 'order': [user_ids[0]]})
+    assert response.status_code == 400
+    for body in ({'method': 'fixed', 'order': user_ids[0]}, {'method': 'fixed', 'order': ['1', 2]},
+                 [{'method': 'fixed'}]):
+        response = client.post(f'/contribution/session/{session_id}/schedule-winners', json=body)
+        assert response.status_code == 400
@@ -0,0 +1,110 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import event, text
+
+from community import create_app, db
+from community.models.engine import engine_options
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_sqlite_pragmas_are_applied(tmp_path, monkeypatch):
+    from community.config import TestingConfig
+
+    # WAL and mmap only apply to a database file, not to the in-memory test database
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'pragmas.db'}")
+    app = create_app(testing=True)
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == app.config['SQLITE_BUSY_TIMEOUT_MS']
+        db.drop_all()
+
+
+def test_only_write_methods_take_the_write_lock(tmp_path, monkeypatch):
+    from community.config import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'begin.db'}")
+    app = create_app(testing=True)
+    begins = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: begins.append(statement) if statement.startswith('BEGIN')
+                     else None)
+    client = app.test_client()
+    client.get('/contribution/sessions')
+    assert begins == ['BEGIN DEFERRED']
+    client.post('/contribution/session', json={
+        'number_of_members': 2, 'minimal_contribution': 50, 'start_date': '2025-01-01'
+    })
+    # the write, then the reload of the created row after the commit
+    assert begins == ['BEGIN DEFERRED', 'BEGIN IMMEDIATE', 'BEGIN DEFERRED']
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+
+def test_password_hashing_runs_outside_the_write_lock(tmp_path, monkeypatch):
+    import sqlite3
+
+    from community.config import TestingConfig
+    from community.utils import passwords
+
+    path = tmp_path / 'hashing.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{path}")
+    app = create_app(testing=True)
+    locked = []
+
+    def probing_run_hashing(fn, *args):
+        # another writer must get the write lock at once while the hash is computed
+        probe = sqlite3.connect(path, timeout=0, isolation_level=None)
+        try:
+            probe.execute('BEGIN IMMEDIATE')
+            probe.execute('ROLLBACK')
+        except sqlite3.OperationalError as e:
+            locked.append(str(e))
+        finally:
+            probe.close()
+        return fn(*args)
+
+    monkeypatch.setattr(passwords, 'run_hashing', probing_run_hashing)
+    client = app.test_client()
+    assert client.post('/auth/register', json={
+        'first_name': 'Lock', 'last_name': 'Free', 'email': 'lock@example.com', 'password': 'password123'
+    }).status_code == 201
+    user_id = client.get('/auth/get_id/lock@example.com').get_json()['user_id']
+    assert client.put(f'/auth/update/{user_id}', json={'password': 'new-password'}).status_code == 200
+    assert locked == []
+    with app.app_context():
+        db.drop_all()
+        db.engine.dispose()
+
+
+def test_engine_options_per_backend():
+    config = {
+        'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3, 'DB_POOL_PRE_PING': True, 'DB_POOL_RECYCLE': 60,
+        'DB_STATEMENT_TIMEOUT_MS': 1500, 'SQLITE_BUSY_TIMEOUT_MS': 2000,
+    }
+    options = engine_options(dict(config, SQLALCHEMY_DATABASE_URI='postgresql://u:p@db/app'))
+    assert options['pool_size'] == 7
+    assert options['max_overflow'] == 3
+    assert options['connect_args'] == {'options': '-c statement_timeout=1500'}
+
+    options = engine_options(dict(config, SQLALCHEMY_DATABASE_URI='sqlite:///app.db'))
+    assert options['connect_args'] == {'timeout': 2.0}
+
+    assert engine_options(dict(config, SQLALCHEMY_DATABASE_URI='sqlite://')) == {}
+
+
+def test_multi_process_writers_do_not_lock(tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(ROOT / 'src'), DATABASE_URL=f"sqlite:///{tmp_path / 'load.db'}")
+    result = subprocess.run(
+        [sys.executable, str(ROOT / 'benchmarks' / 'load_multiprocess.py'), '--processes', '3', '--operations', '40'],
+        env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'locked errors: 0' in result.stdout
@@ -0,0 +1,40 @@
+import pytest
+
+from community import db
+from community.models.contribution_model import ContributionRun, PayoutSlot
+from community.models.user_model import User
+
+
+@pytest.mark.parametrize("email", ["first@example.com", "second@example.com"])
+def test_each_test_starts_from_an_empty_database(client, email):
+    # whichever runs second would see the rows committed by the first
+    assert db.session.query(User).count() == 0
+    assert db.session.query(ContributionRun).count() == 0
+
+    response = client.post('/auth/register', json={
+        'first_name': email, 'last_name': email, 'email': email, 'password': 'password123'
+    })
+    assert response.status_code == 201
+    assert client.get('/contribution/sessions').get_json() == []
+    assert client.post('/contribution/session', json={
+        'number_of_members': 1, 'minimal_contribution': 100, 'start_date': '2025-01-01'
+    }).status_code == 201
+    assert len(client.get('/contribution/sessions').get_json()) == 1
+
+
+def test_rollback_inside_a_test_keeps_earlier_commits(db_session, factory):
+    user = factory.user()
+    db_session.add(User(firstname='x', lastname='y', email='pending@example.com', salt='s', password_hash='h'))
+    db_session.flush()
+    db_session.rollback()
+    assert [u.email for u in db_session.query(User)] == [user.email]
+
+
+def test_factory_builds_runs_and_schedules(factory):
+    run = factory.run(parts=(1, 2))
+    slots = factory.schedule(run)
+    assert [slot.month for slot in slots] == sorted(slot.month for slot in slots)
+    assert db.session.query(PayoutSlot).filter_by(contribution_run_id=run.id).count() == 3
+
+    lazy = factory.run(parts=(1, 1), lazy_schedule=True)
+    assert factory.controller.get_session_summary(lazy.id).totals.cells == 4
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from community.utils.hash_pool import HashPoolSaturated, HashWorkerPool
+
+
+@pytest.fixture
+def pooled_client(client, factory, monkeypatch):
+    app = client.application
+    monkeypatch.setitem(app.config, 'HASH_POOL_ENABLED', True)
+    monkeypatch.setitem(app.config, 'HASH_POOL_WORKERS', 1)
+    monkeypatch.setitem(app.config, 'HASH_POOL_QUEUE_DEPTH', 0)
+    factory.user(email="pool@example.com", password="correct_password")
+    yield client
+    pool = app.extensions.pop('hash_pool', None)
+    if pool:
+        pool.shutdown()
+
+
+def test_login_verifies_on_pool(pooled_client):
+    response = pooled_client.post('/auth/login', json={"email": "pool@example.com", "password": "correct_password"})
+    assert response.status_code == 200
+
+    stats = pooled_client.get('/auth/metrics/hash-pool').get_json()
+    assert stats["enabled"] is True
+    assert stats["workers"] == 1
+    # the fixture hash plus the login verification
+    assert stats["completed_total"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_saturated_pool_rejects_with_503(pooled_client):
+    pool = pooled_client.application.extensions['hash_pool']
+    pool._slots.acquire()  # the only slot is taken by another login
+    try:
+        response = pooled_client.post('/auth/login', json={"email": "pool@example.com", "password": "correct_password"})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+
+        response = pooled_client.post('/auth/register', json={
+            'first_name': 'late', 'last_name': 'comer', 'email': 'late@example.com', 'password': 'password123'
+        })
+        assert response.status_code == 503
+    finally:
+        pool._slots.release()
+    assert pool.stats()["rejected_total"] == 2
+
+
+def test_pool_bound():
+    pool = HashWorkerPool(workers=1, queue_depth=1)
+    assert pool._slots.acquire(blocking=False)
+    assert pool._slots.acquire(blocking=False)
+    with pytest.raises(HashPoolSaturated):
+        pool.run(len, "x")
+    pool._slots.release()
+    assert pool.run(len, "abc") == 3
+    pool.shutdown()
+
+
+def test_timed_out_job_keeps_its_slot():
+    pool = HashWorkerPool(workers=1, queue_depth=0, timeout=0.05)
+    with pytest.raises(HashPoolSaturated, match="timed out"):
+        pool.run(time.sleep, 1)
+    # the worker is still busy with the job: no second one is accepted
+    with pytest.raises(HashPoolSaturated, match="saturated"):
+        pool.run(len, "x")
+    assert pool.stats()["timed_out_total"] == 1
+
+    deadline = time.monotonic() + 30
+    while pool.stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    pool.timeout = 30
+    assert pool.run(len, "abc") == 3
+    pool.shutdown()
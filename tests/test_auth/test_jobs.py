@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from community import db
+from community.jobs import claim_job, requeue_stale_jobs, run_worker
+from community.models.contribution_model import UserMonthlyContribution
+from community.models.job_model import Job, JobStatus
+
+
+def test_generate_months_job(client, factory):
+    run_id = factory.run(parts=(1, 2), generate=False).id
+
+    response = client.post(f'/contribution/session/{run_id}/generate-months?async=1')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'] == f'/jobs/{job_id}'
+    assert client.get(f'/jobs/{job_id}').get_json()['status'] == 'QUEUED'
+    assert db.session.query(UserMonthlyContribution).count() == 0
+
+    assert run_worker(once=True) == 1
+    job = client.get(f'/jobs/{job_id}').get_json()
+    assert job['status'] == 'SUCCEEDED'
+    assert job['progress'] == {'done': 6, 'total': 6}
+    assert job['result'] == {'session_id': run_id, 'contributions_created': 6}
+    assert job['attempts'] == 1
+    assert db.session.query(UserMonthlyContribution).count() == 6
+    assert factory.controller.get_session_summary(run_id).totals.cells == 6
+
+
+def test_payments_batch_job(client, factory, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'JOB_BATCH_SIZE', 2)
+    factory.run(parts=(1, 1))
+    payment_ids = [payment.id for payment in db.session.query(UserMonthlyContribution).order_by('id')]
+
+    response = client.post('/contribution/payments/batch?async=1', json={'payments': [
+        {'user_monthly_contrib_id': payment_ids[0]},
+        {'user_monthly_contrib_id': payment_ids[1], 'payment_date': '2025-01-15'},
+        {'user_monthly_contrib_id': payment_ids[0]},
+        {'user_monthly_contrib_id': 999},
+        {'user_monthly_contrib_id': 'x'},
+    ]})
+    assert response.status_code == 202
+    assert response.get_json()['invalid'] == [{'line': 5, 'status': 'INVALID'}]
+
+    run_worker(once=True)
+    job = client.get(response.headers['Location']).get_json()
+    assert job['status'] == 'SUCCEEDED'
+    assert job['progress'] == {'done': 3, 'total': 3}
+    assert job['result']['summary'] == {'DUPLICATE': 1, 'PAID': 2, 'NOT_FOUND': 1}
+
+
+def test_failed_and_unknown_jobs(client):
+    response = client.post('/contribution/session/999/generate-months?async=1')
+    run_worker(once=True)
+    job = client.get(f"/jobs/{response.get_json()['job_id']}").get_json()
+    assert (job['status'], job['error']) == ('FAILED', 'Session not found')
+    assert client.get('/jobs/999').status_code == 404
+
+
+def test_stale_jobs_are_requeued_then_failed(client, factory):
+    run = factory.run(generate=False)
+    job_id = client.post(f'/contribution/session/{run.id}/generate-months?async=1').get_json()['job_id']
+    assert claim_job('lost-worker').id == job_id
+    assert claim_job('other-worker') is None
+
+    later = datetime.utcnow() + timedelta(seconds=client.application.config['JOB_STALE_SECONDS'] + 1)
+    assert requeue_stale_jobs(later) == 1
+    job = db.session.get(Job, job_id)
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == (JobStatus.QUEUED, 1)
+
+    db.session.query(Job).update({'status': JobStatus.RUNNING, 'attempts': 3})
+    db.session.commit()
+    assert requeue_stale_jobs(later) == 0
+    db.session.refresh(job)
+    assert job.status == JobStatus.FAILED
+
+
+def test_worker_cli(client, factory):
+    run = factory.run(generate=False)
+    client.post(f'/contribution/session/{run.id}/generate-months?async=1')
+    result = client.application.test_cli_runner().invoke(args=['jobs', 'worker', '--once'])
+    assert result.output.strip() == '1 job(s) run.'
+
+
+def test_jobs_are_refused_with_a_process_local_cache(client, factory, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'RESPONSE_CACHE_ENABLED', True)
+    run = factory.run(generate=False)
+    response = client.post(f'/contribution/session/{run.id}/generate-months?async=1')
+    assert response.status_code == 409
+    assert 'RESPONSE_CACHE_BACKEND=redis' in response.get_json()['error']
+    assert db.session.query(Job).count() == 0
+
+    result = client.application.test_cli_runner().invoke(args=['jobs', 'worker', '--once'])
+    assert result.exit_code == 1 and 'RESPONSE_CACHE_BACKEND=redis' in result.output
@@ -1,32 +1,10 @@
 import pytest
 
 
-@pytest.fixture
-def client():
-    from community import create_app
-    app = create_app(testing=True)
-    with app.test_client() as client:
-        with app.app_context():
-            # Ici, tu peux créer les tables et insérer un utilisateur de test
-            from community.models import db
-            from community.models.user_model import User, UserRole
-            db.create_all()
-
-            # Création d'un utilisateur test
-            salt = "testsalt"
-            user = User(
-                firstname="Test",
-                lastname="User",
-                email="testuser@example.com",
-                salt=salt,
-                role=UserRole.USER
-            )
-            user.set_password("correct_password", salt)
-            db.session.add(user)
-            db.session.commit()
-        yield client
-        db.session.remove()
-        db.drop_all()
+@pytest.fixture(autouse=True)
+def test_user(factory):
+    return factory.user(email="testuser@example.com", password="correct_password", firstname="Test",
+                        lastname="User")
 
 
 def test_login_success(client):
@@ -92,3 +70,24 @@ def test_login_missing_json(client):
     data = response.get_json()
     assert response.status_code == 400
     assert data["error"] == "Missing JSON body"
+
+
+def test_login_rehashes_outdated_hash(client, test_user):
+    from werkzeug.security import generate_password_hash
+    from community.models import db
+
+    test_user.password_hash = generate_password_hash("correct_password" + test_user.salt,
+                                                     method="pbkdf2:sha256:2000")
+    db.session.commit()
+    assert test_user.password_needs_rehash()
+
+    response = client.post('/auth/login', json={
+        "email": "testuser@example.com",
+        "password": "correct_password"
+    })
+    assert response.status_code == 200
+
+    db.session.refresh(test_user)
+    assert test_user.password_hash.startswith(client.application.config['PASSWORD_HASH_METHOD'] + '$')
+    assert not test_user.password_needs_rehash()
+    assert test_user.check_password("correct_password")
@@ -0,0 +1,75 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from community.utils.log import JsonFormatter
+from community.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture(autouse=True)
+def registry(app, monkeypatch):
+    # the shared app counts every test's requests: start from an empty registry
+    registry = MetricsRegistry()
+    monkeypatch.setitem(app.extensions, 'metrics', registry)
+    return registry
+
+
+def metric_value(text, sample):
+    for line in text.splitlines():
+        if line.startswith(sample + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metrics_endpoint_reports_requests(client, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'RESPONSE_CACHE_ENABLED', True)
+    session_id = client.post('/contribution/session', json={
+        'number_of_members': 2, 'minimal_contribution': 10, 'start_date': '2025-01-01'
+    }).get_json()['session_id']
+    client.get('/contribution/sessions')
+    client.get(f'/contribution/session/{session_id}/contributions')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    route = 'method="GET",route="/contribution/session/<int:session_id>/contributions"'
+    assert metric_value(text, f'http_requests_total{{{route},status="200"}}') == 1
+    assert metric_value(text, f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == 1
+    assert metric_value(text, f'http_request_db_statements_sum{{{route}}}') >= 1
+    assert metric_value(text, f'http_response_size_bytes_sum{{{route}}}') > 0
+    assert metric_value(text, 'response_cache_misses') == 2
+
+
+def test_slow_queries_are_logged(client, caplog, monkeypatch):
+    monkeypatch.setitem(client.application.config, 'SLOW_QUERY_MS', 0)
+    with caplog.at_level(logging.WARNING, logger='community.utils.metrics'):
+        client.get('/contribution/sessions')
+    slow = [record for record in caplog.records if record.getMessage() == 'slow query']
+    assert slow and slow[0].route == '/contribution/sessions'
+    assert metric_value(client.get('/metrics').get_data(as_text=True), 'db_slow_queries_total') >= 1
+
+
+def test_failed_statements_leave_no_timing_behind(app):
+    # a private engine: the listeners apply to every engine, the fixture connection stays untouched
+    engine = create_engine('sqlite://')
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.rollback()
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert not conn.info
+    engine.dispose()
+
+
+def test_json_log_format():
+    record = logging.LogRecord('community.test', logging.INFO, __file__, 1, 'session %s created', (3,), None)
+    record.session_id = 3
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['message'] == 'session 3 created'
+    assert entry['level'] == 'INFO'
+    assert entry['session_id'] == 3
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from community import create_app, db
+from community.migrations import HEAD_VERSION, current_version, upgrade
+
+# tables as created by db.create_all() before versioned migrations
+LEGACY_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, firstname VARCHAR(80) NOT NULL UNIQUE, "
+    "lastname VARCHAR(80) NOT NULL UNIQUE, email VARCHAR(120) NOT NULL UNIQUE, "
+    "password_hash VARCHAR(200) NOT NULL, salt VARCHAR(200) NOT NULL, role VARCHAR(5) NOT NULL, "
+    "admin_identifier VARCHAR(200))",
+    "CREATE TABLE admin_identifier_codes (id INTEGER PRIMARY KEY, code VARCHAR(64) NOT NULL UNIQUE)",
+    "CREATE TABLE contribution_runs (id INTEGER PRIMARY KEY, number_of_members INTEGER NOT NULL, "
+    "minimal_contribution FLOAT NOT NULL, start_date DATE NOT NULL, end_date DATE)",
+    "CREATE TABLE user_contribution_runs (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+    "contribution_run_id INTEGER NOT NULL, number_of_parts INTEGER NOT NULL, "
+    "CONSTRAINT uq_user_contribution_run UNIQUE (user_id, contribution_run_id))",
+    "CREATE TABLE contributions (id INTEGER PRIMARY KEY, contribution_run_id INTEGER NOT NULL, "
+    "user_contribution_run_id INTEGER NOT NULL, month DATE NOT NULL, amount FLOAT NOT NULL, "
+    "status VARCHAR(8) NOT NULL, winner_user_id INTEGER)",
+    "CREATE TABLE user_monthly_contributions (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+    "contribution_id INTEGER NOT NULL, amount FLOAT NOT NULL, status VARCHAR(7) NOT NULL, payment_date DATE)",
+]
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO contribution_runs VALUES (1, 2, 100, '2025-01-01', NULL)"))
+        conn.execute(text("INSERT INTO user_contribution_runs VALUES (1, 1, 1, 1), (2, 2, 1, 1)"))
+        for contribution_id in range(1, 8):
+            conn.execute(text(
+                "INSERT INTO contributions VALUES (:id, 1, :ucr, :month, 100, 'PENDING', NULL)"
+            ), {"id": contribution_id, "ucr": 1 + contribution_id % 2, "month": f"2025-{contribution_id:02d}-01"})
+            status = 'PAID' if contribution_id <= 3 else 'PENDING'
+            conn.execute(text(
+                "INSERT INTO user_monthly_contributions VALUES (:id, 1, :id, 100, :status, NULL)"
+            ), {"id": contribution_id, "status": status})
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_legacy_database(legacy_engine):
+    app = create_app(testing=True)
+    with app.app_context():
+        applied = upgrade(legacy_engine, batch_size=2)
+    assert applied == [2, 3, 4, 5, 6, 7, 8]
+
+    with legacy_engine.connect() as conn:
+        assert current_version(conn) == HEAD_VERSION
+        counters = conn.execute(text(
+            "SELECT id, expected_count, paid_count, paid_amount FROM contributions ORDER BY id"
+        )).all()
+        assert counters == [(i, 1, 1 if i <= 3 else 0, 100 if i <= 3 else 0) for i in range(1, 8)]
+        assert conn.execute(text("SELECT lazy_schedule FROM contribution_runs")).scalar() == 0
+        assert conn.execute(text(
+            "SELECT count(*), sum(cells), sum(paid_cells), sum(paid_amount) FROM contribution_month_summaries"
+        )).one() == (7, 7, 3, 300)
+        assert conn.execute(text(
+            "SELECT user_contribution_run_id, cells, paid_cells FROM contribution_member_summaries "
+            "ORDER BY user_contribution_run_id"
+        )).all() == [(1, 3, 1), (2, 4, 2)]
+
+    index_names = {index['name'] for index in inspect(legacy_engine).get_indexes('contributions')}
+    assert {'uq_contribution_cell', 'ix_contributions_run_month', 'ix_contributions_run_status_month'} <= index_names
+    assert 'ix_contributions_run_status' not in index_names
+
+    with app.app_context():
+        # replaying is a no-op
+        assert upgrade(legacy_engine) == []
+
+
+def test_upgrade_merges_duplicated_cells(legacy_engine):
+    # generate-months run twice before versioning: cells 1 and 5 exist twice
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO contributions VALUES (8, 1, 2, '2025-01-01', 100, 'PENDING', NULL), "
+            "(9, 1, 2, '2025-05-01', 100, 'RECEIVED', 2)"
+        ))
+        conn.execute(text(
+            "INSERT INTO user_monthly_contributions VALUES (8, 1, 8, 100, 'PENDING', NULL), "
+            "(9, 1, 9, 100, 'PAID', '2025-05-02')"
+        ))
+
+    app = create_app(testing=True)
+    with app.app_context():
+        assert upgrade(legacy_engine, batch_size=1) == [2, 3, 4, 5, 6, 7, 8]
+
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM contributions ORDER BY id")).scalars().all() == list(range(1, 8))
+        assert conn.execute(text(
+            "SELECT contribution_id, id, status FROM user_monthly_contributions WHERE contribution_id IN (1, 5) "
+            "ORDER BY contribution_id"
+        )).all() == [(1, 1, 'PAID'), (5, 9, 'PAID')]
+        assert conn.execute(text(
+            "SELECT status, winner_user_id, expected_count, paid_count FROM contributions WHERE id = 5"
+        )).one() == ('RECEIVED', 2, 1, 1)
+        assert conn.execute(text("SELECT wins FROM user_contribution_runs WHERE user_id = 2")).scalar() == 1
+
+
+def schema_of(engine):
+    inspector = inspect(engine)
+    return {table: (
+        sorted((column['name'], str(column['type']), column['nullable']) for column in inspector.get_columns(table)),
+        sorted(index['name'] for index in inspector.get_indexes(table) + inspector.get_unique_constraints(table)
+               if index['name']),
+        sorted((tuple(key['constrained_columns']), key['referred_table']) for key in inspector.get_foreign_keys(table)),
+    ) for table in inspector.get_table_names()}
+
+
+def test_fresh_database_runs_every_migration(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    reference = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+    app = create_app(testing=True)
+    with app.app_context():
+        assert upgrade(engine) == list(range(1, HEAD_VERSION + 1))
+        db.metadata.create_all(reference)
+    with engine.connect() as conn:
+        assert current_version(conn) == HEAD_VERSION
+    # the migrations build the schema of the models
+    assert schema_of(engine) == schema_of(reference)
+    engine.dispose()
+    reference.dispose()
+
+
+def test_schema_cli():
+    app = create_app(testing=True)
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['schema', 'current'])
+    assert result.output.strip() == f'current: {HEAD_VERSION}, latest: {HEAD_VERSION}'
+    result = runner.invoke(args=['schema', 'upgrade'])
+    assert 'Schema already up to date.' in result.output
+    with app.app_context():
+        db.drop_all()
@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from community import db
+
+# tables that must never be read with a full table scan by the controller queries
+HOT_TABLES = (
+    "contributions", "user_monthly_contributions", "user_contribution_runs",
+    "contribution_month_summaries", "contribution_member_summaries"
+)
+
+
+@pytest.fixture
+def controller(factory):
+    # session 1 is eager, session 2 lazy; the ids restart at 1 since every test is rolled back
+    users = factory.users(3)
+    for lazy in (False, True):
+        factory.run(parts=(1, 1, 1), users=users, lazy_schedule=lazy)
+    return factory.controller
+
+
+def full_scans(queries):
+    """Plan lines of SELECT statements that scan a hot table without an index."""
+    scans = []
+    for statement, parameters in queries:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        for row in plan:
+            detail = row[-1]
+            for table in HOT_TABLES:
+                if detail.startswith(f"SCAN {table}") and "INDEX" not in detail:
+                    scans.append((detail, statement))
+    return scans
+
+
+@pytest.mark.parametrize("call", [
+    lambda c: c.get_session_contributions(1),
+    lambda c: c.get_session_contributions(1, after=(date(2025, 1, 31), 1), limit=2),
+    lambda c: c.get_session_contributions(2),
+    lambda c: c.get_user_payments(1),
+    lambda c: c.get_user_payments(1, after=(date(2025, 1, 1), 1), limit=2),
+    lambda c: list(c.iter_session_contributions(1)),
+    lambda c: list(c.iter_user_payments(1)),
+    lambda c: c.generate_monthly_contributions(1),
+    lambda c: c.record_payment(1),
+    lambda c: c.record_payments_batch([(2, None), (3, None)]),
+    lambda c: c.materialize_cell(2, 1, date(2025, 1, 1)),
+    lambda c: c.rebuild_contribution_counters(1, dry_run=True),
+    lambda c: c.get_session_summary(1, date(2025, 6, 1)),
+    lambda c: c.get_session_summary(2, date(2025, 6, 1)),
+    lambda c: c.eligible_winners(1, date(2025, 1, 31)),
+    lambda c: c.set_month_winner(1, 1),
+])
+def test_controller_queries_use_indexes(controller, capture_queries, call):
+    with capture_queries() as queries:
+        call(controller)
+    assert queries
+    assert full_scans(queries) == []
+
+
+def test_indexes_are_created(controller):
+    names = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))}
+    assert {
+        "ix_contributions_run_month",
+        "ix_contributions_run_status_month",
+        "ix_user_monthly_contributions_user_status",
+        "ix_user_monthly_contributions_contribution",
+        "ix_user_contribution_runs_run",
+    } <= names
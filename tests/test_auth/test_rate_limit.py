@@ -0,0 +1,61 @@
+import pytest
+
+from community.utils.rate_limit import MemoryBucketStore, parse_rule
+
+
+@pytest.fixture
+def limited_client(client, monkeypatch):
+    config = client.application.config
+    monkeypatch.setitem(config, 'RATE_LIMIT_ENABLED', True)
+    monkeypatch.setitem(config, 'RATE_LIMIT_PER_IP', '5/minute')
+    monkeypatch.setitem(config, 'RATE_LIMIT_PER_EMAIL', '2/minute')
+    return client
+
+
+def attempt(client, email, ip='10.0.0.1'):
+    return client.post('/auth/login', json={'email': email, 'password': 'wrong-password'},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_rejected_attempts_cost_no_query(limited_client, factory, capture_queries):
+    factory.user(email='target@example.com')
+    assert [attempt(limited_client, 'target@example.com').status_code for _ in range(2)] == [401, 401]
+
+    with capture_queries() as queries:
+        response = attempt(limited_client, 'Target@Example.com')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert queries == []
+
+
+def test_email_limit_spans_addresses_and_ip_limit_spans_emails(limited_client):
+    statuses = [attempt(limited_client, 'victim@example.com', ip=f'10.0.1.{i}').status_code for i in range(3)]
+    assert statuses == [401, 401, 429]
+
+    statuses = [attempt(limited_client, f'user{i}@example.com').status_code for i in range(6)]
+    assert statuses == [401] * 5 + [429]
+    # each endpoint has its own buckets
+    assert limited_client.post('/auth/register', json={}, environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code == 400
+    assert 'rate_limit_rejected 2' in limited_client.get('/metrics').get_data(as_text=True)
+
+
+def test_memory_store_refills_and_stays_bounded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('community.utils.rate_limit.time.monotonic', lambda: clock[0])
+    store = MemoryBucketStore(max_keys=3)
+    capacity, rate = parse_rule('2/second')
+
+    assert [store.take('a', capacity, rate) for _ in range(3)] == [0, 0, 0.5]
+    clock[0] += 0.5
+    assert store.take('a', capacity, rate) == 0
+
+    for key in 'bcde':
+        store.take(key, capacity, rate)
+    assert len(store) == 3
+    # full again after 1 s: forgotten
+    clock[0] += 1
+    store.take('f', capacity, rate)
+    assert len(store) == 1
+
+    with pytest.raises(ValueError):
+        parse_rule('10 per minute')
@@ -1,17 +1,3 @@
-import pytest
-
-from community import create_app, db
-
-
-@pytest.fixture
-def client():
-    app = create_app(testing=True)
-    with app.app_context():
-        yield app.test_client()
-        db.session.remove()
-        db.drop_all()
-
-
 def test_register_with_email(client):
     response = client.post('auth/register', json={
         'first_name': 'steve',
@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from community import create_app, db
+from community.config import TestingConfig
+from community.controllers.contribution_controller import ContributionController
+from community.models.routing import get_recent_writes, get_replica_engine
+
+
+@pytest.fixture
+def replicated_app(tmp_path, monkeypatch):
+    """Two SQLite files standing in for the primary and its replica."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'DATABASE_REPLICA_URL', f"sqlite:///{tmp_path / 'replica.db'}", raising=False)
+    app = create_app(testing=True)
+    with app.app_context():
+        db.metadata.create_all(get_replica_engine())
+        yield app
+        db.session.remove()
+        get_replica_engine().dispose()
+
+
+def create_session(number_of_members):
+    controller = ContributionController(db.session)
+    return controller.create_session(number_of_members, 100, date(2025, 1, 1)).id
+
+
+def test_reads_go_to_replica_when_no_recent_write(replicated_app):
+    session_id = create_session(4)
+    get_recent_writes().ttl = 0  # everything is "old": the replica is trusted
+
+    sessions = ContributionController(db.session).list_sessions()
+    assert sessions == []  # the replica has not received the row
+
+    with get_replica_engine().begin() as conn:
+        conn.execute(text(
+            "INSERT INTO contribution_runs (id, number_of_members, minimal_contribution, start_date, lazy_schedule) "
+            "VALUES (:id, 9, 100, '2025-01-01', 0)"
+        ), {'id': session_id})
+    assert [s.number_of_members for s in ContributionController(db.session).list_sessions()] == [9]
+
+
+def test_recent_write_reads_from_primary(replicated_app):
+    create_session(4)
+
+    sessions = ContributionController(db.session).list_sessions()
+    assert [s.number_of_members for s in sessions] == [4]
+
+
+def test_writes_stay_on_primary_after_replica_read(replicated_app):
+    get_recent_writes().ttl = 0
+    assert ContributionController(db.session).list_sessions() == []
+    create_session(4)
+    db.session.rollback()
+
+    with db.engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM contribution_runs")).scalar() == 1
+    with get_replica_engine().connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM contribution_runs")).scalar() == 0
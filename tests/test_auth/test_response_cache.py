@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime
+
+from community import create_app
+from community.utils.response_cache import LRUCacheBackend, get_response_cache
+
+
+@pytest.fixture(autouse=True)
+def enable_cache(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'RESPONSE_CACHE_ENABLED', True)
+
+
+def create_session(client):
+    response = client.post('/contribution/session', json={
+        'number_of_members': 2,
+        'minimal_contribution': 50,
+        'start_date': datetime(2025, 1, 1).date().isoformat()
+    })
+    return response.get_json()['session_id']
+
+
+def test_sessions_are_served_from_cache_with_etag(client, capture_queries):
+    create_session(client)
+    first = client.get('/contribution/sessions')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    with capture_queries() as queries:
+        cached = client.get('/contribution/sessions')
+        not_modified = client.get('/contribution/sessions', headers={'If-None-Match': etag})
+    assert queries == []
+    assert cached.get_json() == first.get_json()
+    assert not_modified.status_code == 304
+    assert get_response_cache().stats() == {'hits': 2, 'misses': 1, 'not_modified': 1}
+
+
+def test_writes_invalidate_cached_responses(client):
+    session_id = create_session(client)
+    etag = client.get('/contribution/sessions').headers['ETag']
+
+    create_session(client)
+    response = client.get('/contribution/sessions', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+
+    url = f'/contribution/session/{session_id}/contributions'
+    assert client.get(url).get_json() == []
+    client.post('auth/register', json={
+        'first_name': 'cache', 'last_name': 'Doe', 'email': 'cache@example.com', 'password': 'password123'
+    })
+    user_id = client.get('auth/get_id/cache@example.com').get_json()['user_id']
+    client.post(f'/contribution/session/{session_id}/add-user', json={'user_id': user_id})
+    client.post(f'/contribution/session/{session_id}/generate-months')
+    contributions = client.get(url).get_json()
+    assert len(contributions) == 1
+    assert {c['status'] for c in contributions} == {'PENDING'}
+
+
+def test_lru_backend_is_bounded():
+    backend = LRUCacheBackend(max_entries=2)
+    backend.set('a', 1, 60)
+    backend.set('b', 2, 60)
+    backend.get('a')  # b is now the least recently used
+    backend.set('c', 3, 60)
+    assert len(backend) == 2
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+
+    backend.set('expired', 4, -1)
+    assert backend.get('expired') is None
+
+
+def test_process_local_cache_is_refused_with_several_web_processes(monkeypatch):
+    from community.config import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, 'RESPONSE_CACHE_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'WEB_CONCURRENCY', 4)
+    with pytest.raises(RuntimeError, match="RESPONSE_CACHE_BACKEND=redis"):
+        create_app(testing=True)
+    monkeypatch.setattr(TestingConfig, 'RESPONSE_CACHE_ENABLED', False)
+    create_app(testing=True)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from community.simulation import SimulationError, simulate
+
+
+def test_simulation_matches_schedule():
+    sim = simulate([1, 2, 1], 100)
+    assert sim.number_of_months == 4
+    assert sim.contributions.tolist() == [100, 200, 100]
+    assert sim.pot == 400
+    assert sim.winners.tolist() == [0, 1, 1, 2]
+    # everyone ends even; the first winner is in debt, the last one saved
+    assert sim.balances[:, -1].tolist() == [0, 0, 0]
+    assert sim.balances[0].tolist() == [300, 200, 100, 0]
+    assert sim.max_credit.tolist() == [300, 200, 0]
+    assert sim.max_advance.tolist() == [0, 200, 300]
+
+
+def test_random_payout_order_is_seeded():
+    first = simulate([1] * 10, 50, 'random', seed=7)
+    assert np.array_equal(first.winners, simulate([1] * 10, 50, 'random', seed=7).winners)
+    assert sorted(first.winners.tolist()) == list(range(10))
+
+    with pytest.raises(SimulationError):
+        simulate([1, 1], 50, [0, 0])
+    with pytest.raises(SimulationError):
+        simulate([0, 1], 50)
+
+
+def test_simulate_endpoint(client):
+    response = client.post('/contribution/simulate', json={
+        'parts': [1, 1], 'minimal_contribution': 100, 'start_date': '2025-01-01', 'payout_order': [1, 0]
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['months'] == ['2025-01-01', '2025-01-31']
+    assert data['winners'] == [1, 0]
+    assert data['balances'] == [[-100, 0], [100, 0]]
+    assert data['members'][1]['payout_months'] == [0]
+
+    response = client.post('/contribution/simulate', json={'scenarios': [
+        {'number_of_members': n, 'minimal_contribution': 10, 'include_balances': False} for n in range(1, 6)
+    ]})
+    assert [s['pot'] for s in response.get_json()['scenarios']] == [10, 20, 30, 40, 50]
+    assert 'balances' not in response.get_json()['scenarios'][0]
+
+    response = client.post('/contribution/simulate', json={'scenarios': [{'parts': [1]}]})
+    assert response.status_code == 400
+    assert response.get_json()['scenario'] == 0